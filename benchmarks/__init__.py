@@ -0,0 +1,5 @@
+"""
+Benchmarks for the bot's hot paths against a fake Docker daemon
+
+Run with ``python -m benchmarks``; see ``python -m benchmarks --help``.
+"""
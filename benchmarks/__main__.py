@@ -0,0 +1,86 @@
+"""
+Run the benchmark suites and store the results as JSON
+
+    python -m benchmarks
+    python -m benchmarks --suites state --servers 1000,10000
+    python -m benchmarks --compare benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks import bench_commands, bench_modpacks, bench_state
+from benchmarks.harness import BenchmarkRun, compare, default_output, environment
+
+SUITES = ('commands', 'state', 'modpacks')
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[0])
+    parser.add_argument('--suites', default=",".join(SUITES),
+                        help=f"comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument('--servers', default="1000,10000",
+                        help="comma-separated numbers of existing servers to benchmark against")
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help="seconds the fake Docker daemon waits per request")
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help="extra random seconds per Docker request, up to this value")
+    parser.add_argument('--iterations', type=int, default=100,
+                        help="iterations per benchmark (scaled down for the slowest cases)")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="where to write the JSON results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--compare', type=Path, default=None,
+                        help="a previous results file; exit with status 1 if p50 or p99 regressed")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed relative slowdown before a result counts as a regression")
+    return parser.parse_args(argv)
+
+
+async def main(args: argparse.Namespace) -> int:
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        print(f"Unknown suites: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    scales = [int(value) for value in args.servers.split(",")]
+
+    run = BenchmarkRun(meta={
+        **environment(),
+        'suites': suites,
+        'servers': scales,
+        'docker_latency': args.latency,
+        'docker_jitter': args.jitter,
+        'iterations': args.iterations,
+    })
+    if 'commands' in suites:
+        await bench_commands.run(run, scales, args.latency, args.jitter, args.iterations)
+    if 'state' in suites:
+        await bench_state.run(run, scales, args.iterations)
+    if 'modpacks' in suites:
+        await bench_modpacks.run(run, args.iterations)
+
+    output = args.output or default_output()
+    run.save(output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(BenchmarkRun.load(args.compare), run.results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.key} {regression.metric}: "
+                f"{regression.baseline * 1000:.3f}ms -> {regression.current * 1000:.3f}ms "
+                f"({regression.ratio:.2f}x)"
+            )
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    # The cog logs every creation; keep the output to the results
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(main(parse_args())))
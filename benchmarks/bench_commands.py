@@ -0,0 +1,54 @@
+"""
+Command handler benchmarks: the cog's commands against the fake daemon at scale
+"""
+
+import itertools
+
+from benchmarks.environment import bench_cog
+from benchmarks.fake_discord import FakeContext
+from benchmarks.harness import BenchmarkRun
+
+
+async def run(results: BenchmarkRun, scales, latency: float, jitter: float, iterations: int):
+    names = itertools.count()
+    for servers in scales:
+        params = {'servers': servers, 'latency_ms': latency * 1000}
+        async with bench_cog(servers, latency=latency, jitter=jitter) as env:
+            cog = env.cog
+            ctx = FakeContext()
+
+            async def create(i):
+                await cog.create_server(ctx, f"bench_{next(names)}", 'vanilla')
+                assert ctx.last.embed is not None and ctx.last.embed.title == "✅ Server Created", ctx.last.content
+
+            await results.measure('commands.create_server', create, iterations, **params)
+            await results.measure('commands.create_server', create, iterations, concurrency=16, **params)
+
+            async def list_servers(i):
+                await cog.list_servers(ctx)
+
+            await results.measure('commands.list_servers', list_servers, max(iterations // 4, 10), **params)
+
+            async def server_status(i):
+                await cog.server_status(ctx, f"srv{i % servers:05d}")
+
+            await results.measure('commands.server_status', server_status, iterations, **params)
+
+            async def list_templates(i):
+                # Force the embed to be rebuilt, as after a template edit
+                cog._templates_embed = None
+                await cog.list_templates(ctx)
+
+            await results.measure('commands.list_templates', list_templates, iterations, **params)
+
+            async def capacity(i):
+                await cog.capacity(ctx)
+
+            await results.measure('commands.capacity', capacity, max(iterations // 10, 5), **params)
+
+            async def restart_batch(i):
+                await cog.restart_servers(ctx, "srv000*")
+                assert ctx.last.content.startswith("✅"), ctx.last.content
+
+            await results.measure('commands.restart_servers', restart_batch, 3, **params,
+                                  batch=min(servers, 100))
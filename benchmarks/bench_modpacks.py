@@ -0,0 +1,79 @@
+"""
+ModpackHelper benchmarks on synthetic modpacks with many entries
+"""
+
+import json
+import random
+import tempfile
+import zipfile
+from pathlib import Path
+
+from aiohttp import web
+
+from benchmarks.harness import BenchmarkRun
+from src.utils.http_client import HttpClient
+from src.utils.modpack_helper import ModpackHelper
+
+ENTRY_COUNTS = (1_000, 10_000, 50_000)
+
+
+def build_modpack(path: Path, entries: int):
+    """Write a CurseForge-style pack with ``entries`` files, mostly small mods and configs"""
+    rng = random.Random(entries)
+    manifest = {
+        'manifestType': 'minecraftModpack',
+        'name': f"Bench {entries}",
+        'version': '1.0.0',
+        'minecraft': {'version': '1.20.1', 'modLoaders': [{'id': 'forge-47.2.0', 'primary': True}]},
+        'files': [{'projectID': i, 'fileID': i} for i in range(min(entries, 500))],
+    }
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('manifest.json', json.dumps(manifest))
+        for i in range(entries - 1):
+            if i % 3 == 0:
+                name = f"overrides/config/mod_{i}/settings.toml"
+            elif i % 3 == 1:
+                name = f"overrides/mods/mod_{i}-1.20.1.jar"
+            else:
+                name = f"overrides/kubejs/assets/pack/textures/block_{i}.png"
+            archive.writestr(name, rng.randbytes(64))
+
+
+async def run(results: BenchmarkRun, iterations: int):
+    with tempfile.TemporaryDirectory(prefix="bench-modpacks-") as directory:
+        directory = Path(directory)
+        packs = {}
+        for entries in ENTRY_COUNTS:
+            packs[entries] = directory / f"pack_{entries}.zip"
+            build_modpack(packs[entries], entries)
+
+        repeats = {entries: max(3, iterations * 1_000 // entries) for entries in ENTRY_COUNTS}
+        for entries, path in packs.items():
+            params = {'entries': entries, 'size_mb': round(path.stat().st_size / 1024 ** 2, 1)}
+
+            def extract(i, path=path):
+                metadata = ModpackHelper.extract_modpack_metadata(str(path))
+                assert metadata['mod_loader'] == 'forge', metadata
+
+            results.measure_sync('modpacks.extract_local', extract, repeats[entries], **params)
+
+        # Remote extraction over HTTP Range requests; aiohttp's FileResponse honours Range
+        app = web.Application()
+        app.router.add_get('/{name}', lambda request: web.FileResponse(directory / request.match_info['name']))
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', 0).start()
+        base = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            async with HttpClient() as client:
+                for entries, path in packs.items():
+                    url = f"{base}/{path.name}"
+
+                    async def extract_remote(i, url=url):
+                        metadata = await ModpackHelper.extract_remote_modpack_metadata(url, client=client)
+                        assert metadata and metadata['mod_loader'] == 'forge', metadata
+
+                    await results.measure('modpacks.extract_remote', extract_remote, repeats[entries],
+                                          entries=entries)
+        finally:
+            await runner.cleanup()
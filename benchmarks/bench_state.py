@@ -0,0 +1,27 @@
+"""
+State persistence benchmarks: save_active_servers and load_active_servers at scale
+"""
+
+from benchmarks.environment import bench_cog
+from benchmarks.harness import BenchmarkRun
+
+BACKENDS = ('sqlite', 'json')
+
+
+async def run(results: BenchmarkRun, scales, iterations: int):
+    for backend in BACKENDS:
+        for servers in scales:
+            params = {'backend': backend, 'servers': servers}
+            async with bench_cog(servers, backend=backend) as env:
+                cog = env.cog
+                names = sorted(cog.active_servers)
+                repeats = max(3, min(iterations, 200_000 // servers))
+
+                async def save_one(i):
+                    name = names[i % len(names)]
+                    cog.active_servers[name]['status'] = f"bench-{i}"
+                    await cog.save_active_servers(name)
+
+                await results.measure('state.save_one', save_one, iterations, **params)
+                await results.measure('state.save_all', lambda i: cog.save_active_servers(), repeats, **params)
+                await results.measure('state.load_all', lambda i: cog.load_active_servers(), repeats, **params)
@@ -0,0 +1,99 @@
+"""
+A MinecraftServerManager wired to the fake Docker daemon and seeded with servers
+"""
+
+import contextlib
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict
+
+from benchmarks.fake_docker import FakeDockerDaemon
+from config.settings import settings
+from src.cogs.minecraft_manager import MinecraftServerManager
+from src.models.server import MinecraftServer
+from src.utils.http_client import HttpClient
+from src.utils.scheduler import resource_labels, template_resources
+
+PORT_BASE = 20000
+
+
+@contextlib.contextmanager
+def override_settings(**values):
+    """Temporarily replace settings, restoring the previous values afterwards"""
+    missing = object()
+    previous = {name: settings.__dict__.get(name, missing) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is missing:
+                delattr(settings, name)
+            else:
+                setattr(settings, name, value)
+
+
+def seed_servers(cog: MinecraftServerManager, daemon: FakeDockerDaemon, count: int, template_name: str = 'vanilla'):
+    """Create ``count`` running servers in the daemon and the state store without going through commands"""
+    template = cog.templates.get(template_name)
+    memory, nano_cpus = template_resources(template)
+    host = cog.hosts.default
+    records: Dict[str, dict] = {}
+    for i in range(count):
+        name = f"srv{i:05d}"
+        port = PORT_BASE + i
+        container_id = daemon.add_container(
+            f"minecraft_{name}",
+            labels={'minecraft.server': name, **resource_labels(memory, nano_cpus)},
+            port=port
+        )
+        server = MinecraftServer(name=name, template=template, port=port, created_by="seed", host=host,
+                                 template_key=template_name)
+        records[name] = {**server.to_dict(), 'container_id': container_id}
+    cog.state_store.upsert_many(records.items())
+
+
+@contextlib.asynccontextmanager
+async def bench_cog(servers: int, backend: str = 'sqlite', latency: float = 0.0,
+                    jitter: float = 0.0) -> AsyncIterator[SimpleNamespace]:
+    """Start a fake daemon and a cog on it with ``servers`` existing servers
+
+    Background services (event watcher, image refresh, standby pool) are not
+    started; the status cache and image records are filled once up front,
+    as the services would have done.
+    """
+    daemon = FakeDockerDaemon(latency=latency, jitter=jitter)
+    await daemon.start()
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory, override_settings(
+        DOCKER_HOSTS={'bench': daemon.url},
+        STATE_BACKEND=backend,
+        STATE_DB_FILE=str(Path(directory) / "servers.db"),
+        SERVERS_FILE=str(Path(directory) / "servers.json"),
+        MODPACK_CACHE_ENABLED=False,
+        STANDBY_POOL_SIZES={},
+        DEFAULT_PORT_RANGE_START=PORT_BASE,
+        DEFAULT_PORT_RANGE_END=PORT_BASE + 40000,
+    ):
+        bot = SimpleNamespace(http_client=HttpClient(), get_channel=lambda channel_id: None)
+        cog = MinecraftServerManager(bot)
+        # Normally done by bot.add_cog; lets benchmarks call cog.create_server(ctx, ...)
+        for command in cog.get_commands():
+            command.cog = cog
+        try:
+            for image in cog.template_images():
+                daemon.add_image(image)
+            seed_servers(cog, daemon, servers)
+            cog._active_servers = await cog.load_active_servers()
+
+            host = cog.hosts.get(None)
+            await host.load_ports(info['port'] for info in cog.active_servers.values())
+            for image in cog.template_images():
+                await host.image_manager.inspect(image)
+            await host.status_poller.refresh()
+            yield SimpleNamespace(cog=cog, daemon=daemon, host=host, directory=directory)
+        finally:
+            cog.hosts.close()
+            cog.state_store.close()
+            await daemon.stop()
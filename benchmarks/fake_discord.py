@@ -0,0 +1,50 @@
+"""
+Minimal Discord objects for driving cog commands without a gateway connection
+"""
+
+import asyncio
+from typing import List, Optional
+from unittest.mock import Mock
+
+import discord
+
+
+class FakeMessage:
+    """A sent message that records its edits"""
+
+    def __init__(self, content: Optional[str] = None, embed: Optional[discord.Embed] = None):
+        self.content = content
+        self.embed = embed
+        self.edits = 0
+
+    async def edit(self, content: Optional[str] = None, embed: Optional[discord.Embed] = None):
+        self.content = content if content is not None else self.content
+        self.embed = embed if embed is not None else self.embed
+        self.edits += 1
+
+
+class FakeContext:
+    """Stands in for ``commands.Context``: an author with a role and a ``send`` that records replies
+
+    ``send_latency`` delays every reply to model the Discord API round
+    trip; it is zero by default so results reflect the bot itself.
+    """
+
+    def __init__(self, role: str = "Admin", send_latency: float = 0.0):
+        self.author = Mock(spec=discord.Member)
+        role_object = Mock()
+        role_object.name = role
+        self.author.roles = [role_object]
+        self.send_latency = send_latency
+        self.sent: List[FakeMessage] = []
+
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None, **kwargs):
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+        message = FakeMessage(content, embed)
+        self.sent.append(message)
+        return message
+
+    @property
+    def last(self) -> FakeMessage:
+        return self.sent[-1]
@@ -0,0 +1,206 @@
+"""
+A local stand-in for the Docker Engine API with configurable latency
+
+Only the endpoints the bot calls are implemented, with enough state that
+created containers show up in listings and inspects. The real docker SDK
+talks to it over TCP, so DockerHelper's executor, semaphore and request
+handling are all exercised.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+from docker.utils import parse_repository_tag
+
+API_VERSION = "1.43"
+
+
+class FakeDockerDaemon:
+    """Serves a subset of the Docker Engine API from memory
+
+    Every request waits ``latency`` seconds, plus up to ``jitter`` more, to
+    model a daemon under load. Host memory and CPU are large enough that
+    admission control never queues.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 mem_total: int = 1 << 50, ncpu: int = 100_000):
+        self.latency = latency
+        self.jitter = jitter
+        self.mem_total = mem_total
+        self.ncpu = ncpu
+        self.containers: Dict[str, dict] = {}
+        self.images: Dict[str, dict] = {}
+        self._names: Dict[str, str] = {}
+        self.requests = 0
+        self._ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.url: Optional[str] = None
+
+    async def start(self):
+        """Serve on a loopback port from a thread with its own event loop
+
+        The docker SDK blocks the calling thread (the client pings the
+        daemon on construction), so the daemon cannot share the bot's loop.
+        """
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), name="fake-docker", daemon=True)
+        self._thread.start()
+        await asyncio.to_thread(ready.wait)
+
+    async def stop(self):
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop)
+        await asyncio.wrap_future(future)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        await asyncio.to_thread(self._thread.join)
+        self._loop.close()
+        self._thread = None
+
+    def _serve(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application(middlewares=[self._delay])
+        routes = [
+            ('GET', '/_ping', self._ping),
+            ('GET', '/version', self._version),
+            ('GET', '/info', self._info),
+            ('GET', '/containers/json', self._list_containers),
+            ('POST', '/containers/create', self._create_container),
+            ('GET', '/containers/{id}/json', self._inspect_container),
+            ('POST', '/containers/{id}/{action:start|stop|restart}', self._container_action),
+            ('DELETE', '/containers/{id}', self._remove_container),
+            ('GET', '/images/{name:.+}/json', self._inspect_image),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, path, handler)
+            app.router.add_route(method, '/v{version}' + path, handler)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        self._loop.run_until_complete(web.TCPSite(self._runner, '127.0.0.1', 0).start())
+        self.url = f"tcp://127.0.0.1:{self._runner.addresses[0][1]}"
+        ready.set()
+        self._loop.run_forever()
+
+    def add_image(self, name: str):
+        """Make an image available as if it had been pulled"""
+        repository, _ = parse_repository_tag(name)
+        self.images[name] = {
+            'Id': f"sha256:{hashlib.sha256(name.encode()).hexdigest()}",
+            'RepoTags': [name],
+            'RepoDigests': [f"{repository}@sha256:{hashlib.sha256(repository.encode()).hexdigest()}"],
+        }
+
+    def add_container(self, name: str, state: str = 'running', labels: Optional[dict] = None,
+                      port: Optional[int] = None) -> str:
+        """Register an existing container, e.g. to seed thousands of servers"""
+        container_id = f"{next(self._ids):064x}"
+        self._names[f"/{name}"] = container_id
+        self.containers[container_id] = {
+            'Id': container_id,
+            'Names': [f"/{name}"],
+            'Name': f"/{name}",
+            'Image': 'itzg/minecraft-server',
+            'Labels': labels or {},
+            'State': state,
+            'Status': 'Up 5 minutes' if state == 'running' else 'Exited (0) 5 minutes ago',
+            'Created': int(time.time()),
+            'Ports': [{'PrivatePort': 25565, 'PublicPort': port, 'Type': 'tcp'}] if port else [],
+        }
+        return container_id
+
+    @web.middleware
+    async def _delay(self, request: web.Request, handler):
+        self.requests += 1
+        delay = self.latency + (random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return await handler(request)
+
+    def _find(self, ref: str) -> dict:
+        container = self.containers.get(ref) or self.containers.get(self._names.get(f"/{ref}", ""))
+        if container is None:
+            raise web.HTTPNotFound(text=json.dumps({'message': f"No such container: {ref}"}),
+                                   content_type='application/json')
+        return container
+
+    async def _ping(self, request):
+        return web.Response(text="OK")
+
+    async def _version(self, request):
+        return web.json_response({'ApiVersion': API_VERSION, 'Version': '24.0.0'})
+
+    async def _info(self, request):
+        return web.json_response({
+            'MemTotal': self.mem_total,
+            'NCPU': self.ncpu,
+            'Containers': len(self.containers),
+        })
+
+    async def _list_containers(self, request):
+        filters = json.loads(request.query.get('filters') or '{}')
+        show_all = request.query.get('all') in ('1', 'true', 'True')
+        result = []
+        for container in self.containers.values():
+            if not show_all and container['State'] != 'running':
+                continue
+            if 'status' in filters and container['State'] not in filters['status']:
+                continue
+            if 'name' in filters and not any(name in container['Name'] for name in filters['name']):
+                continue
+            result.append({key: container[key] for key in
+                           ('Id', 'Names', 'Image', 'Labels', 'State', 'Status', 'Created', 'Ports')})
+        return web.json_response(result)
+
+    async def _create_container(self, request):
+        body = await request.json()
+        name = request.query.get('name') or f"container_{next(self._ids)}"
+        if f"/{name}" in self._names:
+            return web.json_response({'message': f"Conflict. The container name \"/{name}\" is already in use"},
+                                     status=409)
+        bindings = (body.get('HostConfig') or {}).get('PortBindings') or {}
+        port = None
+        for binding in bindings.get('25565/tcp') or []:
+            if binding.get('HostPort'):
+                port = int(binding['HostPort'])
+        container_id = self.add_container(name, state='created', labels=body.get('Labels'), port=port)
+        return web.json_response({'Id': container_id, 'Warnings': []}, status=201)
+
+    async def _inspect_container(self, request):
+        container = self._find(request.match_info['id'])
+        return web.json_response({
+            **container,
+            'State': {'Status': container['State'], 'Running': container['State'] == 'running'},
+            'Config': {'Labels': container['Labels'], 'Image': container['Image']},
+        })
+
+    async def _container_action(self, request):
+        container = self._find(request.match_info['id'])
+        action = request.match_info['action']
+        container['State'] = 'exited' if action == 'stop' else 'running'
+        return web.Response(status=204)
+
+    async def _remove_container(self, request):
+        container = self._find(request.match_info['id'])
+        del self.containers[container['Id']]
+        del self._names[container['Name']]
+        return web.Response(status=204)
+
+    async def _inspect_image(self, request):
+        name = request.match_info['name']
+        image = self.images.get(name) or next(
+            (image for image in self.images.values() if name == image['Id'] or name in image['RepoDigests']), None
+        )
+        if image is None:
+            return web.json_response({'message': f"No such image: {name}"}, status=404)
+        return web.json_response(image)
@@ -0,0 +1,184 @@
+"""
+Timing, percentile summaries and JSON results for the benchmarks
+"""
+
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of the samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+@dataclass
+class BenchmarkResult:
+    """Summary of one benchmark at one set of parameters"""
+
+    name: str
+    params: Dict[str, object]
+    iterations: int
+    concurrency: int
+    wall_seconds: float
+    throughput: float
+    mean: float
+    p50: float
+    p99: float
+    max: float
+
+    @property
+    def key(self) -> str:
+        """Identifies the benchmark across runs, e.g. ``state.save_all[backend=sqlite,servers=1000]``"""
+        params = dict(self.params)
+        if self.concurrency != 1:
+            params['concurrency'] = self.concurrency
+        return f"{self.name}[{','.join(f'{name}={value}' for name, value in sorted(params.items()))}]"
+
+    @classmethod
+    def from_samples(cls, name: str, params: Dict[str, object], samples: List[float],
+                     wall_seconds: float, concurrency: int = 1) -> 'BenchmarkResult':
+        return cls(
+            name=name,
+            params=params,
+            iterations=len(samples),
+            concurrency=concurrency,
+            wall_seconds=wall_seconds,
+            throughput=len(samples) / wall_seconds if wall_seconds else 0.0,
+            mean=sum(samples) / len(samples) if samples else 0.0,
+            p50=percentile(samples, 0.5),
+            p99=percentile(samples, 0.99),
+            max=max(samples) if samples else 0.0,
+        )
+
+
+@dataclass
+class BenchmarkRun:
+    """All results of one invocation, with enough context to compare runs"""
+
+    results: List[BenchmarkResult] = field(default_factory=list)
+    meta: Dict[str, object] = field(default_factory=dict)
+
+    def add(self, result: BenchmarkResult):
+        self.results.append(result)
+        print(
+            f"{result.key:<70} n={result.iterations:<6} "
+            f"p50={result.p50 * 1000:9.3f}ms p99={result.p99 * 1000:9.3f}ms "
+            f"{result.throughput:10.1f}/s",
+            flush=True
+        )
+
+    async def measure(self, name: str, operation: Callable[[int], Awaitable], iterations: int,
+                      concurrency: int = 1, warmup: int = 0, **params) -> BenchmarkResult:
+        """Time ``operation(i)`` for each iteration, at most ``concurrency`` at once"""
+        for i in range(warmup):
+            await operation(-1 - i)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        samples: List[float] = []
+
+        async def timed(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                await operation(i)
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(i) for i in range(iterations)))
+        wall = time.perf_counter() - started
+
+        result = BenchmarkResult.from_samples(name, params, samples, wall, concurrency)
+        self.add(result)
+        return result
+
+    def measure_sync(self, name: str, operation: Callable[[int], object], iterations: int,
+                     **params) -> BenchmarkResult:
+        """Time a blocking ``operation(i)`` on the calling thread"""
+        samples = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            began = time.perf_counter()
+            operation(i)
+            samples.append(time.perf_counter() - began)
+        result = BenchmarkResult.from_samples(name, params, samples, time.perf_counter() - started)
+        self.add(result)
+        return result
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'meta': self.meta,
+            'results': [{**asdict(result), 'key': result.key} for result in self.results],
+        }
+        path.write_text(json.dumps(payload, indent=2))
+
+    @staticmethod
+    def load(path: Path) -> Dict[str, dict]:
+        """Load a saved run as a mapping of benchmark key to result"""
+        payload = json.loads(Path(path).read_text())
+        return {result['key']: result for result in payload['results']}
+
+
+def environment() -> Dict[str, object]:
+    """Describe the machine and revision a run was made on"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+
+def compare(baseline: Dict[str, dict], results: Sequence[BenchmarkResult],
+            tolerance: float = 0.25, floor: float = 0.0005) -> List[Regression]:
+    """Find results whose p50 or p99 grew by more than ``tolerance`` over the baseline
+
+    Latencies below ``floor`` seconds are ignored on both sides, since
+    timer noise dominates there.
+    """
+    regressions = []
+    for result in results:
+        before = baseline.get(result.key)
+        if before is None:
+            continue
+        for metric in ('p50', 'p99'):
+            old, new = before[metric], getattr(result, metric)
+            if max(old, new) < floor:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(Regression(result.key, metric, old, new))
+    return regressions
+
+
+def default_output(directory: Optional[Path] = None) -> Path:
+    directory = directory or Path(__file__).parent / 'results'
+    return directory / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
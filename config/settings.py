@@ -4,7 +4,7 @@ Application settings and configuration management
 
 import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,15 +19,163 @@ class Settings:
     
     # Docker Configuration
     DOCKER_HOST: str = os.getenv("DOCKER_HOST", "unix:///var/run/docker.sock")
+    # Pool of daemons as "name=url,name2=url2"; defaults to the local daemon
+    DOCKER_HOSTS: Dict[str, Optional[str]] = {
+        name.strip(): url.strip()
+        for name, url in (
+            entry.split("=", 1) for entry in os.getenv("DOCKER_HOSTS", "").split(",") if "=" in entry
+        )
+    } or {"local": None}
+    PLACEMENT_POLICY: str = os.getenv("PLACEMENT_POLICY", "least_loaded")
+    DOCKER_MAX_WORKERS: int = int(os.getenv("DOCKER_MAX_WORKERS", "8"))
+    DOCKER_MAX_CONCURRENT_OPS: int = int(os.getenv("DOCKER_MAX_CONCURRENT_OPS", "8"))
+    DOCKER_OPERATION_TIMEOUT: float = float(os.getenv("DOCKER_OPERATION_TIMEOUT", "30"))
+    DOCKER_CREATE_TIMEOUT: float = float(os.getenv("DOCKER_CREATE_TIMEOUT", "120"))
+    DOCKER_MAX_STREAMS: int = int(os.getenv("DOCKER_MAX_STREAMS", "32"))
+    # Seconds a server gets to shut down cleanly before it is killed
+    SERVER_STOP_TIMEOUT: int = int(os.getenv("SERVER_STOP_TIMEOUT", "30"))
+    
+    # Image Cache
+    IMAGE_PULL_TIMEOUT: float = float(os.getenv("IMAGE_PULL_TIMEOUT", "900"))
+    IMAGE_REFRESH_INTERVAL: int = int(os.getenv("IMAGE_REFRESH_INTERVAL", "21600"))
+    
+    # Status Tracking
+    STATUS_POLL_INTERVAL: float = float(os.getenv("STATUS_POLL_INTERVAL", "15"))
+    DOCKER_EVENTS_ENABLED: bool = os.getenv("DOCKER_EVENTS_ENABLED", "true").lower() == "true"
+    NOTIFY_CHANNEL_ID: int = int(os.getenv("NOTIFY_CHANNEL_ID", "0"))
+    
+    # Server Logs
+    LOG_DEFAULT_LINES: int = int(os.getenv("LOG_DEFAULT_LINES", "50"))
+    LOG_MAX_LINES: int = int(os.getenv("LOG_MAX_LINES", "10000"))
+    LOG_MESSAGES_PER_SECOND: float = float(os.getenv("LOG_MESSAGES_PER_SECOND", "1"))
+    LOG_MAX_MESSAGES: int = int(os.getenv("LOG_MAX_MESSAGES", "5"))
+    LOG_FOLLOW_SECONDS: float = float(os.getenv("LOG_FOLLOW_SECONDS", "120"))
+    LOG_ATTACHMENT_MAX_BYTES: int = int(os.getenv("LOG_ATTACHMENT_MAX_BYTES", str(50 * 1024 * 1024)))
+    
+    # Standby Pool (e.g. "vanilla=2,paper=1")
+    STANDBY_POOL_SIZES: Dict[str, int] = {
+        name.strip(): int(count)
+        for name, count in (
+            entry.split("=", 1) for entry in os.getenv("STANDBY_POOL_SIZES", "").split(",") if "=" in entry
+        )
+    }
+    STANDBY_MEMORY_BUDGET: str = os.getenv("STANDBY_MEMORY_BUDGET", "8G")
+    STANDBY_WARMUP_TIMEOUT: float = float(os.getenv("STANDBY_WARMUP_TIMEOUT", "600"))
+    STANDBY_REFILL_INTERVAL: int = int(os.getenv("STANDBY_REFILL_INTERVAL", "60"))
+    
+    # Outbound HTTP
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "60"))
+    HTTP_HEAD_CACHE_TTL: float = float(os.getenv("HTTP_HEAD_CACHE_TTL", "60"))
+    
+    # Modpack Cache
+    MODPACK_CACHE_ENABLED: bool = os.getenv("MODPACK_CACHE_ENABLED", "true").lower() == "true"
+    MODPACK_CACHE_DIR: str = os.getenv("MODPACK_CACHE_DIR", "data/modpacks")
+    # Where the Docker daemon sees MODPACK_CACHE_DIR; differs when the bot runs in a container
+    MODPACK_CACHE_MOUNT_DIR: str = os.getenv("MODPACK_CACHE_MOUNT_DIR", "")
+    MODPACK_CACHE_QUOTA: str = os.getenv("MODPACK_CACHE_QUOTA", "20G")
+    MODPACK_DOWNLOAD_TIMEOUT: float = float(os.getenv("MODPACK_DOWNLOAD_TIMEOUT", "1800"))
     
     # File Paths
     TEMPLATES_FILE: str = os.getenv("TEMPLATES_FILE", "config/templates.json")
+    TEMPLATE_RELOAD_INTERVAL: float = float(os.getenv("TEMPLATE_RELOAD_INTERVAL", "5"))
     SERVERS_FILE: str = os.getenv("SERVERS_FILE", "data/active_servers.json")
     
+    # State Storage ("sqlite", "json" or "redis")
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "sqlite")
+    STATE_DB_FILE: str = os.getenv("STATE_DB_FILE", "data/active_servers.db")
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    REDIS_KEY_PREFIX: str = os.getenv("REDIS_KEY_PREFIX", "minecraft")
+    REDIS_LOCK_TIMEOUT: float = float(os.getenv("REDIS_LOCK_TIMEOUT", "300"))
+    # Seconds a server lock outlives a replica that dies holding it; renewed while held
+    REDIS_LOCK_LEASE: float = float(os.getenv("REDIS_LOCK_LEASE", "30"))
+    
+    # Bulk Operations
+    BULK_CONCURRENCY: int = int(os.getenv("BULK_CONCURRENCY", "10"))
+    BULK_PROGRESS_INTERVAL: float = float(os.getenv("BULK_PROGRESS_INTERVAL", "2"))
+    
+    # Rate Limiting (token buckets: capacity is the burst, refilled at PER_MINUTE tokens a minute)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_USER_CAPACITY: float = float(os.getenv("RATE_LIMIT_USER_CAPACITY", "30"))
+    RATE_LIMIT_USER_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_USER_PER_MINUTE", "20"))
+    RATE_LIMIT_GUILD_CAPACITY: float = float(os.getenv("RATE_LIMIT_GUILD_CAPACITY", "80"))
+    RATE_LIMIT_GUILD_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_GUILD_PER_MINUTE", "60"))
+    RATE_LIMIT_GLOBAL_CAPACITY: float = float(os.getenv("RATE_LIMIT_GLOBAL_CAPACITY", "200"))
+    RATE_LIMIT_GLOBAL_PER_MINUTE: float = float(os.getenv("RATE_LIMIT_GLOBAL_PER_MINUTE", "150"))
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+    RATE_LIMIT_MAX_QUEUED: int = int(os.getenv("RATE_LIMIT_MAX_QUEUED", "3"))
+    # Token cost per command, on top of the built-in defaults (e.g. "create_server=10,server_logs=3")
+    COMMAND_COSTS: Dict[str, float] = {
+        name.strip(): float(cost)
+        for name, cost in (
+            entry.split("=", 1) for entry in os.getenv("COMMAND_COSTS", "").split(",") if "=" in entry
+        )
+    }
+    
     # Server Defaults
     DEFAULT_MEMORY: str = os.getenv("DEFAULT_MEMORY", "2G")
     DEFAULT_PORT_RANGE_START: int = int(os.getenv("DEFAULT_PORT_RANGE_START", "25565"))
     DEFAULT_PORT_RANGE_END: int = int(os.getenv("DEFAULT_PORT_RANGE_END", "25600"))
+    DEFAULT_CPUS: float = float(os.getenv("DEFAULT_CPUS", "2"))
+    
+    # Host Capacity
+    CONTAINER_MEMORY_OVERHEAD: float = float(os.getenv("CONTAINER_MEMORY_OVERHEAD", "0.25"))
+    HOST_RESERVED_MEMORY: str = os.getenv("HOST_RESERVED_MEMORY", "1G")
+    CPU_OVERCOMMIT: float = float(os.getenv("CPU_OVERCOMMIT", "1.0"))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "300"))
+    CAPACITY_REFRESH_INTERVAL: float = float(os.getenv("CAPACITY_REFRESH_INTERVAL", "30"))
+    
+    # Telemetry (Server List Ping and RCON)
+    TELEMETRY_ENABLED: bool = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+    TELEMETRY_INTERVAL: float = float(os.getenv("TELEMETRY_INTERVAL", "30"))
+    TELEMETRY_TIMEOUT: float = float(os.getenv("TELEMETRY_TIMEOUT", "5"))
+    TELEMETRY_HISTORY: int = int(os.getenv("TELEMETRY_HISTORY", "2880"))
+    TELEMETRY_CONCURRENCY: int = int(os.getenv("TELEMETRY_CONCURRENCY", "50"))
+    # Where ports published by the local daemon are reachable (e.g. host.docker.internal inside Compose)
+    TELEMETRY_LOCAL_ADDRESS: str = os.getenv("TELEMETRY_LOCAL_ADDRESS", "127.0.0.1")
+    # Host address new servers publish RCON on; use the host's private IP for remote daemons
+    RCON_BIND_ADDRESS: str = os.getenv("RCON_BIND_ADDRESS", "127.0.0.1")
+    
+    # Resource Stats
+    STATS_ENABLED: bool = os.getenv("STATS_ENABLED", "true").lower() == "true"
+    # Seconds per stored sample and hours kept per server
+    STATS_RESOLUTION: int = int(os.getenv("STATS_RESOLUTION", "10"))
+    STATS_RETENTION_HOURS: float = float(os.getenv("STATS_RETENTION_HOURS", "24"))
+    # Containers beyond this many streams are polled once per resolution instead
+    STATS_MAX_STREAMS: int = int(os.getenv("STATS_MAX_STREAMS", "64"))
+    
+    # Hibernation (needs telemetry, and the bot must be able to bind server ports on the local host)
+    HIBERNATION_ENABLED: bool = os.getenv("HIBERNATION_ENABLED", "false").lower() == "true"
+    HIBERNATION_IDLE_MINUTES: float = float(os.getenv("HIBERNATION_IDLE_MINUTES", "30"))
+    HIBERNATION_CHECK_INTERVAL: float = float(os.getenv("HIBERNATION_CHECK_INTERVAL", "60"))
+    HIBERNATION_LISTEN_ADDRESS: str = os.getenv("HIBERNATION_LISTEN_ADDRESS", "0.0.0.0")
+    HIBERNATION_MOTD: str = os.getenv("HIBERNATION_MOTD", "💤 {name} is sleeping. Join to wake it up!")
+    
+    # World Backups (content-defined chunks, deduplicated across snapshots and servers)
+    BACKUP_DIR: str = os.getenv("BACKUP_DIR", "backups")
+    # Hours between scheduled backups of every server; 0 turns them off
+    BACKUP_INTERVAL_HOURS: float = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))
+    BACKUP_KEEP: int = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_COMPRESSION_LEVEL: int = int(os.getenv("BACKUP_COMPRESSION_LEVEL", "3"))
+    BACKUP_TIMEOUT: float = float(os.getenv("BACKUP_TIMEOUT", "3600"))
+    
+    # World export, import and cloning
+    WORLD_TRANSFER_TIMEOUT: float = float(os.getenv("WORLD_TRANSFER_TIMEOUT", "3600"))
+    
+    # Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "0.0.0.0")
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "9100"))
+    
+    # Event Loop Watchdog
+    LOOP_WATCHDOG_ENABLED: bool = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+    LOOP_WATCHDOG_INTERVAL: float = float(os.getenv("LOOP_WATCHDOG_INTERVAL", "0.1"))
+    LOOP_WATCHDOG_THRESHOLD: float = float(os.getenv("LOOP_WATCHDOG_THRESHOLD", "0.5"))
+    LOOP_WATCHDOG_HISTORY: int = int(os.getenv("LOOP_WATCHDOG_HISTORY", "20"))
+    LOOP_WATCHDOG_STACK_DEPTH: int = int(os.getenv("LOOP_WATCHDOG_STACK_DEPTH", "30"))
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -7,8 +7,13 @@ from discord.ext import commands
 import logging
 from pathlib import Path
 import sys
+import time
 
 from config.settings import settings
+from src.utils.http_client import HttpClient
+from src.utils.loop_watchdog import LoopWatchdog
+from src.utils.metrics import COMMAND_SECONDS, MetricsServer
+from src.utils.rate_limiter import CommandRateLimiter, RateLimitExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +32,32 @@ class MinecraftBot(commands.Bot):
             intents=intents,
             help_command=commands.DefaultHelpCommand(no_category="Commands")
         )
+        # Shared by every cog for outbound HTTP; opened in setup_hook
+        self.http_client = HttpClient()
+        self.metrics_server = MetricsServer() if settings.METRICS_ENABLED else None
+        self.loop_watchdog = LoopWatchdog() if settings.LOOP_WATCHDOG_ENABLED else None
+        # Shared by every cog; applied after argument parsing, before the command runs
+        self.rate_limiter = CommandRateLimiter() if settings.RATE_LIMIT_ENABLED else None
+        if self.rate_limiter:
+            self.before_invoke(self.apply_rate_limit)
         
     async def setup_hook(self):
         """Load cogs and perform setup tasks"""
         logger.info("Setting up bot...")
         
+        # Started first so stalls during startup are caught too
+        if self.loop_watchdog:
+            self.loop_watchdog.start()
+        
+        await self.http_client.start()
+        
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                logger.error(f"Could not start metrics endpoint: {e}")
+                self.metrics_server = None
+        
         # Load cogs
         cogs_to_load = [
             "cogs.minecraft_manager",
@@ -47,6 +73,49 @@ class MinecraftBot(commands.Bot):
         
         logger.info("Bot setup completed")
     
+    async def close(self):
+        """Close the shared HTTP client and metrics endpoint along with the Discord connection"""
+        await super().close()
+        await self.http_client.close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.loop_watchdog:
+            await self.loop_watchdog.stop()
+    
+    async def invoke(self, ctx):
+        """Invoke a command and record how long it took, including failures"""
+        if ctx.command is None:
+            await super().invoke(ctx)
+            return
+        started = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            COMMAND_SECONDS.labels(
+                ctx.cog.qualified_name if ctx.cog else 'none',
+                ctx.command.qualified_name,
+                'error' if ctx.command_failed else 'ok'
+            ).observe(time.perf_counter() - started)
+    
+    async def apply_rate_limit(self, ctx):
+        """Take the command's tokens, queueing it if the user, guild or bot is over its limit"""
+        command = ctx.command.qualified_name
+        guild = ctx.guild.id if ctx.guild else f"dm:{ctx.author.id}"
+
+        async def announce_queued(estimate: float):
+            await ctx.send(f"⏳ Too many commands at once; `!{command}` is queued and should run in about {estimate:.0f}s.")
+
+        try:
+            await self.rate_limiter.acquire(
+                ctx.author.id, guild, self.rate_limiter.cost(command), on_queued=announce_queued
+            )
+        except RateLimitExceeded as e:
+            bucket = {'user': commands.BucketType.user, 'guild': commands.BucketType.guild}.get(
+                e.scope, commands.BucketType.default
+            )
+            capacity, rate = self.rate_limiter.limits.get(e.scope, self.rate_limiter.limits['global'])
+            raise commands.CommandOnCooldown(commands.Cooldown(capacity, capacity / rate if rate else 0), e.retry_after, bucket)
+    
     async def on_ready(self):
         """Event handler for when the bot is ready"""
         logger.info(f'{self.user} has connected to Discord!')
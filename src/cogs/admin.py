@@ -5,6 +5,7 @@ Administrative commands cog
 import discord
 from discord.ext import commands
 import logging
+import time
 from src.utils.permissions import PermissionChecker
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,54 @@ class AdminCommands(commands.Cog):
         embed.add_field(name="Commands", value=len(self.bot.commands), inline=True)
         embed.add_field(name="Latency", value=f"{self.bot.latency * 1000:.2f}ms", inline=True)
         
+        http_hosts = self.bot.http_client.latency_summary()
+        if http_hosts:
+            lines = [
+                f"`{host}`: {stats['requests']} req, p50 {stats['p50'] * 1000:.0f}ms, "
+                f"p95 {stats['p95'] * 1000:.0f}ms, {stats['errors']} errors"
+                for host, stats in sorted(http_hosts.items(), key=lambda item: -item[1]['requests'])[:10]
+            ]
+            embed.add_field(name="Outbound HTTP", value="\n".join(lines)[:1024], inline=False)
+        
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='loop_stalls')
+    @commands.is_owner()
+    async def loop_stalls(self, ctx, count: int = 5):
+        """Show recent event loop stalls and what was blocking the loop"""
+        watchdog = self.bot.loop_watchdog
+        if watchdog is None:
+            await ctx.send("❌ The event loop watchdog is disabled (`LOOP_WATCHDOG_ENABLED`).")
+            return
+        
+        embed = discord.Embed(title="Event Loop Stalls", color=0x0099ff)
+        embed.add_field(
+            name="Drift",
+            value=f"p50 {watchdog.percentile(0.5) * 1000:.1f}ms · p99 {watchdog.percentile(0.99) * 1000:.1f}ms · "
+                  f"max {watchdog.max_drift * 1000:.0f}ms",
+            inline=False
+        )
+        embed.set_footer(text=f"Stalls are loop pauses over {watchdog.threshold * 1000:.0f}ms")
+        
+        stalls = list(watchdog.stalls)[-max(1, min(count, 10)):]
+        if not stalls:
+            embed.description = "No stalls recorded since startup."
+            await ctx.send(embed=embed)
+            return
+        
+        for stall in reversed(stalls):
+            ago = time.time() - stall.started_at
+            embed.add_field(
+                name=f"{stall.duration * 1000:.0f}ms · {ago:.0f}s ago",
+                value=f"`{stall.task}`\n{stall.culprit}"[:1024],
+                inline=False
+            )
         await ctx.send(embed=embed)
+        
+        # The newest stack, innermost frames last as in a traceback
+        stack = stalls[-1].format_stack()
+        if stack:
+            await ctx.send(f"```\n{stack[-1900:]}\n```")
     
     @commands.command(name='reload_cog')
     @commands.is_owner()
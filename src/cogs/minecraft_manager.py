@@ -5,64 +5,403 @@ Minecraft server management cog
 import discord
 from discord.ext import commands
 import docker
-import json
 import asyncio
-from typing import Dict, Optional
+import functools
+import io
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import logging
-from pathlib import Path
+import time
+from datetime import datetime
 
-from src.utils.docker_helper import DockerHelper
+from src.utils.backup import BackupEngine, BackupError
+from src.utils.bulk import BulkProgress, expand_names, run_bulk
+from src.utils.docker_helper import ImageNotCachedError
+from src.utils.host_pool import DockerHost, DockerHostPool
+from src.utils.state_store import create_state_store
+from src.utils.template_registry import TemplateRegistry
+from src.utils.stats_collector import parse_window, sparkline, summarize
+from src.utils.status_poller import ContainerStatus
+from src.utils.telemetry import Telemetry, saving_paused
+from src.utils.event_watcher import ServerEvent
+from src.utils.hibernation import HibernationManager
+from src.utils.log_streamer import LogRelay, iter_log_lines
+from src.utils.metrics import REGISTRY as METRICS_REGISTRY, STATE_WRITE_SECONDS, ContainerCollector
+from src.utils.modpack_cache import ModpackCache
+from src.utils.modpack_helper import ModpackHelper
+from src.utils.port_allocator import PortUnavailableError
+from src.utils.scheduler import InsufficientCapacityError, template_resources
 from src.utils.permissions import PermissionChecker
 from src.utils.validators import ServerValidator
+from src.utils.world_transfer import (
+    SYNC_MARGIN, WORLD_IMAGE_LABEL, WORLD_LABEL, TransferStats, WorldNotFoundError, transfer_world, world_volume
+)
 from src.models.server import MinecraftServer
 from src.models.template import ServerTemplate
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+STATUS_ICONS = {
+    'running': '🟢',
+    'hibernating': '💤',
+    'restarting': '🟡',
+    'paused': '🟡',
+    'created': '⚪',
+    'creating': '⚪',
+    'exited': '🔴',
+    'dead': '🔴',
+}
+
+
+# `!create_server name template clone=<server or world>` starts from a copy of that world
+CLONE_PREFIX = "clone="
+
+
+class ServerExistsError(Exception):
+    """Raised when creating a server whose name is already taken"""
+
 
 class MinecraftServerManager(commands.Cog):
     """Cog for managing Minecraft servers"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.docker_helper = DockerHelper()
+        self.hosts = DockerHostPool.from_settings(on_event=self._on_server_event)
         self.permission_checker = PermissionChecker()
         self.validator = ServerValidator()
-        self.templates = self.load_templates()
-        self.active_servers = self.load_active_servers()
+        self.templates = TemplateRegistry()
+        self.templates.reload()
+        self.templates.add_listener(self._on_templates_changed)
+        self._templates_embed: Optional[discord.Embed] = None
+        self.state_store = create_state_store()
+        self.modpack_cache = ModpackCache(
+            in_use=self.modpacks_in_use, http=bot.http_client
+        ) if settings.MODPACK_CACHE_ENABLED else None
+        self._active_servers: Optional[Dict] = None
+        self._container_collector = ContainerCollector(self.container_states)
+        self.hibernation = HibernationManager(
+            self.hibernation_candidates, hibernate=self._hibernate_server, wake=self._wake_server
+        )
+        self.backups = BackupEngine()
+        self.state_store.add_listener(self._on_state_change)
+    
+    @property
+    def active_servers(self) -> Dict:
+        """Server records, loaded from the state store in cog_load"""
+        if self._active_servers is None:
+            raise RuntimeError("Server records are not loaded until the cog is loaded")
+        return self._active_servers
+    
+    def _on_state_change(self, name: str, record: Optional[Dict]):
+        """Apply a server change made by another bot replica"""
+        if self._active_servers is None:
+            return
+        previous = self._active_servers.get(name)
+        if previous and previous.get('port') and (record is None or record.get('port') != previous['port']):
+            host = self.server_host(previous)
+            if host:
+                host.ports.release(previous['port'])
+        if record is None:
+            self._active_servers.pop(name, None)
+        else:
+            self._active_servers[name] = record
+            host = self.server_host(record)
+            if host and record.get('port'):
+                host.ports.mark(record['port'])
+    
+    async def cog_load(self):
+        """Start background tasks when the cog is loaded"""
+        await self.state_store.start()
+        self._active_servers = await self.load_active_servers()
+        templates = self.templates.as_dict()
+        await asyncio.gather(*(
+            host.load_ports(server['port'] for _, server in self.host_servers(host) if server.get('port'))
+            for host in self.hosts
+        ))
+        for host in self.hosts:
+            host.start(
+                self.template_images(),
+                templates,
+                in_use={server.get('volume_name') or f"minecraft_{name}" for name, server in self.host_servers(host)}
+            )
+        self.templates.start()
+        METRICS_REGISTRY.register(self._container_collector)
+        if settings.HIBERNATION_ENABLED:
+            # Take over the ports of servers that were hibernating when the bot stopped
+            for name, info in list(self.active_servers.items()):
+                if info.get('hibernated_at') and info.get('port'):
+                    await self.hibernation.sleep(name, info['port'])
+            self.hibernation.start()
+        self.backups.start(self.scheduled_backups)
+    
+    async def cog_unload(self):
+        """Release Docker resources when the cog is unloaded"""
+        METRICS_REGISTRY.unregister(self._container_collector)
+        await self.hibernation.stop()
+        await self.backups.stop()
+        await self.templates.stop()
+        await self.hosts.stop()
+        self.hosts.close()
+        await self.state_store.stop()
+        self.state_store.close()
+    
+    async def _on_server_event(self, host: DockerHost, event: ServerEvent):
+        """Record a container state change and announce it"""
+        if event.state:
+            host.scheduler.mark_stale()
+        
+        info = self.active_servers.get(event.server_name)
+        if info is None or (info.get('host') or self.hosts.default) != host.name:
+            return
+        
+        if event.state and info.get('status') != event.state:
+            info['status'] = event.state
+            await self.save_active_servers(event.server_name)
         
-    def load_templates(self) -> Dict:
-        """Load server templates from JSON file"""
+        if event.action == 'start':
+            message = f"🟢 Server `{event.server_name}` started."
+        elif event.action == 'die' and not info.get('hibernated_at'):
+            message = f"🔴 Server `{event.server_name}` stopped (exit code {event.exit_code})."
+        elif event.action == 'oom':
+            message = f"💥 Server `{event.server_name}` ran out of memory."
+        elif event.action == 'health_status' and event.health == 'unhealthy':
+            message = f"🟡 Server `{event.server_name}` is unhealthy."
+        else:
+            return
+        await self.notify(message)
+    
+    async def notify(self, message: str):
+        """Post a message to the notification channel, if one is configured"""
+        if not settings.NOTIFY_CHANNEL_ID:
+            return
+        channel = self.bot.get_channel(settings.NOTIFY_CHANNEL_ID)
+        if channel is not None:
+            await channel.send(message)
+    
+    def hibernation_candidates(self):
+        """Yield running servers on local hosts with their telemetry and idle timeout in seconds"""
+        for name, info in list(self.active_servers.items()):
+            host = self.server_host(info)
+            status = self.container_status(name, info)
+            if host is None or not host.local or not info.get('port') or not status or status.state != 'running':
+                continue
+            template = self.server_template(info)
+            minutes = template.idle_timeout if template and template.idle_timeout is not None else settings.HIBERNATION_IDLE_MINUTES
+            yield name, host.telemetry.get(name), minutes * 60
+    
+    async def _hibernate_server(self, name: str) -> int:
+        """Stop an idle server and mark it hibernating; return the port to wake it on"""
+        info = self.active_servers[name]
+        host = self.hosts.for_server(info)
+        # Marked first so the stop event is not announced as a crash
+        info['hibernated_at'] = datetime.now().isoformat()
         try:
-            with open(settings.TEMPLATES_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.error(f"Templates file not found: {settings.TEMPLATES_FILE}")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing templates file: {e}")
-            return {}
+            await host.docker_helper.stop_container(info.get('container_id') or f"minecraft_{name}")
+        except Exception:
+            info.pop('hibernated_at', None)
+            raise
+        await self.save_active_servers(name)
+        await self.notify(f"💤 Server `{name}` is hibernating; it wakes up when someone joins.")
+        return info['port']
+    
+    async def _wake_server(self, name: str):
+        """Start a hibernated server because someone tried to join"""
+        info = self.active_servers.get(name)
+        if info is None:
+            return
+        host = self.hosts.for_server(info)
+        await host.docker_helper.start_container(info.get('container_id') or f"minecraft_{name}")
+        await self._clear_hibernation(name, info)
+        await self.notify(f"⏰ Server `{name}` is waking up for a player.")
+    
+    async def _clear_hibernation(self, name: str, info: Dict):
+        if info.pop('hibernated_at', None):
+            await self.save_active_servers(name)
+    
+    async def backup_server(self, name: str):
+        """Snapshot a server's world, quiescing saves over RCON while it is running"""
+        info = self.active_servers[name]
+        host = self.hosts.for_server(info)
+        console = await host.telemetry.console(name) if settings.TELEMETRY_ENABLED else None
+        snapshot = await self.backups.backup(
+            name, info.get('container_id') or f"minecraft_{name}", host.docker_helper, console=console
+        )
+        self.backups.prune(name)
+        return snapshot
+    
+    def scheduled_backups(self):
+        """Yield a backup job for every server, for the backup schedule"""
+        for name, info in list(self.active_servers.items()):
+            if info.get('status') == 'creating':
+                continue
+            yield functools.partial(self.backup_server, name)
+    
+    async def find_world(self, name: str):
+        """Return the host and volume of an exported world, or None"""
+        for host in self.hosts:
+            volume = await host.docker_helper.get_volume(world_volume(name))
+            if volume is not None:
+                return host, volume
+        return None
+    
+    @asynccontextmanager
+    async def open_world(self, name: str):
+        """Yield the Docker helper, container and RCON console to read a server's or exported world from"""
+        info = self.active_servers.get(name)
+        if info is not None:
+            host = self.hosts.for_server(info)
+            console = await host.telemetry.console(name) if settings.TELEMETRY_ENABLED else None
+            yield host.docker_helper, info.get('container_id') or f"minecraft_{name}", console
+            return
+        found = await self.find_world(name)
+        if found is None:
+            raise WorldNotFoundError(f"No server or exported world named '{name}'.")
+        host, volume = found
+        docker_helper = host.docker_helper
+        container_id = await docker_helper.create_volume_container(volume.name, volume.attrs['Labels'][WORLD_IMAGE_LABEL])
+        try:
+            yield docker_helper, container_id, None
+        finally:
+            await docker_helper.remove_container(container_id)
+    
+    async def copy_world(self, source: str, docker_helper, container_id: str,
+                         since: Optional[float] = None) -> Tuple[TransferStats, float]:
+        """Stream a world into a container's volume; return what was sent and the sync time
+
+        A running source has saving paused for the copy, so the sync time
+        covers every chunk it had saved.
+        """
+        async with self.open_world(source) as (source_helper, source_id, console):
+            async with saving_paused(console, source):
+                synced_at = time.time()
+                stats = await transfer_world(
+                    source_helper, source_id, docker_helper, container_id,
+                    since=since, timeout=settings.WORLD_TRANSFER_TIMEOUT
+                )
+        return stats, synced_at
     
-    def load_active_servers(self) -> Dict:
-        """Load active servers from JSON file"""
+    async def clone_world(self, source: str, host: DockerHost, volume_name: str, image: str) -> Dict:
+        """Fill a new server's volume with a copy of a world before its container exists"""
+        docker_helper = host.docker_helper
+        container_id = await docker_helper.create_volume_container(volume_name, image)
         try:
-            with open(settings.SERVERS_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing servers file: {e}")
+            # The volume may be left over from a removed server of the same name
+            await docker_helper.clear_volume(volume_name, image)
+            stats, synced_at = await self.copy_world(source, docker_helper, container_id)
+        finally:
+            await docker_helper.remove_container(container_id)
+        logger.info(f"Cloned the world of {source} into {volume_name}: {stats.bytes / 1024 ** 2:.0f}MB")
+        return {'name': source, 'synced_at': synced_at}
+    
+    def server_host(self, info: Dict) -> Optional[DockerHost]:
+        """Return the Docker host a server lives on, if it is configured"""
+        try:
+            return self.hosts.for_server(info)
+        except KeyError:
+            return None
+    
+    def host_servers(self, host: DockerHost):
+        """Yield the server records that live on a host"""
+        for name, server in self.active_servers.items():
+            if (server.get('host') or self.hosts.default) == host.name:
+                yield name, server
+    
+    def server_template(self, info: Dict) -> Optional[ServerTemplate]:
+        """Return the template a server was created from, if it still exists"""
+        if info.get('template_key'):
+            return self.templates.get(info['template_key'])
+        # Records from before template_key only carry the display name
+        return next((t for t in self.templates.as_dict().values() if t.name == info.get('template_name')), None)
+    
+    async def mark_recorded_ports(self, host: DockerHost):
+        """Mark the ports of every stored server on a host, including ones not yet announced"""
+        for record in (await self.state_store.aload_all()).values():
+            if record.get('port') and (record.get('host') or self.hosts.default) == host.name:
+                host.ports.mark(record['port'])
+    
+    def container_status(self, server_name: str, info: Dict) -> Optional[ContainerStatus]:
+        """Return the last known container status of a server"""
+        host = self.server_host(info)
+        return host.status_poller.get(server_name) if host else None
+    
+    def server_state(self, server_name: str, info: Dict) -> str:
+        """The container state, ``hibernating`` for servers stopped while idle, or ``creating``"""
+        status = self.container_status(server_name, info)
+        if status is None and info.get('status') == 'creating':
+            return 'creating'
+        state = status.state if status else 'missing'
+        if info.get('hibernated_at') and state != 'running':
+            return 'hibernating'
+        return state
+    
+    def server_telemetry(self, server_name: str, info: Dict) -> Optional[Telemetry]:
+        """Return the latest player and TPS sample of a server"""
+        host = self.server_host(info)
+        return host.telemetry.get(server_name) if host else None
+    
+    def container_states(self):
+        """Yield each server's host and last known container state"""
+        for name, info in list(self.active_servers.items()):
+            status = self.container_status(name, info)
+            yield info.get('host') or self.hosts.default, status.state if status else 'missing'
+    
+    def modpacks_in_use(self) -> set:
+        """Digests of cached modpacks mounted by existing servers"""
+        return {server['modpack_sha256'] for server in self.active_servers.values() if server.get('modpack_sha256')}
+    
+    def template_images(self) -> set:
+        """Collect the Docker images referenced by the loaded templates"""
+        return self.templates.images()
+    
+    def _on_templates_changed(self, changed: set, removed: set):
+        """Apply an edited templates file without reloading the cog"""
+        self._templates_embed = None
+        templates = self.templates.as_dict()
+        for host in self.hosts:
+            host.update_templates(self.template_images(), templates)
+    
+    def templates_embed(self) -> discord.Embed:
+        """The list_templates embed, rebuilt only when templates change"""
+        if self._templates_embed is None:
+            embed = discord.Embed(title="Available Server Templates", color=0x00ff00)
+            for name, template in self.templates.items():
+                embed.add_field(
+                    name=template.name,
+                    value=f"**Type:** {template.environment.get('TYPE', 'Unknown')}\n"
+                          f"**Memory:** {template.environment.get('MEMORY', 'N/A')}\n"
+                          f"**Description:** {template.description}",
+                    inline=False
+                )
+            self._templates_embed = embed
+        return self._templates_embed
+    
+    async def load_active_servers(self) -> Dict:
+        """Load active servers from the state store"""
+        try:
+            return await self.state_store.aload_all()
+        except Exception as e:
+            logger.error(f"Error loading servers: {e}")
             return {}
     
-    def save_active_servers(self):
-        """Save active servers to JSON file"""
+    async def save_active_servers(self, server_name: Optional[str] = None):
+        """Persist active servers; pass a name to write only that server"""
+        if server_name is None:
+            operation = 'upsert_many'
+        elif server_name in self.active_servers:
+            operation = 'upsert'
+        else:
+            operation = 'delete'
         try:
-            Path(settings.SERVERS_FILE).parent.mkdir(parents=True, exist_ok=True)
-            with open(settings.SERVERS_FILE, 'w') as f:
-                json.dump(self.active_servers, f, indent=2)
+            with STATE_WRITE_SECONDS.labels(settings.STATE_BACKEND, operation).time():
+                if operation == 'upsert_many':
+                    await self.state_store.aupsert_many(self.active_servers.items())
+                elif operation == 'upsert':
+                    await self.state_store.aupsert(server_name, self.active_servers[server_name])
+                else:
+                    await self.state_store.adelete(server_name)
         except Exception as e:
-            logger.error(f"Error saving servers file: {e}")
+            logger.error(f"Error saving servers: {e}")
     
     @commands.command(name='list_templates')
     async def list_templates(self, ctx):
@@ -75,27 +414,145 @@ class MinecraftServerManager(commands.Cog):
             await ctx.send("❌ No templates available.")
             return
         
-        embed = discord.Embed(title="Available Server Templates", color=0x00ff00)
+        await ctx.send(embed=self.templates_embed())
+    
+    async def provision_server(self, server_name: str, template_name: str, created_by: str,
+                               port: Optional[int] = None, modpack_url: Optional[str] = None,
+                               notify: Optional[Callable[[str], Awaitable]] = None,
+                               clone_from: Optional[str] = None) -> Tuple[MinecraftServer, object, DockerHost, Optional[str]]:
+        """Place, record and start a new server; the caller has validated the inputs
+
+        Failures raise instead of replying, so single and bulk creation share
+        this path. ``notify`` receives progress messages such as a queued
+        admission; bulk creation leaves it unset and reports per server.
+        ``clone_from`` names a server or exported world whose world is copied
+        into the new server's volume before its first start.
+        """
+        if server_name in self.active_servers:
+            raise ServerExistsError(f"Server '{server_name}' already exists.")
+        
+        template = self.templates.get(template_name)
         
-        for name, template in self.templates.items():
-            template_obj = ServerTemplate.from_dict(name, template)
-            embed.add_field(
-                name=template_obj.name,
-                value=f"**Type:** {template_obj.environment.get('TYPE', 'Unknown')}\n"
-                      f"**Memory:** {template_obj.environment.get('MEMORY', 'N/A')}\n"
-                      f"**Description:** {template_obj.description}",
-                inline=False
+        # Pick the Docker host with room for this template
+        memory, nano_cpus = template_resources(template)
+        host = await self.hosts.place(memory, nano_cpus)
+        
+        if not host.image_manager.is_ready(template.image):
+            host.image_manager.schedule_pull(template.image)
+            raise ImageNotCachedError(
+                f"The image for template '{template_name}' is still being downloaded. Try again in a few minutes."
             )
         
-        await ctx.send(embed=embed)
+        # Download the modpack once on the bot side and mount it, rather than in every container
+        modpack = None
+        if modpack_url and self.modpack_cache and host.local:
+            if notify and not self.modpack_cache.get(modpack_url):
+                await notify("📦 Downloading modpack, this may take a few minutes...")
+            try:
+                modpack = await self.modpack_cache.fetch(modpack_url, pin=True)
+            except Exception as e:
+                logger.warning(f"Modpack cache unavailable for {modpack_url}, the server will download it: {e}")
+        
+        try:
+            async with self.state_store.lock(server_name):
+                # Another replica may have created the server since our view was loaded
+                if server_name in self.active_servers or await self.state_store.aget(server_name):
+                    raise ServerExistsError(f"Server '{server_name}' already exists.")
+                
+                # Ports are per host, so choosing one takes a host-wide lock as well
+                async with self.state_store.lock(f"ports:{host.name}"):
+                    if self.state_store.shared:
+                        await self.mark_recorded_ports(host)
+                    
+                    # Take the port without awaiting so concurrent creations in this process cannot share it
+                    if port:
+                        host.ports.reserve(port)
+                    else:
+                        port = host.ports.allocate()
+                    
+                    # Modpack and cloned servers need a fresh volume; everything else can boot from a warm standby
+                    standby_volume = None if modpack_url or clone_from else host.standby_pool.claim(template_name)
+                    
+                    # Create server instance with modpack URL
+                    server = MinecraftServer(
+                        name=server_name,
+                        template=template,
+                        port=port,
+                        created_by=created_by,
+                        status="creating",
+                        modpack_url=modpack_url,
+                        volume_name=standby_volume or "",
+                        host=host.name,
+                        modpack_sha256=modpack.sha256 if modpack else "",
+                        template_key=template_name
+                    )
+                    
+                    # The record reserves the name and port for other replicas, so the lock
+                    # is released before the world copy and the wait for capacity
+                    try:
+                        await self.state_store.aupsert(server_name, server.to_dict())
+                    except Exception:
+                        host.ports.release(port)
+                        if standby_volume:
+                            host.standby_pool.release(template_name, standby_volume)
+                        raise
+                self.active_servers[server_name] = server.to_dict()
+            
+            async def announce_queued():
+                if notify:
+                    await notify(f"⏳ The host is at capacity; `{server_name}` is queued until resources free up.")
+            
+            # Create container using Docker helper once the host has room for it
+            world_source = None
+            try:
+                if clone_from:
+                    if notify:
+                        await notify(f"📦 Copying the world of `{clone_from}`...")
+                    world_source = await self.clone_world(clone_from, host, server.volume_name,
+                                                          host.image_manager.resolve(template.image))
+                async with host.scheduler.admit(server_name, memory, nano_cpus, on_wait=announce_queued):
+                    container = await host.docker_helper.create_server(
+                        server,
+                        image=host.image_manager.resolve(template.image),
+                        modpack_file=self.modpack_cache.mount_path(modpack.sha256) if modpack else None
+                    )
+            except Exception:
+                self.active_servers.pop(server_name, None)
+                await self.save_active_servers(server_name)
+                host.ports.release(port)
+                if standby_volume:
+                    host.standby_pool.release(template_name, standby_volume)
+                raise
+            
+            # Store server info
+            server.status = "created"
+            server.container_id = container.id
+            self.active_servers[server_name] = server.to_dict()
+            if world_source:
+                self.active_servers[server_name]['world_source'] = world_source
+            await self.save_active_servers(server_name)
+        finally:
+            # Saved records keep their modpack from eviction; until then the pin does
+            if modpack:
+                self.modpack_cache.unpin(modpack.sha256)
+        
+        return server, container, host, standby_volume
     
     @commands.command(name='create_server')
-    async def create_server(self, ctx, server_name: str, template_name: str, port: int = None, modpack_url: str = None):
-        """Create a new Minecraft server from template with optional modpack URL"""
+    async def create_server(self, ctx, server_name: str, template_name: str, port: Optional[int] = None, modpack_url: str = None):
+        """Create a new Minecraft server from template with optional modpack URL or clone=<world>"""
         if not self.permission_checker.has_required_role(ctx.author):
             await ctx.send("❌ You don't have permission to use this command.")
             return
         
+        # A port that is not a number is left for this argument, so `clone=` may follow the template
+        clone_from = None
+        if modpack_url and modpack_url.startswith(CLONE_PREFIX):
+            clone_from, modpack_url = modpack_url[len(CLONE_PREFIX):], None
+            if not clone_from:
+                await ctx.send("❌ Name the server or exported world to clone, e.g. `clone=lobby`.")
+                return
+        
         # Validate inputs
         if not self.validator.validate_server_name(server_name):
             await ctx.send("❌ Invalid server name. Use only letters, numbers, and underscores.")
@@ -118,39 +575,567 @@ class MinecraftServerManager(commands.Cog):
             await ctx.send("❌ Invalid modpack URL. Must be a direct link to a .zip file.")
             return
         
+        # The HEAD response is cached, so the modpack cache's freshness check reuses it
+        if modpack_url and not await ModpackHelper.validate_modpack_url(modpack_url, client=self.bot.http_client):
+            await ctx.send("❌ The modpack URL is not reachable or does not point to a .zip file.")
+            return
+        
         try:
-            template = ServerTemplate.from_dict(template_name, self.templates[template_name])
-            
-            # Create server instance with modpack URL
-            server = MinecraftServer(
-                name=server_name,
-                template=template,
-                port=port,
-                created_by=str(ctx.author),
-                modpack_url=modpack_url
+            server, container, host, standby_volume = await self.provision_server(
+                server_name, template_name, str(ctx.author),
+                port=port, modpack_url=modpack_url, notify=ctx.send, clone_from=clone_from
             )
             
-            # Create container using Docker helper
-            container = await self.docker_helper.create_server(server)
-            
-            # Store server info
-            self.active_servers[server_name] = server.to_dict()
-            self.active_servers[server_name]['container_id'] = container.id
-            self.save_active_servers()
-            
             embed = discord.Embed(title="✅ Server Created", color=0x00ff00)
             embed.add_field(name="Server Name", value=server_name, inline=True)
             embed.add_field(name="Template", value=template_name, inline=True)
-            embed.add_field(name="Port", value=port or "Auto-assigned", inline=True)
+            embed.add_field(name="Port", value=server.port, inline=True)
             embed.add_field(name="Container ID", value=container.short_id, inline=True)
+            if len(self.hosts) > 1:
+                embed.add_field(name="Host", value=host.name, inline=True)
+            if standby_volume:
+                embed.add_field(name="Provisioning", value="Warm standby", inline=True)
             if modpack_url:
-                embed.add_field(name="Modpack", value="Custom ZIP", inline=True)
+                embed.add_field(name="Modpack", value="Custom ZIP (cached)" if server.modpack_sha256 else "Custom ZIP", inline=True)
+            if clone_from:
+                embed.add_field(name="World", value=f"Cloned from {clone_from}", inline=True)
             await ctx.send(embed=embed)
             
+        except (ServerExistsError, WorldNotFoundError) as e:
+            await ctx.send(f"❌ {e}")
+        except ImageNotCachedError as e:
+            await ctx.send(f"⏳ {e}")
+        except InsufficientCapacityError as e:
+            await ctx.send(f"❌ Not enough host capacity for `{server_name}`: {e}")
+        except PortUnavailableError as e:
+            await ctx.send(f"❌ Cannot assign a port to `{server_name}`: {e}")
         except Exception as e:
             logger.error(f"Error creating server {server_name}: {e}")
             await ctx.send(f"❌ Error creating server: {str(e)}")
-                
+    
+    async def _run_bulk(self, ctx, title: str, names: List[str], operation: Callable[[str], Awaitable[Optional[str]]]):
+        """Run a bulk operation with one progress message and a final report"""
+        progress = BulkProgress(ctx.send, title, len(names))
+        await progress.start()
+        _, elapsed = await run_bulk(names, operation, progress=progress)
+        await progress.finish(elapsed, names)
+    
+    @commands.command(name='create_servers')
+    async def create_servers(self, ctx, template_name: str, *server_names: str):
+        """Create several servers from one template in parallel"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        if template_name not in self.templates:
+            await ctx.send(f"❌ Template '{template_name}' not found. Use `!list_templates` to see available templates.")
+            return
+        
+        names = list(dict.fromkeys(server_names))
+        if not names:
+            await ctx.send("❌ Give at least one server name, e.g. `!create_servers paper lobby1 lobby2`.")
+            return
+        
+        invalid = [name for name in names if not self.validator.validate_server_name(name)]
+        if invalid:
+            await ctx.send(f"❌ Invalid server names: {', '.join(invalid)}. Use only letters, numbers, and underscores.")
+            return
+        
+        created_by = str(ctx.author)
+        
+        async def create(name: str) -> str:
+            server, _, host, standby_volume = await self.provision_server(name, template_name, created_by)
+            detail = f"port {server.port}"
+            if len(self.hosts) > 1:
+                detail += f" on {host.name}"
+            return detail + (" (warm standby)" if standby_volume else "")
+        
+        await self._run_bulk(ctx, f"Creating {len(names)} '{template_name}' servers", names, create)
+    
+    async def _bulk_lifecycle(self, ctx, action: str, verb: str, patterns: Tuple[str, ...]):
+        """Start, stop or restart every server matching the given names or globs"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        if not patterns:
+            await ctx.send(f"❌ Give server names or patterns, e.g. `!{action}_servers lobby*`.")
+            return
+        
+        names, missing = expand_names(patterns, self.active_servers)
+        if missing:
+            await ctx.send(f"⚠️ No servers match: {', '.join(missing)}")
+        if not names:
+            return
+        
+        async def run(name: str) -> str:
+            info = self.active_servers.get(name)
+            if info is None:
+                raise KeyError("server was deleted")
+            host = self.hosts.for_server(info)
+            operation = getattr(host.docker_helper, f"{action}_container")
+            # A hibernated server's port is held by its listener until now
+            await self.hibernation.release(name)
+            await operation(info.get('container_id') or f"minecraft_{name}")
+            await self._clear_hibernation(name, info)
+            return ""
+        
+        await self._run_bulk(ctx, f"{verb} {len(names)} servers", names, run)
+    
+    @commands.command(name='start_servers')
+    async def start_servers(self, ctx, *patterns: str):
+        """Start servers by name or glob pattern"""
+        await self._bulk_lifecycle(ctx, 'start', "Starting", patterns)
+    
+    @commands.command(name='stop_servers')
+    async def stop_servers(self, ctx, *patterns: str):
+        """Stop servers by name or glob pattern"""
+        await self._bulk_lifecycle(ctx, 'stop', "Stopping", patterns)
+    
+    @commands.command(name='restart_servers')
+    async def restart_servers(self, ctx, *patterns: str):
+        """Restart servers by name or glob pattern"""
+        await self._bulk_lifecycle(ctx, 'restart', "Restarting", patterns)
+    
+    def _status_age_text(self) -> str:
+        """Describe how old the status snapshot is"""
+        if all(host.event_watcher.connected for host in self.hosts):
+            return "Live status from Docker events"
+        ages = [host.status_poller.age() for host in self.hosts]
+        if any(age is None for age in ages):
+            return "Status not collected yet"
+        return f"Status as of {max(ages):.0f}s ago"
+    
+    @commands.command(name='list_servers')
+    async def list_servers(self, ctx):
+        """List all servers with their last known status"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        if not self.active_servers:
+            await ctx.send("❌ No servers have been created yet.")
+            return
+        
+        lines = []
+        for name, info in sorted(self.active_servers.items()):
+            state = self.server_state(name, info)
+            telemetry = self.server_telemetry(name, info) if state == 'running' else None
+            players = (
+                f" · {telemetry.players_online}/{telemetry.players_max} players"
+                if telemetry and telemetry.players_online is not None else ""
+            )
+            lines.append(
+                f"{STATUS_ICONS.get(state, '⚫')} **{name}** · {state}{players} · {info.get('template_name', 'unknown')} · "
+                f"port {info.get('port') or 'auto'} · by {info.get('created_by') or 'unknown'}"
+            )
+        
+        description = ""
+        for index, line in enumerate(lines):
+            remaining = f"\n…and {len(lines) - index} more"
+            if len(description) + len(line) + len(remaining) + 1 > 4096:
+                description += remaining
+                break
+            description += f"{line}\n"
+        
+        embed = discord.Embed(title=f"Servers ({len(lines)})", description=description, color=0x00ff00)
+        embed.set_footer(text=self._status_age_text())
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='server_status')
+    async def server_status(self, ctx, server_name: str):
+        """Show detailed status information for a server"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        status = self.container_status(server_name, info)
+        state = self.server_state(server_name, info)
+        
+        embed = discord.Embed(title=f"{STATUS_ICONS.get(state, '⚫')} {server_name}", color=0x0099ff)
+        embed.add_field(name="State", value=state, inline=True)
+        embed.add_field(name="Health", value=(status.health if status and status.health else "N/A"), inline=True)
+        embed.add_field(name="Uptime", value=(status.status if status else "N/A"), inline=True)
+        embed.add_field(name="Template", value=info.get('template_name', 'unknown'), inline=True)
+        embed.add_field(name="Port", value=info.get('port') or "Auto-assigned", inline=True)
+        embed.add_field(name="Container ID", value=(info.get('container_id') or 'N/A')[:12], inline=True)
+        if len(self.hosts) > 1:
+            embed.add_field(name="Host", value=info.get('host') or self.hosts.default, inline=True)
+        embed.add_field(name="Created By", value=info.get('created_by') or 'unknown', inline=True)
+        embed.add_field(name="Created At", value=info.get('created_at') or 'unknown', inline=True)
+        if info.get('modpack_url'):
+            embed.add_field(name="Modpack", value=info['modpack_url'], inline=False)
+        telemetry = self.server_telemetry(server_name, info) if state == 'running' else None
+        if telemetry and telemetry.online:
+            players = f"{telemetry.players_online}/{telemetry.players_max}"
+            if telemetry.player_names:
+                players += f": {', '.join(telemetry.player_names)}"
+            embed.add_field(name="Players", value=players[:1024], inline=False)
+            embed.add_field(name="TPS", value=f"{telemetry.tps:.1f}" if telemetry.tps is not None else "N/A", inline=True)
+            embed.add_field(name="Ping", value=f"{telemetry.latency * 1000:.0f} ms", inline=True)
+            embed.add_field(name="Version", value=telemetry.version or "unknown", inline=True)
+        elif telemetry:
+            embed.add_field(name="Players", value=f"Not answering yet ({telemetry.error})"[:1024], inline=False)
+        embed.set_footer(text=self._status_age_text())
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='server_stats')
+    async def server_stats(self, ctx, server_name: str, window: str = "1h"):
+        """Show CPU, memory, network and disk usage over a window such as 30m, 6h or 1d"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        seconds = parse_window(window)
+        if not seconds:
+            await ctx.send("❌ Invalid window. Use a number with s, m, h or d, e.g. `30m` or `6h`.")
+            return
+        host = self.server_host(info)
+        series = host.stats.get(server_name) if host else None
+        if series is None or series.latest is None:
+            await ctx.send(f"❌ No stats collected for '{server_name}' yet.")
+            return
+        
+        seconds = min(seconds, series.size * series.resolution)
+        _, columns = series.window(seconds)
+        
+        def bytes_text(value: float) -> str:
+            for unit in ("B", "KiB", "MiB", "GiB"):
+                if value < 1024 or unit == "GiB":
+                    return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+                value /= 1024
+        
+        rows = [
+            ("CPU", columns['cpu'], lambda value: f"{value:.0f}%"),
+            ("Memory", columns['memory'], bytes_text),
+            ("Net in", columns['net_rx'], lambda value: f"{bytes_text(value)}/s"),
+            ("Net out", columns['net_tx'], lambda value: f"{bytes_text(value)}/s"),
+            ("Disk rd", columns['block_read'], lambda value: f"{bytes_text(value)}/s"),
+            ("Disk wr", columns['block_write'], lambda value: f"{bytes_text(value)}/s"),
+        ]
+        lines = []
+        for label, values, fmt in rows:
+            summary = summarize(values)
+            if summary is None:
+                lines.append(f"{label:<8}{'no data':>40}")
+                continue
+            latest, mean, peak = summary
+            lines.append(f"{label:<8}{sparkline(values):<40} now {fmt(latest)} · avg {fmt(mean)} · max {fmt(peak)}")
+        
+        await ctx.send(
+            f"📈 **{server_name}** · last {window} · {series.resolution}s samples\n"
+            f"```\n" + "\n".join(lines) + "\n```"
+        )
+    
+    @commands.command(name='backup')
+    async def backup(self, ctx, server_name: str):
+        """Back up a server's world; only changes since earlier backups are stored"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        if server_name not in self.active_servers:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        await ctx.send(f"💾 Backing up `{server_name}`...")
+        try:
+            snapshot = await self.backup_server(server_name)
+        except BackupError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        except Exception as e:
+            logger.error(f"Error backing up {server_name}: {e}")
+            await ctx.send(f"❌ Error backing up server: {str(e)}")
+            return
+        
+        mib = 1024 ** 2
+        note = "" if snapshot.quiesced else " (saves were not paused; RCON unavailable)"
+        await ctx.send(
+            f"✅ Backup `{snapshot.id}` of `{server_name}`: {snapshot.size / mib:.1f}MB world, "
+            f"{snapshot.stored / mib:.1f}MB new in {snapshot.seconds:.0f}s{note}."
+        )
+    
+    @commands.command(name='backups')
+    async def list_backups(self, ctx, server_name: str):
+        """List a server's backups"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        snapshots = self.backups.snapshots(server_name)
+        if not snapshots:
+            await ctx.send(f"❌ No backups of '{server_name}'.")
+            return
+        
+        mib = 1024 ** 2
+        lines = [
+            f"`{snapshot.id}` · {snapshot.size / mib:.1f}MB · +{snapshot.stored / mib:.1f}MB new"
+            for snapshot in reversed(snapshots)
+        ]
+        embed = discord.Embed(title=f"Backups of {server_name}", description="\n".join(lines)[:4096], color=0x0099ff)
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='restore')
+    async def restore(self, ctx, server_name: str, snapshot_id: str = "latest"):
+        """Replace a server's world with a backup, restarting it if it was running"""
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        if not self.permission_checker.can_manage_server(ctx.author, info):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        snapshot = self.backups.find(server_name, snapshot_id)
+        if snapshot is None:
+            await ctx.send(f"❌ No backup '{snapshot_id}' of '{server_name}'. See `!backups {server_name}`.")
+            return
+        
+        await ctx.send(f"♻️ Restoring `{server_name}` from backup `{snapshot.id}`...")
+        try:
+            docker_helper = self.hosts.for_server(info).docker_helper
+            container_id = info.get('container_id') or f"minecraft_{server_name}"
+            container = await docker_helper.get_container(container_id)
+            running = container.status == 'running'
+            if running:
+                await docker_helper.stop_container(container_id)
+            try:
+                await self.backups.restore(
+                    snapshot, container_id, info.get('volume_name') or f"minecraft_{server_name}",
+                    container.attrs['Image'], docker_helper
+                )
+            finally:
+                if running:
+                    await docker_helper.start_container(container_id)
+        except BackupError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        except Exception as e:
+            logger.error(f"Error restoring {server_name}: {e}")
+            await ctx.send(f"❌ Error restoring server: {str(e)}")
+            return
+        
+        await ctx.send(f"✅ Restored `{server_name}` from backup `{snapshot.id}`.")
+    
+    @staticmethod
+    def _transfer_text(stats: TransferStats, seconds: float) -> str:
+        mib = 1024 ** 2
+        text = f"{stats.bytes / mib:.1f}MB in {seconds:.0f}s"
+        if stats.skipped_regions or stats.skipped_files:
+            text += (f", {stats.regions} changed region files sent, {stats.skipped_regions} region files "
+                     f"and {stats.skipped_files} other files unchanged ({stats.skipped_bytes / mib:.1f}MB skipped)")
+        return text
+    
+    @commands.command(name='export_world')
+    async def export_world(self, ctx, server_name: str, world_name: str):
+        """Copy a server's world into a named world that servers can import or clone"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        if not self.validator.validate_server_name(world_name) or world_name in self.active_servers:
+            await ctx.send("❌ Invalid world name. Use letters, numbers and underscores, and not a server's name.")
+            return
+        
+        await ctx.send(f"📦 Exporting the world of `{server_name}` as `{world_name}`...")
+        started = time.monotonic()
+        try:
+            docker_helper = self.hosts.for_server(info).docker_helper
+            container = await docker_helper.get_container(info.get('container_id') or f"minecraft_{server_name}")
+            image = container.attrs['Image']
+            volume_name = world_volume(world_name)
+            existing = await docker_helper.get_volume(volume_name)
+            holder = await docker_helper.create_volume_container(
+                volume_name, image, labels={WORLD_LABEL: world_name, WORLD_IMAGE_LABEL: image}
+            )
+            try:
+                if existing is not None:
+                    await docker_helper.clear_volume(volume_name, image)
+                stats, _ = await self.copy_world(server_name, docker_helper, holder)
+            finally:
+                await docker_helper.remove_container(holder)
+        except Exception as e:
+            logger.error(f"Error exporting the world of {server_name}: {e}")
+            await ctx.send(f"❌ Error exporting world: {str(e)}")
+            return
+        
+        await ctx.send(
+            f"✅ Exported `{server_name}` as world `{world_name}` "
+            f"({self._transfer_text(stats, time.monotonic() - started)}). "
+            f"Use `!import_world <server> {world_name}` or `!create_server <name> <template> clone={world_name}`."
+        )
+    
+    @commands.command(name='import_world')
+    async def import_world(self, ctx, server_name: str, source: str, mode: str = "full"):
+        """Replace a server's world with another server's or an exported world; `changes` sends only what changed"""
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        if not self.permission_checker.can_manage_server(ctx.author, info):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        if source == server_name:
+            await ctx.send("❌ A server cannot import its own world.")
+            return
+        
+        if mode not in ("full", "changes"):
+            await ctx.send("❌ Mode must be `full` or `changes`.")
+            return
+        
+        # Checked up front, since a full import empties the server's volume first
+        if source not in self.active_servers and await self.find_world(source) is None:
+            await ctx.send(f"❌ No server or exported world named '{source}'.")
+            return
+        
+        since = None
+        if mode == "changes":
+            # Only valid while the target still holds the last copy of this source, unmodified
+            synced = info.get('world_source') or {}
+            if synced.get('name') != source:
+                await ctx.send(f"❌ `{server_name}` was not last synced from `{source}`; import it in full first.")
+                return
+            since = synced['synced_at'] - SYNC_MARGIN
+        
+        await ctx.send(f"📥 Importing the world of `{source}` into `{server_name}`...")
+        started = time.monotonic()
+        touched = False
+        try:
+            docker_helper = self.hosts.for_server(info).docker_helper
+            container_id = info.get('container_id') or f"minecraft_{server_name}"
+            container = await docker_helper.get_container(container_id)
+            running = container.status == 'running'
+            if running:
+                await docker_helper.stop_container(container_id)
+            touched = True
+            if since is None:
+                await docker_helper.clear_volume(
+                    info.get('volume_name') or f"minecraft_{server_name}", container.attrs['Image']
+                )
+            stats, synced_at = await self.copy_world(source, docker_helper, container_id, since=since)
+        except Exception as e:
+            logger.error(f"Error importing a world into {server_name}: {e}")
+            if not touched:
+                await ctx.send(f"❌ Error importing world: {str(e)}")
+                return
+            # The volume is empty or partly written: keep the server stopped so it does not
+            # generate a new world over it, and require a full import next time
+            if info.pop('world_source', None):
+                await self.save_active_servers(server_name)
+            await ctx.send(
+                f"❌ Error importing world: {str(e)}. `{server_name}` was left stopped with an incomplete world; "
+                f"import it in full again or `!restore` a backup before starting it."
+            )
+            return
+        
+        if running:
+            try:
+                await docker_helper.start_container(container_id)
+            except Exception as e:
+                logger.error(f"Error restarting {server_name} after a world import: {e}")
+                await ctx.send(f"⚠️ The world was imported, but `{server_name}` did not start again: {str(e)}")
+        
+        info['world_source'] = {'name': source, 'synced_at': synced_at}
+        await self.save_active_servers(server_name)
+        await ctx.send(
+            f"✅ Imported the world of `{source}` into `{server_name}` "
+            f"({self._transfer_text(stats, time.monotonic() - started)})."
+        )
+    
+    @commands.command(name='capacity')
+    async def capacity(self, ctx):
+        """Show the host's memory and CPU headroom"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        hosts = list(self.hosts)
+        results = await asyncio.gather(*(host.scheduler.refresh() for host in hosts), return_exceptions=True)
+        
+        gib = 1024 ** 3
+        embed = discord.Embed(title="Host Capacity", color=0x0099ff)
+        embed.set_footer(text=f"Placement policy: {self.hosts.policy}")
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error refreshing capacity of host {host.name}: {result}")
+                embed.add_field(name=host.name, value=f"❌ Unreachable: {result}", inline=False)
+                continue
+            headroom = host.scheduler.headroom()
+            embed.add_field(
+                name=host.name,
+                value=f"**Memory:** {headroom.memory_free / gib:.1f}G free "
+                      f"({headroom.memory_reserved / gib:.1f}G / {headroom.memory_total / gib:.1f}G reserved)\n"
+                      f"**CPU:** {headroom.cpu_free / 1e9:g} free "
+                      f"({headroom.cpu_reserved / 1e9:g} / {headroom.cpu_total / 1e9:g} reserved)\n"
+                      f"**Running:** {headroom.running} · **Queued:** {headroom.waiting}\n"
+                      f"**Ports:** {host.ports.available} of {host.ports.size} free",
+                inline=False
+            )
+        await ctx.send(embed=embed)
+    
+    @commands.command(name='server_logs')
+    async def server_logs(self, ctx, server_name: str, lines: int = settings.LOG_DEFAULT_LINES, follow: bool = False):
+        """Show recent server logs, optionally following new output"""
+        if not self.permission_checker.has_required_role(ctx.author):
+            await ctx.send("❌ You don't have permission to use this command.")
+            return
+        
+        info = self.active_servers.get(server_name)
+        if info is None:
+            await ctx.send(f"❌ Server '{server_name}' not found.")
+            return
+        
+        if lines < 1 or lines > settings.LOG_MAX_LINES:
+            await ctx.send(f"❌ Maximum {settings.LOG_MAX_LINES} lines allowed.")
+            return
+        
+        async def send_file(buffer: io.BytesIO, filename: str):
+            await ctx.send(f"📄 Logs for `{server_name}` were too long to post inline.",
+                           file=discord.File(buffer, filename=filename))
+        
+        relay = LogRelay(ctx.send, send_file, filename=f"{server_name}-logs.txt.gz")
+        try:
+            docker_helper = self.hosts.for_server(info).docker_helper
+            container = await docker_helper.get_container(info.get('container_id') or f"minecraft_{server_name}")
+            log_lines = iter_log_lines(docker_helper.stream_logs(container, tail=lines, follow=follow))
+            if follow:
+                await ctx.send(f"📡 Following logs for `{server_name}` for {settings.LOG_FOLLOW_SECONDS:.0f}s...")
+                try:
+                    async with asyncio.timeout(settings.LOG_FOLLOW_SECONDS):
+                        await relay.relay(log_lines, follow=True)
+                except TimeoutError:
+                    pass
+            else:
+                await relay.relay(log_lines)
+            
+            if relay.sent == 0 and not relay.attached and not follow:
+                await ctx.send(f"ℹ️ No log output for `{server_name}`.")
+        except docker.errors.NotFound:
+            await ctx.send(f"❌ Container for server '{server_name}' not found.")
+        except Exception as e:
+            logger.error(f"Error reading logs for {server_name}: {e}")
+            await ctx.send(f"❌ Error reading logs: {str(e)}")
+
+
 async def setup(bot):
     """Setup function for the cog"""
     await bot.add_cog(MinecraftServerManager(bot))
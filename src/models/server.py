@@ -19,10 +19,17 @@ class MinecraftServer:
     status: str = "created"
     container_id: str = ""
     modpack_url: Optional[str] = None
+    volume_name: str = ""
+    host: str = ""
+    modpack_sha256: str = ""
+    # Key of the template in the templates file; template_name is its display name
+    template_key: str = ""
     
     def __post_init__(self):
         if not self.created_at:
             self.created_at = datetime.now().isoformat()
+        if not self.volume_name:
+            self.volume_name = f"minecraft_{self.name}"
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert server to dictionary representation"""
@@ -34,7 +41,11 @@ class MinecraftServer:
             'created_at': self.created_at,
             'status': self.status,
             'container_id': self.container_id,
-            'modpack_url': self.modpack_url
+            'modpack_url': self.modpack_url,
+            'volume_name': self.volume_name,
+            'host': self.host,
+            'modpack_sha256': self.modpack_sha256,
+            'template_key': self.template_key
         }
     
     @classmethod
@@ -48,5 +59,9 @@ class MinecraftServer:
             created_at=data.get('created_at', ''),
             status=data.get('status', 'created'),
             container_id=data.get('container_id', ''),
-            modpack_url=data.get('modpack_url')
+            modpack_url=data.get('modpack_url'),
+            volume_name=data.get('volume_name', ''),
+            host=data.get('host', ''),
+            modpack_sha256=data.get('modpack_sha256', ''),
+            template_key=data.get('template_key', '')
         )
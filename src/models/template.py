@@ -3,20 +3,34 @@ Server template model
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 
+from src.utils.validators import ServerValidator
 
-@dataclass
+
+@dataclass(frozen=True)
 class ServerTemplate:
-    """Model representing a server template"""
+    """Model representing a server template
+
+    Templates are shared between commands, so they are immutable: mapping
+    fields are exposed as read-only views and callers copy before editing.
+    """
     
     name: str
     description: str
     image: str
-    environment: Dict[str, str]
-    ports: Dict[str, Optional[int]]
-    volumes: Dict[str, Any]
-    restart_policy: Dict[str, str]
+    environment: Mapping[str, str]
+    ports: Mapping[str, Optional[int]]
+    volumes: Mapping[str, Any]
+    restart_policy: Mapping[str, str]
+    cpus: Optional[float] = None
+    # Minutes without players before the server hibernates; 0 never hibernates
+    idle_timeout: Optional[float] = None
+    
+    def __post_init__(self):
+        for field_name in ('environment', 'ports', 'volumes', 'restart_policy'):
+            object.__setattr__(self, field_name, MappingProxyType(dict(getattr(self, field_name))))
     
     @classmethod
     def from_dict(cls, name: str, data: Dict[str, Any]) -> 'ServerTemplate':
@@ -28,7 +42,9 @@ class ServerTemplate:
             environment=data.get('environment', {}),
             ports=data.get('ports', {}),
             volumes=data.get('volumes', {}),
-            restart_policy=data.get('restart_policy', {'Name': 'unless-stopped'})
+            restart_policy=data.get('restart_policy', {'Name': 'unless-stopped'}),
+            cpus=data.get('cpus'),
+            idle_timeout=data.get('idle_timeout')
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -37,8 +53,35 @@ class ServerTemplate:
             'name': self.name,
             'description': self.description,
             'image': self.image,
-            'environment': self.environment,
-            'ports': self.ports,
-            'volumes': self.volumes,
-            'restart_policy': self.restart_policy
+            'environment': dict(self.environment),
+            'ports': dict(self.ports),
+            'volumes': dict(self.volumes),
+            'restart_policy': dict(self.restart_policy),
+            'cpus': self.cpus,
+            'idle_timeout': self.idle_timeout
         }
+    
+    @classmethod
+    def validated(cls, name: str, data: Dict[str, Any]) -> 'ServerTemplate':
+        """Create a template, raising ``ValueError`` if the definition is unusable"""
+        if not isinstance(data, dict):
+            raise ValueError(f"Template '{name}' must be an object")
+        if not isinstance(data.get('image'), str) or not data['image']:
+            raise ValueError(f"Template '{name}' needs an image")
+        for field_name in ('environment', 'ports', 'volumes', 'restart_policy'):
+            if field_name in data and not isinstance(data[field_name], dict):
+                raise ValueError(f"Template '{name}': {field_name} must be an object")
+        
+        environment = data.get('environment', {})
+        if 'MEMORY' in environment and not ServerValidator.validate_memory(str(environment['MEMORY'])):
+            raise ValueError(f"Template '{name}': invalid MEMORY {environment['MEMORY']!r}")
+        cpus = data.get('cpus')
+        if cpus is not None and (not isinstance(cpus, (int, float)) or cpus <= 0):
+            raise ValueError(f"Template '{name}': cpus must be a positive number")
+        idle_timeout = data.get('idle_timeout')
+        if idle_timeout is not None and (not isinstance(idle_timeout, (int, float)) or idle_timeout < 0):
+            raise ValueError(f"Template '{name}': idle_timeout must be a number of minutes")
+        
+        # Container environment values are strings
+        data = {**data, 'environment': {key: str(value) for key, value in environment.items()}}
+        return cls.from_dict(name, data)
@@ -0,0 +1,403 @@
+"""
+Incremental world backups as deduplicated, compressed content-defined chunks
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import zstandard
+
+from config.settings import settings
+from src.utils.docker_helper import DATA_PATH
+from src.utils.telemetry import saving_paused
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MIN = 64 * 1024
+CHUNK_MAX = 1024 * 1024
+# Cut points are tested only where this byte occurs (about 1 in 256 bytes of
+# compressed region data); 1 in 1024 of those tests cuts, so chunks average
+# roughly CHUNK_MIN + 256 KiB
+CHUNK_ANCHOR = 0x5A
+CHUNK_MASK = 0x3FF
+# Bytes before the anchor that decide whether it is a cut point
+CHUNK_WINDOW = 32
+
+
+class BackupError(Exception):
+    """Raised when a backup or restore cannot be completed"""
+
+
+class ContentDefinedChunker:
+    """Splits a byte stream at positions chosen by its content
+
+    Inserting or changing bytes only moves the cut points near the edit, so
+    unchanged regions of a file produce the same chunks from one backup to
+    the next even when data before them shifted. A cut is made after an
+    anchor byte whose preceding ``CHUNK_WINDOW`` bytes have a CRC-32 with
+    the low bits clear. Anchors are found with ``bytearray.find`` and CRCs
+    computed by zlib, so the per-byte work runs in C. Memory use is bounded
+    by ``max_size`` plus one fed block.
+    """
+
+    def __init__(self, min_size: int = CHUNK_MIN, max_size: int = CHUNK_MAX, mask: int = CHUNK_MASK):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.mask = mask
+        self._buffer = bytearray()
+        self._scanned = min_size
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add data; return the chunks it completed"""
+        self._buffer += data
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                return chunks
+            chunks.append(bytes(self._buffer[:cut]))
+            del self._buffer[:cut]
+            self._scanned = self.min_size
+
+    def finish(self) -> Optional[bytes]:
+        """Return whatever is left as the last chunk"""
+        rest, self._buffer = bytes(self._buffer), bytearray()
+        return rest or None
+
+    def _find_cut(self) -> Optional[int]:
+        buffer = self._buffer
+        limit = min(len(buffer), self.max_size)
+        position = self._scanned
+        while position < limit:
+            position = buffer.find(CHUNK_ANCHOR, position, limit)
+            if position < 0:
+                break
+            if not zlib.crc32(buffer[position - CHUNK_WINDOW + 1:position + 1]) & self.mask:
+                return position + 1
+            position += 1
+        if len(buffer) >= self.max_size:
+            return self.max_size
+        self._scanned = max(limit, self.min_size)
+        return None
+
+
+class ChunkStore:
+    """Compressed chunks on disk, named by the SHA-256 of their content
+
+    ``chunks/ab/abcdef….zst`` holds one zstd frame. Writes go through a
+    temporary file and a rename, so an interrupted backup never leaves a
+    truncated chunk behind under a valid name.
+    """
+
+    def __init__(self, directory: Path, level: Optional[int] = None):
+        self.directory = Path(directory) / "chunks"
+        self.level = level if level is not None else settings.BACKUP_COMPRESSION_LEVEL
+        # zstd contexts are not thread-safe; each worker thread gets its own
+        self._local = threading.local()
+
+    def path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.zst"
+
+    def has(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store a chunk unless it exists; return its digest and the bytes written"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest, 0
+        compressed = self._compressor().compress(data)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, 'wb') as handle:
+                handle.write(compressed)
+            os.replace(temporary, path)
+        except BaseException:
+            Path(temporary).unlink(missing_ok=True)
+            raise
+        return digest, len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        try:
+            compressed = self.path(digest).read_bytes()
+        except FileNotFoundError:
+            raise BackupError(f"chunk {digest[:12]} is missing from the store") from None
+        try:
+            data = self._decompressor().decompress(compressed)
+        except zstandard.ZstdError as e:
+            raise BackupError(f"chunk {digest[:12]} is corrupt: {e}") from None
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise BackupError(f"chunk {digest[:12]} is corrupt")
+        return data
+
+    def digests(self) -> Iterator[str]:
+        for path in self.directory.glob("*/*.zst"):
+            yield path.stem
+
+    def delete(self, digest: str) -> int:
+        path = self.path(digest)
+        size = path.stat().st_size
+        path.unlink()
+        return size
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        if not hasattr(self._local, 'compressor'):
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return self._local.compressor
+
+    def _decompressor(self) -> zstandard.ZstdDecompressor:
+        if not hasattr(self._local, 'decompressor'):
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return self._local.decompressor
+
+
+@dataclass
+class Snapshot:
+    """A backup: the ordered chunk digests of one tar stream of a world"""
+
+    id: str
+    server_name: str
+    created_at: str
+    size: int = 0
+    stored: int = 0
+    seconds: float = 0.0
+    quiesced: bool = False
+    chunks: List[str] = field(default_factory=list)
+
+
+class _SnapshotWriter:
+    """Chunks, hashes, compresses and stores one backup stream
+
+    Runs on a worker thread, one fed block at a time.
+    """
+
+    def __init__(self, store: ChunkStore, snapshot: Snapshot):
+        self.store = store
+        self.snapshot = snapshot
+        self.chunker = ContentDefinedChunker()
+
+    def feed(self, data: bytes):
+        self.snapshot.size += len(data)
+        for chunk in self.chunker.feed(data):
+            self._store(chunk)
+
+    def finish(self):
+        rest = self.chunker.finish()
+        if rest:
+            self._store(rest)
+
+    def _store(self, chunk: bytes):
+        digest, written = self.store.put(chunk)
+        self.snapshot.chunks.append(digest)
+        self.snapshot.stored += written
+
+
+class BackupEngine:
+    """Backs up and restores server volumes through the Docker API
+
+    A backup asks the server to flush and stop writing (``save-off``,
+    ``save-all flush`` over RCON), streams ``/data`` out of the container
+    as a tar and stores it as deduplicated chunks, then turns saving back
+    on. Unchanged region files, and unchanged parts of changed ones, cost
+    nothing after the first backup. A restore empties the volume and
+    streams the snapshot's chunks back in; neither direction stages the
+    archive on disk or holds more than a chunk or two in memory.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or settings.BACKUP_DIR)
+        self.store = ChunkStore(self.directory)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Garbage collection must not delete chunks a backup or restore is using:
+        # it skips while any runs, and new ones wait for a collection to finish
+        self._running = 0
+        self._collecting: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _lock(self, server_name: str) -> asyncio.Lock:
+        return self._locks.setdefault(server_name, asyncio.Lock())
+
+    @contextlib.asynccontextmanager
+    async def _using_chunks(self) -> AsyncIterator[None]:
+        while self._collecting:
+            await self._collecting.wait()
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+
+    def _manifest_dir(self, server_name: str) -> Path:
+        return self.directory / "snapshots" / server_name
+
+    def snapshots(self, server_name: str) -> List[Snapshot]:
+        """A server's snapshots, oldest first"""
+        snapshots = []
+        for path in self._manifest_dir(server_name).glob("*.json"):
+            try:
+                snapshots.append(Snapshot(**json.loads(path.read_text())))
+            except (OSError, ValueError, TypeError) as e:
+                logger.error(f"Unreadable backup manifest {path}: {e}")
+        # Ids taken within the same second differ only by a numeric suffix
+        snapshots.sort(key=lambda snapshot: (snapshot.created_at, len(snapshot.id), snapshot.id))
+        return snapshots
+
+    def find(self, server_name: str, snapshot_id: Optional[str] = None) -> Optional[Snapshot]:
+        """A snapshot by id (or unique id prefix), or the latest one"""
+        snapshots = self.snapshots(server_name)
+        if snapshot_id in (None, 'latest'):
+            return snapshots[-1] if snapshots else None
+        matches = [snapshot for snapshot in snapshots if snapshot.id.startswith(snapshot_id)]
+        return matches[0] if len(matches) == 1 else None
+
+    async def backup(self, server_name: str, container_id: str, docker_helper,
+                     console=None) -> Snapshot:
+        """Take a snapshot of a server's ``/data``
+
+        ``console`` is the server's RCON client when it is running; without
+        one the copy is taken as-is, which is only consistent if the server
+        is stopped.
+        """
+        lock = self._lock(server_name)
+        if lock.locked():
+            raise BackupError(f"a backup or restore of {server_name} is already running")
+        async with lock:
+            started = time.monotonic()
+            snapshot = Snapshot(
+                id=datetime.now().strftime("%Y%m%d-%H%M%S"),
+                server_name=server_name,
+                created_at=datetime.now().isoformat(timespec='seconds'),
+            )
+            writer = _SnapshotWriter(self.store, snapshot)
+            loop = asyncio.get_running_loop()
+            # Held until the manifest refers to the chunks the backup reused
+            async with self._using_chunks():
+                async with saving_paused(console, server_name) as snapshot.quiesced:
+                    async for data in docker_helper.stream_archive(container_id, DATA_PATH):
+                        await loop.run_in_executor(None, writer.feed, data)
+                    await loop.run_in_executor(None, writer.finish)
+
+                snapshot.seconds = time.monotonic() - started
+                directory = self._manifest_dir(server_name)
+                directory.mkdir(parents=True, exist_ok=True)
+                base, suffix = snapshot.id, 1
+                while (directory / f"{snapshot.id}.json").exists():
+                    # Two backups within a second
+                    suffix += 1
+                    snapshot.id = f"{base}-{suffix}"
+                (directory / f"{snapshot.id}.json").write_text(json.dumps(asdict(snapshot)))
+            logger.info(
+                f"Backed up {server_name}: {snapshot.size / 1024 ** 2:.1f}MB in {len(snapshot.chunks)} chunks, "
+                f"{snapshot.stored / 1024 ** 2:.1f}MB new, {snapshot.seconds:.1f}s"
+            )
+            return snapshot
+
+    def _read_chunks(self, snapshot: Snapshot) -> Iterator[bytes]:
+        for digest in snapshot.chunks:
+            yield self.store.get(digest)
+
+    def _verify(self, snapshot: Snapshot):
+        """Read and hash every chunk of a snapshot, raising if any is missing or corrupt"""
+        broken = 0
+        for digest in set(snapshot.chunks):
+            try:
+                self.store.get(digest)
+            except BackupError:
+                broken += 1
+        if broken:
+            raise BackupError(f"{broken} chunks of snapshot {snapshot.id} are missing or corrupt")
+
+    async def restore(self, snapshot: Snapshot, container_id: str, volume_name: str, image: str, docker_helper):
+        """Replace a stopped server's ``/data`` with a snapshot"""
+        lock = self._lock(snapshot.server_name)
+        if lock.locked():
+            raise BackupError(f"a backup or restore of {snapshot.server_name} is already running")
+        async with lock, self._using_chunks():
+            # Check every chunk first so a broken snapshot never empties the volume
+            await asyncio.to_thread(self._verify, snapshot)
+            await docker_helper.clear_volume(volume_name, image)
+            # The archive's entries are under data/, so it is extracted at the root
+            await docker_helper.put_archive(container_id, "/", self._read_chunks(snapshot))
+
+    def prune(self, server_name: str, keep: Optional[int] = None) -> int:
+        """Delete all but the newest ``keep`` snapshots of a server"""
+        keep = keep if keep is not None else settings.BACKUP_KEEP
+        snapshots = self.snapshots(server_name)
+        expired = snapshots[:-keep] if keep else snapshots
+        for snapshot in expired:
+            (self._manifest_dir(server_name) / f"{snapshot.id}.json").unlink(missing_ok=True)
+        return len(expired)
+
+    async def collect_garbage(self) -> Tuple[int, int]:
+        """Delete chunks no snapshot refers to; return the count and bytes freed
+
+        Skipped while a backup or restore runs; ones that start meanwhile
+        wait until the collection is done.
+        """
+        if self._running or self._collecting:
+            return 0, 0
+        self._collecting = asyncio.Event()
+        try:
+            return await asyncio.to_thread(self._sweep)
+        finally:
+            self._collecting.set()
+            self._collecting = None
+
+    def _sweep(self) -> Tuple[int, int]:
+        referenced = set()
+        for directory in (self.directory / "snapshots").glob("*"):
+            for snapshot in self.snapshots(directory.name):
+                referenced.update(snapshot.chunks)
+        count = freed = 0
+        for digest in list(self.store.digests()):
+            if digest not in referenced:
+                freed += self.store.delete(digest)
+                count += 1
+        return count, freed
+
+    def start(self, run_backup: Callable[[], Iterable[Callable]]):
+        """Back up every server each ``BACKUP_INTERVAL_HOURS``
+
+        ``run_backup()`` yields one coroutine function per server to back up.
+        """
+        if settings.BACKUP_INTERVAL_HOURS > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._schedule(run_backup))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _schedule(self, run_backup: Callable[[], Iterable[Callable]]):
+        while True:
+            await asyncio.sleep(settings.BACKUP_INTERVAL_HOURS * 3600)
+            # One at a time, so scheduled backups never compete for disk bandwidth
+            for backup in list(run_backup()):
+                try:
+                    await backup()
+                except Exception as e:
+                    logger.error(f"Scheduled backup failed: {e}")
+            try:
+                count, freed = await self.collect_garbage()
+                if count:
+                    logger.info(f"Removed {count} unused backup chunks ({freed / 1024 ** 2:.1f}MB)")
+            except OSError as e:
+                logger.error(f"Backup garbage collection failed: {e}")
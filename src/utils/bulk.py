@@ -0,0 +1,163 @@
+"""
+Running one operation over many servers with a single progress message
+"""
+
+import asyncio
+import fnmatch
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+@dataclass
+class BulkResult:
+    """Outcome of an operation on one server"""
+
+    name: str
+    ok: bool
+    detail: str
+    seconds: float
+
+
+def expand_names(patterns: Iterable[str], names: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Expand glob patterns over server names
+
+    Returns the matched names in pattern order without duplicates, and the
+    patterns that matched nothing.
+    """
+    names = sorted(names)
+    matched: List[str] = []
+    seen = set()
+    missing: List[str] = []
+    for pattern in patterns:
+        hits = fnmatch.filter(names, pattern) if any(c in pattern for c in '*?[') else \
+            [pattern] if pattern in names else []
+        if not hits:
+            missing.append(pattern)
+        for name in hits:
+            if name not in seen:
+                seen.add(name)
+                matched.append(name)
+    return matched, missing
+
+
+class BulkProgress:
+    """A single message edited in place as results arrive
+
+    Edits happen in a background task at most every ``BULK_PROGRESS_INTERVAL``
+    seconds, so a fast batch does not run into Discord's edit rate limit and
+    workers never wait on the Discord API.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable], title: str, total: int,
+                 interval: Optional[float] = None):
+        self.send = send
+        self.title = title
+        self.total = total
+        self.interval = interval if interval is not None else settings.BULK_PROGRESS_INTERVAL
+        self.results: List[BulkResult] = []
+        self.message = None
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.message = await self.send(self.render())
+        self._task = asyncio.create_task(self._update_loop())
+
+    def record(self, result: BulkResult):
+        self.results.append(result)
+        self._changed.set()
+
+    def render(self) -> str:
+        failed = sum(1 for result in self.results if not result.ok)
+        text = f"🔄 {self.title}: {len(self.results)}/{self.total} done"
+        if failed:
+            text += f" ({failed} failed)"
+        return text
+
+    async def finish(self, elapsed: float, ordered: Sequence[str]) -> str:
+        """Stop live updates and replace the message with the final report"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        report = self.report(elapsed, ordered)
+        try:
+            await self.message.edit(content=report)
+        except Exception as e:
+            logger.error(f"Could not post bulk report: {e}")
+        return report
+
+    def report(self, elapsed: float, ordered: Sequence[str]) -> str:
+        by_name = {result.name: result for result in self.results}
+        succeeded = sum(1 for result in self.results if result.ok)
+        icon = "✅" if succeeded == self.total else "⚠️" if succeeded else "❌"
+        header = f"{icon} {self.title}: {succeeded}/{self.total} succeeded in {elapsed:.1f}s"
+
+        # Failures first, since they are what the user has to act on
+        lines = []
+        for name in sorted(ordered, key=lambda n: by_name[n].ok if n in by_name else False):
+            result = by_name.get(name)
+            if result is None:
+                lines.append(f"⏹️ `{name}`: not run")
+            elif result.ok:
+                detail = f" {result.detail}" if result.detail else ""
+                lines.append(f"✅ `{name}`{detail} ({result.seconds:.1f}s)")
+            else:
+                lines.append(f"❌ `{name}`: {result.detail}")
+
+        text = header
+        for index, line in enumerate(lines):
+            more = f"\n… and {len(lines) - index} more"
+            if len(text) + 1 + len(line) + len(more) > DISCORD_MESSAGE_LIMIT:
+                return text + more
+            text += "\n" + line
+        return text
+
+    async def _update_loop(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            try:
+                await self.message.edit(content=self.render())
+            except Exception as e:
+                logger.debug(f"Could not update bulk progress: {e}")
+            await asyncio.sleep(self.interval)
+
+
+async def run_bulk(names: Sequence[str], operation: Callable[[str], Awaitable[Optional[str]]],
+                   progress: Optional[BulkProgress] = None,
+                   concurrency: Optional[int] = None) -> Tuple[List[BulkResult], float]:
+    """Run ``operation`` for every name concurrently, at most ``concurrency`` at once
+
+    ``operation`` returns an optional detail string; an exception marks that
+    server as failed without affecting the others. Returns the results in
+    the order of ``names`` and the total wall-clock time.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.BULK_CONCURRENCY)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def run_one(name: str) -> BulkResult:
+        async with semaphore:
+            began = loop.time()
+            try:
+                detail = await operation(name)
+                result = BulkResult(name, True, detail or "", loop.time() - began)
+            except Exception as e:
+                logger.error(f"Bulk operation failed for {name}: {e}")
+                result = BulkResult(name, False, str(e) or type(e).__name__, loop.time() - began)
+        if progress:
+            progress.record(result)
+        return result
+
+    results = await asyncio.gather(*(run_one(name) for name in names))
+    return list(results), loop.time() - started
@@ -4,73 +4,365 @@ Docker helper utilities for container management
 
 import docker
 import asyncio
-from typing import Dict, Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
 import logging
+import secrets
+import time
 from config.settings import settings
+from src.utils.metrics import DOCKER_OPERATION_SECONDS
+from src.utils.scheduler import resource_labels, template_resources
+from src.utils.telemetry import RCON_PASSWORD_LABEL, RCON_PORT
 
 logger = logging.getLogger(__name__)
 
+# Where server worlds live inside their containers and volumes
+DATA_PATH = "/data"
+# Where a cached modpack is mounted inside server containers
+MODPACK_MOUNT_PATH = "/modpacks/modpack.zip"
+# Read size for archives copied out of containers
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageNotCachedError(Exception):
+    """Raised when a server image has not been pulled to the host yet"""
+
 
 class DockerHelper:
-    """Helper class for Docker operations"""
-    
-    def __init__(self):
+    """Helper class for Docker operations
+
+    The Docker SDK is synchronous, so every call made through this helper is
+    dispatched to a dedicated, bounded thread pool. A semaphore caps the number
+    of in-flight operations and each operation has its own timeout, which keeps
+    a slow daemon or a large image pull from stalling the event loop.
+    Long-lived streams (events, logs) use a separate pool so they never
+    starve regular operations, and resource stats streams get a pool of
+    their own so they cannot starve logs and events.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, name: str = "local"):
+        self.name = name
         try:
-            self.client = docker.from_env()
+            if base_url:
+                self.client = docker.DockerClient(base_url=base_url)
+            else:
+                self.client = docker.from_env()
             # Test connection
             self.client.ping()
-            logger.info("Connected to Docker daemon")
+            logger.info(f"Connected to Docker daemon '{name}'")
         except Exception as e:
-            logger.error(f"Failed to connect to Docker: {e}")
+            logger.error(f"Failed to connect to Docker host '{name}': {e}")
+            raise
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.DOCKER_MAX_WORKERS,
+            thread_name_prefix="docker"
+        )
+        self._semaphore = asyncio.Semaphore(settings.DOCKER_MAX_CONCURRENT_OPS)
+        self._stream_executor = ThreadPoolExecutor(
+            max_workers=settings.DOCKER_MAX_STREAMS,
+            thread_name_prefix="docker-stream"
+        )
+        self._stats_executor = ThreadPoolExecutor(
+            max_workers=settings.STATS_MAX_STREAMS,
+            thread_name_prefix="docker-stats"
+        )
+
+    async def run(self, operation: str, func: Callable, *args,
+                  timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a blocking Docker SDK call in the executor with a timeout"""
+        if timeout is None:
+            timeout = settings.DOCKER_OPERATION_TIMEOUT
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        async with self._semaphore:
+            # Timed inside the semaphore so queueing shows up in command latency, not here
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, call),
+                    timeout=timeout
+                )
+                outcome = 'ok'
+                return result
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                logger.error(f"Docker operation '{operation}' timed out after {timeout}s")
+                raise
+            finally:
+                DOCKER_OPERATION_SECONDS.labels(self.name, operation, outcome).observe(
+                    time.perf_counter() - started
+                )
+
+    def stream(self, operation: str, func: Callable, *args, **kwargs) -> AsyncIterator:
+        """Iterate a blocking Docker SDK stream without blocking the event loop
+
+        Each item is fetched on the stream executor. Closing the async
+        iterator closes the underlying stream, which unblocks the worker.
+        """
+        return self._iterate(self._stream_executor, operation, func, *args, **kwargs)
+
+    def stream_stats(self, container_id: str) -> AsyncIterator[Dict]:
+        """Stream a container's resource stats, about one sample a second"""
+        return self._iterate(
+            self._stats_executor, 'stats', self.client.api.stats, container_id, decode=True, stream=True
+        )
+
+    async def stats_once(self, container_id: str) -> Dict:
+        """Read a container's current resource counters without waiting for a second sample"""
+        return await self.run(
+            'container_stats', self.client.api.stats, container_id, decode=True, stream=False, one_shot=True
+        )
+
+    def _get_archive(self, container_id: str, path: str) -> Iterator[bytes]:
+        stream, _ = self.client.api.get_archive(container_id, path, chunk_size=ARCHIVE_CHUNK_SIZE)
+        return stream
+
+    def stream_archive(self, container_id: str, path: str) -> AsyncIterator[bytes]:
+        """Stream a tar of a path inside a container, which may be stopped"""
+        return self.stream('get_archive', self._get_archive, container_id, path)
+
+    async def open_archive(self, container_id: str, path: str) -> Iterator[bytes]:
+        """Open a tar of a path inside a container, to be read on a worker thread"""
+        return await self.run('get_archive', self._get_archive, container_id, path)
+
+    async def put_archive(self, container_id: str, path: str, data: Iterable[bytes],
+                          timeout: Optional[float] = None):
+        """Extract a tar into a container, sending ``data`` as it is produced
+
+        ``data`` is consumed on a worker thread, so it may do blocking reads.
+        """
+        await self.run(
+            'put_archive', self.client.api.put_archive, container_id, path, data,
+            timeout=timeout or settings.BACKUP_TIMEOUT
+        )
+
+    async def create_volume_container(self, volume_name: str, image: str, labels: Optional[Dict] = None) -> str:
+        """Create, without starting, a container that mounts a volume at ``/data``
+
+        Archives can be copied in and out of a stopped container, which
+        gives access to volumes no server is using. The volume is created
+        with ``labels`` if it does not exist.
+        """
+        await self.run('volume_create', self.client.volumes.create, name=volume_name, labels=labels or {})
+        container = await self.run(
+            'create',
+            self.client.containers.create,
+            image,
+            entrypoint=['true'],
+            volumes={volume_name: {'bind': DATA_PATH, 'mode': 'rw'}},
+            labels={'minecraft.maintenance': 'volume_access'}
+        )
+        return container.id
+
+    async def remove_container(self, container_id: str):
+        """Remove a container, stopping it first if needed"""
+        await self.run('container_remove', self.client.api.remove_container, container_id, force=True)
+
+    async def get_volume(self, volume_name: str):
+        """Look up a volume, or return None if it does not exist"""
+        try:
+            return await self.run('volume_inspect', self.client.volumes.get, volume_name)
+        except docker.errors.NotFound:
+            return None
+
+    async def clear_volume(self, volume_name: str, image: str):
+        """Delete everything in a volume using a throwaway container of ``image``"""
+        await self.run(
+            'clear_volume',
+            self.client.containers.run,
+            image,
+            entrypoint=['find', DATA_PATH, '-mindepth', '1', '-delete'],
+            volumes={volume_name: {'bind': DATA_PATH, 'mode': 'rw'}},
+            labels={'minecraft.maintenance': 'clear_volume'},
+            remove=True,
+            timeout=settings.BACKUP_TIMEOUT
+        )
+
+    async def _iterate(self, executor: ThreadPoolExecutor, operation: str, func: Callable,
+                       *args, **kwargs) -> AsyncIterator:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        try:
+            iterator = await asyncio.wait_for(
+                loop.run_in_executor(executor, call),
+                timeout=settings.DOCKER_OPERATION_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Docker stream '{operation}' timed out while opening")
             raise
-    
-    async def create_server(self, server):
-            """Create and start a new Minecraft server container"""
+
+        source = iter(iterator)
+        done = object()
+        try:
+            while True:
+                item = await loop.run_in_executor(executor, next, source, done)
+                if item is done:
+                    break
+                yield item
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Error closing Docker stream '{operation}': {e}")
+
+    def close(self):
+        """Shut down the executors and release the Docker client"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._stream_executor.shutdown(wait=False, cancel_futures=True)
+        self._stats_executor.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Error closing Docker client: {e}")
+
+    async def create_server(self, server, image: Optional[str] = None, modpack_file: Optional[str] = None):
+        """Create and start a new Minecraft server container
+
+        ``image`` may be a digest-pinned reference resolved by the image
+        manager. The image must already be present locally; this method never
+        pulls, so commands are not held up by a registry download.
+        ``modpack_file`` is a cached modpack path on the Docker host; it is
+        mounted read-only and used instead of downloading ``modpack_url``.
+        """
+        image = image or server.template.image
+        try:
             try:
-                # Set up port mapping
-                ports = {}
-                if server.port:
-                    ports['25565/tcp'] = server.port
-                else:
-                    ports['25565/tcp'] = None
-                
-                # Set up volume for persistent data
-                volume_name = f"minecraft_{server.name}"
-                volumes = {volume_name: {'bind': '/data', 'mode': 'rw'}}
-                
-                # Prepare environment variables
-                environment = server.template.environment.copy()
-                
-                # Add modpack URL if provided
-                if server.modpack_url:
-                    environment['MODPACK'] = server.modpack_url
-                    # Ensure the server type supports modpacks
-                    if environment.get('TYPE') in ['VANILLA']:
-                        # Convert vanilla to forge for modpack support
-                        environment['TYPE'] = 'FORGE'
-                        environment['VERSION'] = environment.get('VERSION', '1.20.4')
-                        if 'FORGE_VERSION' not in environment:
-                            environment['FORGE_VERSION'] = 'RECOMMENDED'
-                    
-                    # Enable mod removal for modpack updates
-                    environment['REMOVE_OLD_MODS'] = 'true'
-                    environment['REMOVE_OLD_MODS_INCLUDE'] = '*.jar'
-                    environment['REMOVE_OLD_MODS_EXCLUDE'] = 'essential'
-                
-                # Create container
-                container = self.client.containers.run(
-                    server.template.image,
-                    name=f"minecraft_{server.name}",
-                    environment=environment,
-                    ports=ports,
-                    volumes=volumes,
-                    detach=True,
-                    restart_policy=server.template.restart_policy
+                await self.run('image_inspect', self.client.images.get, image)
+            except docker.errors.ImageNotFound:
+                raise ImageNotCachedError(
+                    f"Image {server.template.image} is still being downloaded, try again shortly"
                 )
-                
-                logger.info(f"Created container for server {server.name}: {container.short_id}")
-                if server.modpack_url:
-                    logger.info(f"Server {server.name} configured with modpack: {server.modpack_url}")
-                return container
-            except Exception as error:
-                pass
\ No newline at end of file
+
+            # Set up port mapping
+            ports = {}
+            if server.port:
+                ports['25565/tcp'] = server.port
+            else:
+                ports['25565/tcp'] = None
+
+            # Set up volume for persistent data
+            volumes = {server.volume_name: {'bind': DATA_PATH, 'mode': 'rw'}}
+
+            # Prepare environment variables
+            environment = server.template.environment.copy()
+
+            # Add modpack URL if provided
+            if server.modpack_url:
+                environment['MODPACK'] = server.modpack_url
+                if modpack_file:
+                    volumes[modpack_file] = {'bind': MODPACK_MOUNT_PATH, 'mode': 'ro'}
+                    environment['MODPACK'] = MODPACK_MOUNT_PATH
+                # Ensure the server type supports modpacks
+                if environment.get('TYPE') in ['VANILLA']:
+                    # Convert vanilla to forge for modpack support
+                    environment['TYPE'] = 'FORGE'
+                    environment['VERSION'] = environment.get('VERSION', '1.20.4')
+                    if 'FORGE_VERSION' not in environment:
+                        environment['FORGE_VERSION'] = 'RECOMMENDED'
+
+                # Enable mod removal for modpack updates
+                environment['REMOVE_OLD_MODS'] = 'true'
+                environment['REMOVE_OLD_MODS_INCLUDE'] = '*.jar'
+                environment['REMOVE_OLD_MODS_EXCLUDE'] = 'essential'
+
+            # Apply the template's resource limits and record them for the scheduler
+            memory, nano_cpus = template_resources(server.template)
+            labels = {'minecraft.server': server.name, **resource_labels(memory, nano_cpus)}
+
+            # Publish RCON for the telemetry collector; it reads the password back from the label
+            if settings.TELEMETRY_ENABLED:
+                password = secrets.token_urlsafe(24)
+                environment.update({'ENABLE_RCON': 'true', 'RCON_PORT': str(RCON_PORT), 'RCON_PASSWORD': password})
+                ports[f'{RCON_PORT}/tcp'] = (settings.RCON_BIND_ADDRESS, None)
+                labels[RCON_PASSWORD_LABEL] = password
+
+            # Create container
+            container = await self.run(
+                'create',
+                self.client.containers.run,
+                image,
+                name=f"minecraft_{server.name}",
+                environment=environment,
+                ports=ports,
+                volumes=volumes,
+                labels=labels,
+                mem_limit=memory,
+                nano_cpus=nano_cpus,
+                detach=True,
+                restart_policy=dict(server.template.restart_policy),
+                timeout=settings.DOCKER_CREATE_TIMEOUT
+            )
+
+            logger.info(f"Created container for server {server.name}: {container.short_id}")
+            if server.modpack_url:
+                logger.info(f"Server {server.name} configured with modpack: {server.modpack_url}")
+            return container
+        except Exception as error:
+            logger.error(f"Failed to create container for server {server.name}: {error}")
+            raise
+
+    async def start_container(self, container_id: str):
+        """Start a stopped server container"""
+        await self.run('container_start', self.client.api.start, container_id)
+
+    async def stop_container(self, container_id: str):
+        """Stop a server container, giving it time to save the world first"""
+        grace = settings.SERVER_STOP_TIMEOUT
+        await self.run(
+            'container_stop',
+            functools.partial(self.client.api.stop, container_id, timeout=grace),
+            timeout=grace + settings.DOCKER_OPERATION_TIMEOUT
+        )
+
+    async def restart_container(self, container_id: str):
+        """Restart a server container with the same shutdown grace period as a stop"""
+        grace = settings.SERVER_STOP_TIMEOUT
+        await self.run(
+            'container_restart',
+            functools.partial(self.client.api.restart, container_id, timeout=grace),
+            timeout=grace + settings.DOCKER_OPERATION_TIMEOUT
+        )
+
+    async def get_container_status(self, container_id: str) -> str:
+        """Get the current status of a single container"""
+        container = await self.get_container(container_id)
+        return container.status
+
+    async def get_container(self, container_id: str):
+        """Look up a container by ID or name"""
+        return await self.run('container_inspect', self.client.containers.get, container_id)
+
+    def stream_logs(self, container, tail: int, follow: bool = False) -> AsyncIterator[bytes]:
+        """Stream a container's log output in chunks"""
+        return self.stream('logs', container.logs, stream=True, follow=follow, tail=tail)
+
+    async def list_server_containers(self) -> List[Dict]:
+        """List all Minecraft server containers in a single API call
+
+        ``sparse`` skips the per-container inspect the SDK would otherwise
+        make, so this costs one request regardless of the number of servers.
+        """
+        containers = await self.run(
+            'container_list',
+            self.client.containers.list,
+            all=True,
+            sparse=True,
+            filters={'name': 'minecraft_'}
+        )
+        return [container.attrs for container in containers]
+
+    async def list_bound_ports(self) -> set:
+        """Collect the host ports published by running containers"""
+        containers = await self.run('container_list', self.client.containers.list, sparse=True)
+        return {
+            binding['PublicPort']
+            for container in containers
+            for binding in container.attrs.get('Ports') or []
+            if binding.get('PublicPort')
+        }
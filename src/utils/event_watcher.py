@@ -0,0 +1,154 @@
+"""
+Container state tracking from the Docker events stream
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Docker container actions and the state they leave the container in
+ACTION_STATES = {
+    'start': 'running',
+    'restart': 'running',
+    'unpause': 'running',
+    'pause': 'paused',
+    'die': 'exited',
+    'stop': 'exited',
+    'oom': None,
+    'health_status': None,
+}
+
+
+@dataclass
+class ServerEvent:
+    """A state transition of a server container"""
+
+    server_name: str
+    container_id: str
+    action: str
+    state: Optional[str]
+    health: Optional[str]
+    exit_code: Optional[str]
+    timestamp: float
+
+    @classmethod
+    def from_docker(cls, event: Dict) -> Optional['ServerEvent']:
+        """Parse a raw Docker event, ignoring non-server containers"""
+        actor = event.get('Actor', {})
+        attributes = actor.get('Attributes', {})
+        name = attributes.get('name', '')
+        if not name.startswith('minecraft_'):
+            return None
+
+        action, _, detail = event.get('Action', event.get('status', '')).partition(':')
+        if action not in ACTION_STATES:
+            return None
+
+        time_nano = event.get('timeNano')
+        timestamp = time_nano / 1e9 if time_nano else float(event.get('time', time.time()))
+        return cls(
+            server_name=name[len('minecraft_'):],
+            container_id=actor.get('ID', event.get('id', '')),
+            action=action,
+            state=ACTION_STATES[action],
+            health=(detail.strip() or None) if action == 'health_status' else None,
+            exit_code=attributes.get('exitCode'),
+            timestamp=timestamp
+        )
+
+
+class DockerEventWatcher:
+    """Follows the Docker events stream and applies server state changes
+
+    The stream is resumed from the timestamp of the last event seen, so
+    transitions that happen while reconnecting are replayed by the daemon
+    instead of being lost.
+    """
+
+    def __init__(self, docker_helper, status_poller,
+                 on_event: Optional[Callable[[ServerEvent], Awaitable[None]]] = None):
+        self.docker_helper = docker_helper
+        self.status_poller = status_poller
+        self.on_event = on_event
+        self.connected = False
+        self.last_timestamp: Optional[float] = None
+        self._seen: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start following events in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop following events"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        # Seed the snapshot once; from here on the event stream is authoritative
+        await self.status_poller.refresh()
+        self.last_timestamp = self.status_poller.updated_at or time.time()
+
+        backoff = 1
+        while True:
+            try:
+                await self._follow()
+                backoff = 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Docker event stream failed: {e}")
+            self.connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    async def _follow(self):
+        """Consume the event stream until it ends or fails"""
+        client = self.docker_helper.client
+        events = self.docker_helper.stream(
+            'events',
+            client.events,
+            decode=True,
+            since=self.last_timestamp,
+            filters={'type': 'container', 'event': list(ACTION_STATES)}
+        )
+        self.connected = True
+        logger.info(f"Following Docker events since {self.last_timestamp}")
+        async for raw in events:
+            event = ServerEvent.from_docker(raw)
+            if event is None:
+                continue
+            # ``since`` is inclusive, so a resumed stream can replay events already applied
+            key = (event.container_id, event.action, event.timestamp)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            if len(self._seen) > 10000:
+                self._seen = {k for k in self._seen if k[2] >= event.timestamp}
+            self.last_timestamp = event.timestamp
+            await self._apply(event)
+
+    async def _apply(self, event: ServerEvent):
+        self.status_poller.apply(
+            event.server_name,
+            event.container_id,
+            event.timestamp,
+            state=event.state,
+            health=event.health
+        )
+        if self.on_event:
+            try:
+                await self.on_event(event)
+            except Exception as e:
+                logger.error(f"Error handling event for {event.server_name}: {e}")
@@ -0,0 +1,214 @@
+"""
+Idle-server hibernation with a wake-on-join stand-in listener
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from config.settings import settings
+from src.utils.telemetry import Telemetry, TelemetryError, encode_packet, pack_varint, read_packet, unpack_varint
+
+logger = logging.getLogger(__name__)
+
+HANDSHAKE_TIMEOUT = 5
+# Attempts to take over a port Docker may not have released yet
+BIND_ATTEMPTS = 5
+
+
+def _encode_string(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return pack_varint(len(data)) + data
+
+
+class SleepingServerListener:
+    """Stands in for a hibernated server on its game port
+
+    Status pings get a "sleeping" MOTD, so the server stays visible in the
+    multiplayer list. A login attempt is told to come back in a minute and
+    calls ``on_wake``.
+    """
+
+    def __init__(self, name: str, port: int, on_wake: Callable[[str], Awaitable[None]],
+                 players_max: int = 20, host: Optional[str] = None):
+        self.name = name
+        self.port = port
+        self.on_wake = on_wake
+        self.players_max = players_max
+        self.host = host if host is not None else settings.HIBERNATION_LISTEN_ADDRESS
+        self.motd = settings.HIBERNATION_MOTD.format(name=name)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._waking = False
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            packet_id, payload = await asyncio.wait_for(read_packet(reader), HANDSHAKE_TIMEOUT)
+            if packet_id != 0x00:
+                return
+            protocol, offset = unpack_varint(payload)
+            address_length, offset = unpack_varint(payload, offset)
+            next_state, _ = unpack_varint(payload, offset + address_length + 2)
+            if next_state == 1:
+                await self._status(reader, writer, protocol)
+            else:
+                await self._login(writer)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError, TelemetryError):
+            pass
+        finally:
+            writer.close()
+
+    async def _status(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol: int):
+        await asyncio.wait_for(read_packet(reader), HANDSHAKE_TIMEOUT)
+        status = {
+            # Echo the client's protocol so the entry is not shown as incompatible
+            'version': {'name': "Sleeping", 'protocol': protocol},
+            'players': {'online': 0, 'max': self.players_max},
+            'description': {'text': self.motd},
+        }
+        writer.write(encode_packet(0x00, _encode_string(json.dumps(status))))
+        await writer.drain()
+        packet_id, payload = await asyncio.wait_for(read_packet(reader), HANDSHAKE_TIMEOUT)
+        if packet_id == 0x01:
+            writer.write(encode_packet(0x01, payload))
+            await writer.drain()
+
+    async def _login(self, writer: asyncio.StreamWriter):
+        message = {'text': f"{self.name} is waking up, join again in a minute."}
+        writer.write(encode_packet(0x00, _encode_string(json.dumps(message))))
+        await writer.drain()
+        if not self._waking:
+            self._waking = True
+            # Run outside this connection's handler, since waking closes the listener
+            asyncio.create_task(self.on_wake(self.name))
+
+
+class HibernationManager:
+    """Stops servers nobody has played on for a while and wakes them on join
+
+    ``candidates()`` yields ``(name, telemetry, idle_timeout_seconds)`` for
+    every running server that may hibernate. A server whose latest telemetry
+    has shown no players for its timeout is stopped with ``hibernate(name)``,
+    which returns the port to listen on. A ``SleepingServerListener`` then
+    holds that port until someone tries to join, when the listener is closed
+    and ``wake(name)`` starts the container again.
+    """
+
+    def __init__(self, candidates: Callable[[], Iterable[Tuple[str, Optional[Telemetry], Optional[float]]]],
+                 hibernate: Callable[[str], Awaitable[int]], wake: Callable[[str], Awaitable[None]],
+                 interval: Optional[float] = None):
+        self.candidates = candidates
+        self.hibernate = hibernate
+        self.wake_server = wake
+        self.interval = interval if interval is not None else settings.HIBERNATION_CHECK_INTERVAL
+        self.idle_since: Dict[str, float] = {}
+        self.listeners: Dict[str, SleepingServerListener] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start checking for idle servers in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop checking and close the listeners; hibernated servers stay stopped"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        listeners, self.listeners = list(self.listeners.values()), {}
+        for listener in listeners:
+            await listener.close()
+
+    def is_sleeping(self, name: str) -> bool:
+        return name in self.listeners
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error checking for idle servers: {e}")
+
+    async def check(self):
+        """Hibernate every candidate that has been empty for its timeout"""
+        seen = set()
+        for name, telemetry, timeout in list(self.candidates()):
+            seen.add(name)
+            if not timeout or telemetry is None or name in self.listeners:
+                self.idle_since.pop(name, None)
+                continue
+            if telemetry.players_online:
+                self.idle_since.pop(name, None)
+                continue
+            if not telemetry.online:
+                # Starting up or not answering; neither counts as empty
+                continue
+            since = self.idle_since.setdefault(name, telemetry.timestamp)
+            if telemetry.timestamp - since >= timeout:
+                await self._hibernate(name, (telemetry.timestamp - since) / 60, telemetry.players_max)
+        for name in set(self.idle_since) - seen:
+            del self.idle_since[name]
+
+    async def _hibernate(self, name: str, idle_minutes: float, players_max: Optional[int]):
+        logger.info(f"Hibernating {name} after {idle_minutes:.0f} minutes without players")
+        self.idle_since.pop(name, None)
+        try:
+            port = await self.hibernate(name)
+        except Exception as e:
+            logger.error(f"Could not hibernate {name}: {e}")
+            return
+        await self.sleep(name, port, players_max or 20)
+
+    async def sleep(self, name: str, port: int, players_max: int = 20) -> bool:
+        """Listen on a stopped server's port until someone tries to join"""
+        listener = SleepingServerListener(name, port, self._wake, players_max=players_max)
+        for attempt in range(BIND_ATTEMPTS):
+            try:
+                await listener.start()
+                break
+            except OSError as e:
+                if attempt == BIND_ATTEMPTS - 1:
+                    logger.error(f"Cannot listen on port {port} for hibernated server {name}: {e}")
+                    return False
+                await asyncio.sleep(1)
+        self.listeners[name] = listener
+        return True
+
+    async def release(self, name: str) -> bool:
+        """Give a hibernated server's port back, e.g. before starting it by hand"""
+        self.idle_since.pop(name, None)
+        listener = self.listeners.pop(name, None)
+        if listener is None:
+            return False
+        await listener.close()
+        return True
+
+    async def _wake(self, name: str):
+        listener = self.listeners.get(name)
+        if listener is None:
+            return
+        await self.release(name)
+        started = time.monotonic()
+        try:
+            await self.wake_server(name)
+        except Exception as e:
+            logger.error(f"Could not wake {name}: {e}")
+            # Keep answering on the port so the next join tries again
+            await self.sleep(name, listener.port, listener.players_max)
+            return
+        logger.info(f"Woke {name} in {time.monotonic() - started:.1f}s")
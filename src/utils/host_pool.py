@@ -0,0 +1,184 @@
+"""
+Pool of Docker hosts and placement of new servers across them
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+from config.settings import settings
+from src.utils.docker_helper import DockerHelper
+from src.utils.event_watcher import DockerEventWatcher, ServerEvent
+from src.utils.image_manager import ImageManager
+from src.utils.port_allocator import PortAllocator
+from src.utils.scheduler import CapacityScheduler
+from src.utils.standby_pool import StandbyPool
+from src.utils.stats_collector import StatsCollector
+from src.utils.status_poller import StatusPoller
+from src.utils.telemetry import TelemetryCollector, host_address
+
+logger = logging.getLogger(__name__)
+
+
+class DockerHost:
+    """A Docker daemon and the services that manage servers on it"""
+
+    def __init__(self, name: str, docker_helper: DockerHelper,
+                 on_event: Optional[Callable[['DockerHost', ServerEvent], Awaitable[None]]] = None,
+                 local: bool = True, address: Optional[str] = None):
+        self.name = name
+        # Local daemons can bind-mount files from the bot's disk
+        self.local = local
+        self.docker_helper = docker_helper
+        self.image_manager = ImageManager(docker_helper)
+        self.standby_pool = StandbyPool(docker_helper, self.image_manager, settings.STANDBY_POOL_SIZES)
+        self.status_poller = StatusPoller(docker_helper)
+        self.scheduler = CapacityScheduler(docker_helper)
+        self.ports = PortAllocator()
+        self.stats = StatsCollector(docker_helper, self.status_poller)
+        self.telemetry = TelemetryCollector(docker_helper, self.status_poller, address or host_address(None))
+        self.event_watcher = DockerEventWatcher(
+            docker_helper, self.status_poller,
+            on_event=functools.partial(on_event, self) if on_event else None
+        )
+
+    async def load_ports(self, recorded: Iterable[int]):
+        """Rebuild the port index from server records and live bindings"""
+        ports = set(recorded)
+        try:
+            ports |= await self.docker_helper.list_bound_ports()
+        except Exception as e:
+            logger.error(f"Could not read port bindings on host {self.name}: {e}")
+        self.ports.reset(ports)
+        logger.info(f"Host {self.name}: {self.ports.available} of {self.ports.size} server ports free")
+
+    def start(self, images: Iterable[str], templates: Dict, in_use: Iterable[str]):
+        """Start the host's background services"""
+        if settings.DOCKER_EVENTS_ENABLED:
+            self.event_watcher.start()
+        else:
+            self.status_poller.start()
+        self.image_manager.start(images)
+        self.standby_pool.start(templates, in_use=in_use)
+        if settings.TELEMETRY_ENABLED:
+            self.telemetry.start()
+        if settings.STATS_ENABLED:
+            self.stats.start()
+
+    def update_templates(self, images: Iterable[str], templates: Dict):
+        """Start using edited templates: pull new images and warm new standbys"""
+        for image in images:
+            if image not in self.image_manager.images:
+                self.image_manager.schedule_pull(image)
+        self.standby_pool.templates = templates
+    
+    async def stop(self):
+        """Stop the host's background services"""
+        await self.event_watcher.stop()
+        await self.status_poller.stop()
+        await self.telemetry.stop()
+        await self.stats.stop()
+        await self.standby_pool.stop()
+        await self.image_manager.stop()
+
+    def close(self):
+        """Release the host's Docker connection"""
+        self.docker_helper.close()
+
+
+class DockerHostPool:
+    """Routes servers to Docker hosts and places new ones by policy
+
+    ``least_loaded`` puts a server on the host with the largest share of
+    free memory, spreading load evenly. ``bin_pack`` puts it on the host with
+    the least free memory that still fits, keeping other hosts empty.
+    """
+
+    POLICIES = ('least_loaded', 'bin_pack')
+
+    def __init__(self, hosts: Dict[str, DockerHost], policy: Optional[str] = None):
+        if not hosts:
+            raise ValueError("At least one Docker host is required")
+        self.hosts = hosts
+        self.default = next(iter(hosts))
+        self.policy = policy or settings.PLACEMENT_POLICY
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown placement policy: {self.policy}")
+
+    @classmethod
+    def from_settings(cls, on_event=None) -> 'DockerHostPool':
+        """Connect to every host listed in ``DOCKER_HOSTS``"""
+        hosts = {}
+        for name, base_url in settings.DOCKER_HOSTS.items():
+            try:
+                hosts[name] = DockerHost(
+                    name, DockerHelper(base_url=base_url, name=name), on_event=on_event,
+                    local=not base_url or base_url.startswith('unix://'),
+                    address=host_address(base_url)
+                )
+            except Exception as e:
+                logger.error(f"Skipping Docker host {name}: {e}")
+        return cls(hosts)
+
+    def __iter__(self) -> Iterator[DockerHost]:
+        return iter(self.hosts.values())
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    def get(self, name: Optional[str]) -> DockerHost:
+        """Return a host by name; records without a host live on the default"""
+        host = self.hosts.get(name or self.default)
+        if host is None:
+            raise KeyError(f"Docker host '{name}' is not configured")
+        return host
+
+    def for_server(self, info: Dict) -> DockerHost:
+        """Return the host a server record lives on"""
+        return self.get(info.get('host'))
+
+    async def place(self, memory: int, nano_cpus: int) -> DockerHost:
+        """Choose the host for a new server with the given limits"""
+        hosts = list(self)
+        if len(hosts) == 1:
+            return hosts[0]
+
+        results = await asyncio.gather(
+            *(host.scheduler.ensure_fresh() for host in hosts), return_exceptions=True
+        )
+        available = []
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                logger.error(f"Docker host {host.name} unavailable for placement: {result}")
+                continue
+            available.append((host, host.scheduler.headroom()))
+        if not available:
+            raise RuntimeError("No Docker hosts are reachable")
+
+        fitting = [
+            (host, headroom) for host, headroom in available
+            if headroom.memory_free >= memory and headroom.cpu_free >= nano_cpus
+        ]
+        if not fitting:
+            # Queue on the host that will free up soonest in proportion to its size
+            return max(available, key=lambda item: self._free_share(item[1]))[0]
+
+        if self.policy == 'bin_pack':
+            return min(fitting, key=lambda item: item[1].memory_free)[0]
+        return max(fitting, key=lambda item: self._free_share(item[1]))[0]
+
+    @staticmethod
+    def _free_share(headroom) -> float:
+        if not headroom.memory_total:
+            return 0.0
+        return headroom.memory_free / headroom.memory_total
+
+    async def stop(self):
+        """Stop background services on every host"""
+        await asyncio.gather(*(host.stop() for host in self))
+
+    def close(self):
+        """Release every host's Docker connection"""
+        for host in self:
+            host.close()
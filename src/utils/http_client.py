@@ -0,0 +1,183 @@
+"""
+Shared outbound HTTP client with connection pooling and latency tracking
+"""
+
+import asyncio
+import collections
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDictProxy
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HeadResponse:
+    """The parts of a HEAD response worth caching"""
+
+    status: int
+    headers: CIMultiDictProxy
+    url: str
+
+
+@dataclass
+class HostLatency:
+    """Request latency to one remote host"""
+
+    requests: int = 0
+    errors: int = 0
+    total: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: collections.deque(maxlen=256))
+
+    def record(self, seconds: float, error: bool = False):
+        self.requests += 1
+        self.total += seconds
+        self.samples.append(seconds)
+        if error:
+            self.errors += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.requests if self.requests else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Latency percentile over the most recent requests"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class HttpClient:
+    """One pooled aiohttp session for all of the bot's outbound requests
+
+    Connections are kept alive and DNS results cached, so repeated requests
+    to the same host skip the TCP and TLS handshakes. HEAD responses are
+    cached for ``HTTP_HEAD_CACHE_TTL`` seconds and concurrent HEADs for the
+    same URL share one request, which lets URL validation and modpack info
+    lookups reuse a single round trip.
+    """
+
+    HEAD_CACHE_SIZE = 256
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._head_cache: 'collections.OrderedDict[str, Tuple[float, HeadResponse]]' = collections.OrderedDict()
+        self._head_inflight: Dict[str, asyncio.Future] = {}
+        self.latency: Dict[str, HostLatency] = collections.defaultdict(HostLatency)
+
+    async def start(self):
+        """Open the pooled session"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.HTTP_MAX_CONNECTIONS,
+                limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT)
+            )
+
+    async def close(self):
+        """Close the session and its pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> 'HttpClient':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP client is not started")
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request and record how long the response headers took"""
+        host = urlsplit(url).hostname or url
+        started = time.perf_counter()
+        try:
+            response = await self.session.request(method, url, **kwargs)
+        except Exception:
+            self.latency[host].record(time.perf_counter() - started, error=True)
+            raise
+        self.latency[host].record(time.perf_counter() - started, error=response.status >= 500)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    async def head(self, url: str) -> HeadResponse:
+        """HEAD a URL, following redirects, with a short-lived cache"""
+        now = time.monotonic()
+        cached = self._head_cache.get(url)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        inflight = self._head_inflight.get(url)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._head_inflight[url] = future
+        try:
+            async with self.request('HEAD', url, allow_redirects=True,
+                                    timeout=aiohttp.ClientTimeout(total=10)) as response:
+                result = HeadResponse(status=response.status, headers=response.headers, url=str(response.url))
+            # Server errors are usually transient, so only cache real answers
+            if result.status < 500:
+                self._head_cache[url] = (time.monotonic() + settings.HTTP_HEAD_CACHE_TTL, result)
+                self._head_cache.move_to_end(url)
+                while len(self._head_cache) > self.HEAD_CACHE_SIZE:
+                    self._head_cache.popitem(last=False)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve it so a failure nobody else awaited is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._head_inflight[url]
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-host request counts and latency percentiles in seconds"""
+        return {
+            host: {
+                'requests': stats.requests,
+                'errors': stats.errors,
+                'mean': stats.mean,
+                'p50': stats.percentile(0.5),
+                'p95': stats.percentile(0.95),
+            }
+            for host, stats in self.latency.items()
+        }
+
+
+@contextlib.asynccontextmanager
+async def shared_or_temporary(client: Optional[HttpClient]) -> AsyncIterator[HttpClient]:
+    """Use the bot's shared client, or a short-lived one when there is none"""
+    if client is not None:
+        yield client
+        return
+    async with HttpClient() as temporary:
+        yield temporary
@@ -0,0 +1,150 @@
+"""
+Background image pre-pulling and digest pinning for server templates
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import docker
+from docker.utils import parse_repository_tag
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImageRecord:
+    """State of a single template image in the local cache"""
+
+    image: str
+    digest: Optional[str] = None
+    pulled_at: Optional[float] = None
+    pull_duration: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def pinned(self) -> str:
+        """Reference that points at the exact cached image"""
+        return self.digest or self.image
+
+
+class ImageManager:
+    """Keeps every template image pulled, pinned and periodically refreshed"""
+
+    def __init__(self, docker_helper):
+        self.docker_helper = docker_helper
+        self.images: Dict[str, ImageRecord] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._lock = asyncio.Lock()
+
+    def start(self, images: Iterable[str]):
+        """Track the given images and start the background refresh loop"""
+        self.track(images)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """Stop the background refresh loop"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def track(self, images: Iterable[str]):
+        """Add images to the set kept warm by the manager"""
+        for image in images:
+            if image not in self.images:
+                self.images[image] = ImageRecord(image=image)
+
+    def is_ready(self, image: str) -> bool:
+        """Check whether an image is available locally"""
+        record = self.images.get(image)
+        return record is not None and record.digest is not None
+
+    def resolve(self, image: str) -> str:
+        """Return the digest-pinned reference for an image if known"""
+        record = self.images.get(image)
+        return record.pinned if record else image
+
+    def schedule_pull(self, image: str):
+        """Pull an image in the background without waiting for it"""
+        self.track([image])
+        task = self._pending.get(image)
+        if task is None or task.done():
+            self._pending[image] = asyncio.create_task(self.pull(image))
+
+    async def _refresh_loop(self):
+        """Inspect local images immediately, then pull on a schedule"""
+        for image in list(self.images):
+            await self.inspect(image)
+
+        while True:
+            await self.refresh_all()
+            await asyncio.sleep(settings.IMAGE_REFRESH_INTERVAL)
+
+    async def refresh_all(self):
+        """Pull every tracked image once"""
+        for image in list(self.images):
+            await self.pull(image)
+
+    async def inspect(self, image: str) -> ImageRecord:
+        """Record the digest of an image that is already present locally"""
+        record = self.images.setdefault(image, ImageRecord(image=image))
+        try:
+            local = await self.docker_helper.run(
+                'image_inspect', self.docker_helper.client.images.get, image
+            )
+            record.digest = self._repo_digest(image, local)
+        except docker.errors.ImageNotFound:
+            logger.info(f"Image {image} not cached locally yet")
+        except Exception as e:
+            logger.error(f"Error inspecting image {image}: {e}")
+        return record
+
+    async def pull(self, image: str) -> ImageRecord:
+        """Pull an image and pin the resulting digest"""
+        record = self.images.setdefault(image, ImageRecord(image=image))
+        async with self._lock:
+            repository, tag = parse_repository_tag(image)
+            started = time.monotonic()
+            try:
+                pulled = await self.docker_helper.run(
+                    'image_pull',
+                    self.docker_helper.client.images.pull,
+                    repository,
+                    tag=tag or 'latest',
+                    timeout=settings.IMAGE_PULL_TIMEOUT
+                )
+            except Exception as e:
+                record.error = str(e)
+                logger.error(f"Error pulling image {image}: {e}")
+                return record
+
+            record.pull_duration = time.monotonic() - started
+            record.pulled_at = time.time()
+            record.digest = self._repo_digest(image, pulled)
+            record.error = None
+            logger.info(
+                f"Pulled image {image} in {record.pull_duration:.1f}s "
+                f"(pinned to {record.pinned})"
+            )
+        return record
+
+    @staticmethod
+    def _repo_digest(image: str, local) -> Optional[str]:
+        """Pick the repository digest matching an image reference"""
+        repository, _ = parse_repository_tag(image)
+        digests = local.attrs.get('RepoDigests') or []
+        for digest in digests:
+            if digest.split('@', 1)[0] == repository:
+                return digest
+        # Locally built images have no repo digest; pin to the image ID instead
+        return digests[0] if digests else local.id
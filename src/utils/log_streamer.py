@@ -0,0 +1,196 @@
+"""
+Streaming container logs into rate-limited Discord messages
+"""
+
+import asyncio
+import gzip
+import io
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DISCORD_MESSAGE_LIMIT = 2000
+CODE_BLOCK = "```\n{}\n```"
+# A zero-width space stops log contents from closing the code block early
+ESCAPED_FENCE = "`\u200b``"
+
+
+async def iter_log_lines(chunks: AsyncIterator[bytes], max_line: int = 4096) -> AsyncIterator[str]:
+    """Split a stream of log chunks into lines without buffering the whole log"""
+    pending = b''
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            yield line.decode('utf-8', errors='replace').rstrip('\r')
+        # A line with no newline in sight is emitted in pieces to keep memory bounded
+        while len(pending) > max_line:
+            yield pending[:max_line].decode('utf-8', errors='replace')
+            pending = pending[max_line:]
+    if pending:
+        yield pending.decode('utf-8', errors='replace').rstrip('\r')
+
+
+class LogBatcher:
+    """Coalesces log lines into messages that fit Discord's length limit"""
+
+    def __init__(self, limit: int = DISCORD_MESSAGE_LIMIT):
+        self.limit = limit - len(CODE_BLOCK.format(''))
+        self._lines: List[str] = []
+        self._size = 0
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+    def add(self, line: str) -> List[str]:
+        """Add a line and return any messages that are now full"""
+        line = line.replace('```', ESCAPED_FENCE)
+        messages = []
+        while len(line) > self.limit:
+            messages.extend(self._take())
+            messages.append(CODE_BLOCK.format(line[:self.limit]))
+            line = line[self.limit:]
+        if self._size + len(line) + 1 > self.limit:
+            messages.extend(self._take())
+        self._lines.append(line)
+        self._size += len(line) + 1
+        return messages
+
+    def flush(self) -> Optional[str]:
+        """Return the buffered lines as a message, if any"""
+        messages = self._take()
+        return messages[0] if messages else None
+
+    def _take(self) -> List[str]:
+        if not self._lines:
+            return []
+        message = CODE_BLOCK.format('\n'.join(self._lines))
+        self._lines = []
+        self._size = 0
+        return [message]
+
+
+class LogRelay:
+    """Relays log lines to a channel at a bounded message rate
+
+    At most ``max_messages`` messages are posted. Once a log would need more
+    than that, the rest of the output is written to a gzip-compressed
+    attachment instead, so long logs become one file rather than a flood.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable], send_file: Callable[[io.BytesIO, str], Awaitable],
+                 filename: str = "logs.txt.gz",
+                 messages_per_second: Optional[float] = None,
+                 max_messages: Optional[int] = None,
+                 max_attachment_bytes: Optional[int] = None):
+        self.send = send
+        self.send_file = send_file
+        self.filename = filename
+        rate = messages_per_second or settings.LOG_MESSAGES_PER_SECOND
+        self.interval = 1.0 / rate
+        self.max_messages = max_messages if max_messages is not None else settings.LOG_MAX_MESSAGES
+        self.max_attachment_bytes = max_attachment_bytes or settings.LOG_ATTACHMENT_MAX_BYTES
+        self.batcher = LogBatcher()
+        self.sent = 0
+        self.attached = False
+        self._queued: List[str] = []
+        self._next_send = 0.0
+        self._buffer: Optional[io.BytesIO] = None
+        self._gzip: Optional[gzip.GzipFile] = None
+        self._written = 0
+        self._truncated = False
+
+    async def relay(self, lines: AsyncIterator[str], follow: bool = False):
+        """Send every line from ``lines``; in follow mode send as lines arrive"""
+        loop = asyncio.get_running_loop()
+        try:
+            async for line in lines:
+                if self._gzip:
+                    self._write(line)
+                    continue
+                for message in self.batcher.add(line):
+                    await self._emit(message, follow)
+                # While following, ship partial batches whenever the rate limit allows
+                if follow and self.batcher and loop.time() >= self._next_send:
+                    await self._emit(self.batcher.flush(), follow)
+        finally:
+            await self.finish()
+
+    async def finish(self):
+        """Send whatever is still buffered"""
+        message = self.batcher.flush()
+        if message:
+            if self._gzip:
+                self._write_message(message)
+            else:
+                self._queued.append(message)
+                self._spill_if_needed()
+
+        if self._gzip:
+            # Anything queued but unsent belongs in the attachment as well
+            for queued in self._queued:
+                self._write_message(queued)
+            self._queued = []
+            self._gzip.close()
+            self._buffer.seek(0)
+            await self.send_file(self._buffer, self.filename)
+            self.attached = True
+            self._gzip = None
+            return
+
+        for queued in self._queued:
+            await self._send_limited(queued)
+        self._queued = []
+
+    async def _emit(self, message: str, follow: bool):
+        if self._gzip:
+            self._write_message(message)
+        elif follow:
+            if self.sent < self.max_messages:
+                await self._send_limited(message)
+            else:
+                self._open_attachment()
+                self._write_message(message)
+        else:
+            # Hold messages until we know whether the output fits inline
+            self._queued.append(message)
+            self._spill_if_needed()
+
+    def _spill_if_needed(self):
+        if len(self._queued) + self.sent > self.max_messages:
+            self._open_attachment()
+            for queued in self._queued:
+                self._write_message(queued)
+            self._queued = []
+
+    async def _send_limited(self, message: str):
+        loop = asyncio.get_running_loop()
+        delay = self._next_send - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.send(message)
+        self.sent += 1
+        self._next_send = loop.time() + self.interval
+
+    def _open_attachment(self):
+        if self._gzip is None:
+            self._buffer = io.BytesIO()
+            self._gzip = gzip.GzipFile(fileobj=self._buffer, mode='wb')
+
+    def _write_message(self, message: str):
+        # Strip the code block wrapper added by the batcher
+        self._write(message[4:-4])
+
+    def _write(self, line: str):
+        if self._truncated:
+            return
+        data = (line.replace(ESCAPED_FENCE, '```') + '\n').encode('utf-8')
+        if self._written + len(data) > self.max_attachment_bytes:
+            self._gzip.write(b'... output truncated ...\n')
+            self._truncated = True
+            return
+        self._gzip.write(data)
+        self._written += len(data)
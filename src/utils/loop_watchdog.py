@@ -0,0 +1,159 @@
+"""
+Event loop stall detection with stack capture of the blocking code
+"""
+
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional
+
+from config.settings import settings
+from src.utils.metrics import EVENT_LOOP_LAG_LAST, EVENT_LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Frames under this directory are the bot's own code, preferred when naming a culprit
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class LoopStall:
+    """One period where the event loop did not run for longer than the threshold"""
+
+    started_at: float
+    duration: float
+    task: str
+    frames: List[traceback.FrameSummary] = field(default_factory=list)
+
+    @property
+    def culprit(self) -> str:
+        """The innermost captured frame in the bot's own code, or the innermost frame"""
+        if not self.frames:
+            return "stack not captured"
+        own = [frame for frame in self.frames
+               if frame.filename.startswith(PROJECT_ROOT) and f"{os.sep}site-packages{os.sep}" not in frame.filename]
+        frame = (own or self.frames)[-1]
+        return f"{os.path.relpath(frame.filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+
+    def format_stack(self) -> str:
+        return "".join(traceback.format_list(self.frames))
+
+
+def describe_task(task: Optional[asyncio.Task]) -> str:
+    """Name a task by its task name and coroutine"""
+    if task is None:
+        return "callback outside a task"
+    coro = task.get_coro()
+    return f"{task.get_name()} ({getattr(coro, '__qualname__', repr(coro))})"
+
+
+class LoopWatchdog:
+    """Detects event loop stalls and records what was blocking it
+
+    A heartbeat task sleeps for ``LOOP_WATCHDOG_INTERVAL`` and measures how
+    late it wakes up; that drift feeds the event loop lag metrics. A daemon
+    thread watches the heartbeat and, once it is overdue by more than
+    ``LOOP_WATCHDOG_THRESHOLD``, snapshots the loop thread's stack and the
+    running task while the blocking call is still on it. When the loop
+    recovers, the stall is logged and kept in a short history.
+    """
+
+    def __init__(self, interval: Optional[float] = None, threshold: Optional[float] = None,
+                 history: Optional[int] = None):
+        self.interval = interval or settings.LOOP_WATCHDOG_INTERVAL
+        self.threshold = threshold or settings.LOOP_WATCHDOG_THRESHOLD
+        self.stalls: Deque[LoopStall] = collections.deque(maxlen=history or settings.LOOP_WATCHDOG_HISTORY)
+        self.samples: Deque[float] = collections.deque(maxlen=600)
+        self.max_drift = 0.0
+        self._expected = 0.0
+        self._pending: Optional[LoopStall] = None
+        self._pending_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the heartbeat on the running loop and the sampling thread"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._expected = time.perf_counter() + self.interval
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._sample, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            await asyncio.to_thread(self._thread.join, 1)
+            self._thread = None
+
+    def percentile(self, fraction: float) -> float:
+        """Drift percentile over the recent heartbeats"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    async def _heartbeat(self):
+        while True:
+            self._expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            # Park the deadline so the sampler cannot mistake this wakeup for a new stall
+            expected, self._expected = self._expected, float('inf')
+            drift = max(0.0, time.perf_counter() - expected)
+            self.samples.append(drift)
+            self.max_drift = max(self.max_drift, drift)
+            EVENT_LOOP_LAG_SECONDS.observe(drift)
+            EVENT_LOOP_LAG_LAST.set(drift)
+            if drift >= self.threshold:
+                self._record(drift)
+
+    def _record(self, drift: float):
+        with self._pending_lock:
+            stall, self._pending = self._pending, None
+        if stall is None:
+            # The sampler could not run during the stall, e.g. the GIL was held throughout
+            stall = LoopStall(started_at=time.time() - drift, duration=drift, task="unknown")
+        stall.duration = drift
+        self.stalls.append(stall)
+        logger.warning(
+            f"Event loop blocked for {drift * 1000:.0f}ms by {stall.task} at {stall.culprit}\n"
+            f"{stall.format_stack()}".rstrip()
+        )
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval / 2):
+            overdue = time.perf_counter() - self._expected
+            if overdue < self.threshold or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stall = LoopStall(
+                started_at=time.time() - overdue,
+                duration=overdue,
+                task=describe_task(asyncio.current_task(self._loop)),
+                frames=traceback.extract_stack(frame, limit=settings.LOOP_WATCHDOG_STACK_DEPTH)
+            )
+            with self._pending_lock:
+                # The loop may have recovered while the stack was being taken
+                if time.perf_counter() - self._expected >= self.threshold:
+                    self._pending = stall
@@ -0,0 +1,131 @@
+"""
+Prometheus metrics and the HTTP endpoint that serves them
+"""
+
+import collections
+import logging
+from typing import Callable, Iterable, Optional, Tuple
+
+from aiohttp import web
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.exposition import CONTENT_TYPE_LATEST
+from prometheus_client.registry import Collector
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A dedicated registry keeps the endpoint to the bot's own metrics
+REGISTRY = CollectorRegistry()
+
+COMMAND_SECONDS = Histogram(
+    'minecraft_bot_command_seconds', 'Time to handle a Discord command',
+    ['cog', 'command', 'outcome'], registry=REGISTRY,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+)
+DOCKER_OPERATION_SECONDS = Histogram(
+    'minecraft_bot_docker_operation_seconds', 'Docker API call latency',
+    ['host', 'operation', 'outcome'], registry=REGISTRY,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 120)
+)
+STATE_WRITE_SECONDS = Histogram(
+    'minecraft_bot_state_write_seconds', 'Time to persist server state',
+    ['backend', 'operation'], registry=REGISTRY,
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+)
+MODPACK_DOWNLOAD_BYTES = Counter(
+    'minecraft_bot_modpack_download_bytes', 'Modpack bytes downloaded into the cache',
+    registry=REGISTRY
+)
+MODPACK_DOWNLOAD_THROUGHPUT = Histogram(
+    'minecraft_bot_modpack_download_bytes_per_second', 'Throughput of completed modpack downloads',
+    registry=REGISTRY,
+    buckets=(256e3, 1e6, 4e6, 10e6, 25e6, 50e6, 100e6, 250e6)
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    'minecraft_bot_rate_limit_wait_seconds', 'Time commands spent queued by the rate limiter',
+    registry=REGISTRY,
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+RATE_LIMIT_REJECTED = Counter(
+    'minecraft_bot_rate_limit_rejected', 'Commands rejected by the rate limiter',
+    ['scope'], registry=REGISTRY
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    'minecraft_bot_event_loop_lag_seconds', 'How late the event loop ran a scheduled wakeup',
+    registry=REGISTRY,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    'minecraft_bot_event_loop_lag_last_seconds', 'Most recent event loop lag sample',
+    registry=REGISTRY
+)
+
+
+class ContainerCollector(Collector):
+    """Container counts by host and status, read from the status trackers at scrape time
+
+    ``source`` yields one ``(host, status)`` pair per server, so the gauge
+    is never stale and costs nothing between scrapes.
+    """
+
+    def __init__(self, source: Callable[[], Iterable[Tuple[str, str]]]):
+        self.source = source
+
+    def describe(self):
+        # Skip the collect() the registry would otherwise run when registering
+        return []
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            'minecraft_bot_containers', 'Server containers by status', labels=['host', 'status']
+        )
+        try:
+            counts = collections.Counter(self.source())
+        except Exception as e:
+            logger.error(f"Error collecting container counts: {e}")
+            counts = {}
+        for (host, status), count in sorted(counts.items()):
+            family.add_metric([host, status], count)
+        yield family
+
+
+def observe_modpack_download(size: int, seconds: float):
+    """Record a finished modpack download"""
+    MODPACK_DOWNLOAD_BYTES.inc(size)
+    if seconds > 0:
+        MODPACK_DOWNLOAD_THROUGHPUT.observe(size / seconds)
+
+
+class MetricsServer:
+    """Serves ``/metrics``; event loop lag is sampled by the loop watchdog"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.host = host or settings.METRICS_HOST
+        self.port = settings.METRICS_PORT if port is None else port
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """The bound host and port once started"""
+        if self._runner is None or not self._runner.addresses:
+            return None
+        return self._runner.addresses[0][:2]
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Serving metrics on {self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        body = generate_latest(REGISTRY)
+        return web.Response(body=body, headers={'Content-Type': CONTENT_TYPE_LATEST})
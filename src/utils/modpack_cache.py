@@ -0,0 +1,281 @@
+"""
+Content-addressed cache of downloaded modpacks
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import aiohttp
+
+from config.settings import settings
+from src.utils.http_client import HttpClient, shared_or_temporary
+from src.utils.metrics import observe_modpack_download
+from src.utils.modpack_helper import ModpackHelper
+from src.utils.validators import ServerValidator
+
+logger = logging.getLogger(__name__)
+
+
+class ModpackDownloadError(Exception):
+    """Raised when a modpack cannot be downloaded into the cache"""
+
+
+@dataclass
+class CachedModpack:
+    """A modpack URL and the cached blob it resolved to"""
+
+    url: str
+    sha256: str
+    size: int
+    filename: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_used: float = 0.0
+
+
+class ModpackCache:
+    """Downloads modpacks once and serves them to every server that uses them
+
+    Blobs are stored as ``blobs/<sha256>.zip``, so a pack reachable through
+    several URLs is kept once. ``index.json`` maps each URL to its blob and to
+    the ETag/Last-Modified it was downloaded with; a HEAD request decides
+    whether the copy is still fresh. Interrupted downloads stay under
+    ``partial/`` and are resumed with a Range request while the validators
+    still match. The least recently used blobs are evicted to stay under
+    ``MODPACK_CACHE_QUOTA``, except those mounted by existing servers and
+    those pinned by servers still being created.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, directory: Optional[str] = None, quota: Optional[int] = None,
+                 in_use: Optional[Callable[[], Iterable[str]]] = None,
+                 http: Optional[HttpClient] = None):
+        self.http = http
+        self.directory = Path(directory or settings.MODPACK_CACHE_DIR)
+        self.quota = quota if quota is not None else ServerValidator.parse_memory(settings.MODPACK_CACHE_QUOTA)
+        self.in_use = in_use or (lambda: ())
+        self.blob_dir = self.directory / 'blobs'
+        self.partial_dir = self.directory / 'partial'
+        self.index_path = self.directory / 'index.json'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, CachedModpack] = self._load_index()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Blobs fetched for servers that are not recorded yet, with a count per creation
+        self._pinned: Dict[str, int] = {}
+        # Keeps index writes, which run on worker threads, in the order they were made
+        self._index_lock = asyncio.Lock()
+
+    def blob_path(self, sha256: str) -> Path:
+        """Return where the blob with the given digest is stored"""
+        return self.blob_dir / f"{sha256}.zip"
+
+    def mount_path(self, sha256: str) -> str:
+        """Return the blob path as seen by the Docker daemon"""
+        mount_dir = Path(settings.MODPACK_CACHE_MOUNT_DIR or self.directory.resolve())
+        return str(mount_dir / 'blobs' / f"{sha256}.zip")
+
+    def get(self, url: str) -> Optional[CachedModpack]:
+        """Return the cached entry for a URL without checking freshness"""
+        entry = self._index.get(url)
+        if entry and self.blob_path(entry.sha256).exists():
+            return entry
+        return None
+
+    async def fetch(self, url: str, pin: bool = False) -> CachedModpack:
+        """Return a fresh cached copy of a modpack, downloading it if needed
+
+        With ``pin``, the blob is kept from eviction until ``unpin`` is
+        called, for a server that mounts it before its record is saved.
+        """
+        entry = await self._fetch(url)
+        # No await since _fetch returned, so no other fetch has evicted the blob
+        if pin:
+            self._pinned[entry.sha256] = self._pinned.get(entry.sha256, 0) + 1
+        return entry
+
+    def unpin(self, sha256: str):
+        """Release a pin taken by ``fetch``"""
+        count = self._pinned.get(sha256, 0) - 1
+        if count > 0:
+            self._pinned[sha256] = count
+        else:
+            self._pinned.pop(sha256, None)
+
+    async def _fetch(self, url: str) -> CachedModpack:
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            info = await ModpackHelper.get_modpack_info(url, client=self.http)
+            entry = self.get(url)
+            if entry and (info is None or self._is_fresh(entry, info)):
+                if info is None:
+                    logger.warning(f"Modpack {url} is unreachable, using the cached copy")
+                entry.last_used = time.time()
+                await self._save_index()
+                return entry
+            if info is None:
+                raise ModpackDownloadError(f"Modpack {url} is not reachable")
+            if info.get('size') and info['size'] > self.quota:
+                raise ModpackDownloadError(
+                    f"Modpack is {info['size'] / 1024 ** 2:.0f}MB, larger than the cache quota"
+                )
+
+            entry = await self._download(url, info)
+            self._index[url] = entry
+            self._evict(keep={entry.sha256})
+            await self._save_index()
+            return entry
+
+    @staticmethod
+    def _is_fresh(entry: CachedModpack, info: Dict) -> bool:
+        if info.get('etag'):
+            return info['etag'] == entry.etag
+        if info.get('last_modified'):
+            return info['last_modified'] == entry.last_modified
+        # No validators at all; a changed size is the only signal left
+        return info.get('size') is None or info['size'] == entry.size
+
+    async def _download(self, url: str, info: Dict) -> CachedModpack:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        part = self.partial_dir / f"{key}.part"
+        meta_path = self.partial_dir / f"{key}.json"
+        validator = info.get('etag') or info.get('last_modified')
+
+        offset = 0
+        if part.exists() and validator and info.get('accept_ranges') and self._read_meta(meta_path) == validator:
+            offset = part.stat().st_size
+        meta_path.write_text(json.dumps({'url': url, 'validator': validator}))
+
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            # The server sends the whole file instead if the pack changed meanwhile
+            headers['If-Range'] = validator
+
+        digest = hashlib.sha256()
+        started = time.monotonic()
+        timeout = aiohttp.ClientTimeout(total=settings.MODPACK_DOWNLOAD_TIMEOUT, sock_read=60)
+        async with shared_or_temporary(self.http) as http:
+            async with http.request('GET', url, headers=headers, timeout=timeout) as response:
+                if response.status == 206 and offset:
+                    logger.info(f"Resuming modpack download {url} at {offset} bytes")
+                    await asyncio.to_thread(self._hash_file, part, digest)
+                    mode = 'ab'
+                elif response.status == 200:
+                    offset = 0
+                    mode = 'wb'
+                else:
+                    raise ModpackDownloadError(f"Downloading {url} failed with HTTP {response.status}")
+
+                size = offset
+                resumed_at = offset
+                f = await asyncio.to_thread(open, part, mode)
+                try:
+                    async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                        await asyncio.to_thread(self._append, f, digest, chunk)
+                        size += len(chunk)
+                        if size > self.quota:
+                            raise ModpackDownloadError("Modpack is larger than the cache quota")
+                finally:
+                    await asyncio.to_thread(f.close)
+
+        if info.get('size') is not None and size != info['size']:
+            raise ModpackDownloadError(f"Download of {url} ended after {size} of {info['size']} bytes")
+
+        observe_modpack_download(size - resumed_at, time.monotonic() - started)
+        sha256 = digest.hexdigest()
+        blob = self.blob_path(sha256)
+        if blob.exists():
+            part.unlink()
+        else:
+            os.replace(part, blob)
+        meta_path.unlink(missing_ok=True)
+        logger.info(f"Cached modpack {url} as {sha256[:12]} ({size / 1024 ** 2:.1f}MB)")
+
+        return CachedModpack(
+            url=url,
+            sha256=sha256,
+            size=size,
+            filename=info.get('filename') or f"{sha256}.zip",
+            etag=info.get('etag'),
+            last_modified=info.get('last_modified'),
+            last_used=time.time()
+        )
+
+    def _evict(self, keep: Iterable[str] = ()):
+        """Remove least recently used blobs until the cache fits its quota"""
+        last_used: Dict[str, float] = {}
+        for entry in self._index.values():
+            last_used[entry.sha256] = max(last_used.get(entry.sha256, 0.0), entry.last_used)
+
+        # Blobs no longer referenced by any URL sort first
+        blobs = []
+        for path in self.blob_dir.glob('*.zip'):
+            blobs.append((last_used.get(path.stem, -1.0), path.stem, path.stat().st_size))
+        blobs.sort()
+
+        pinned = set(keep) | set(self._pinned) | set(self.in_use())
+        total = sum(size for _, _, size in blobs)
+        for used, sha256, size in blobs:
+            if total <= self.quota:
+                break
+            if sha256 in pinned:
+                continue
+            self.blob_path(sha256).unlink(missing_ok=True)
+            self._index = {url: entry for url, entry in self._index.items() if entry.sha256 != sha256}
+            total -= size
+            logger.info(f"Evicted modpack {sha256[:12]} from the cache")
+
+    @staticmethod
+    def _append(f, digest, chunk: bytes):
+        digest.update(chunk)
+        f.write(chunk)
+
+    @staticmethod
+    def _hash_file(path: Path, digest):
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(ModpackCache.CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+    @staticmethod
+    def _read_meta(path: Path) -> Optional[str]:
+        try:
+            return json.loads(path.read_text()).get('validator')
+        except (OSError, ValueError):
+            return None
+
+    def _load_index(self) -> Dict[str, CachedModpack]:
+        try:
+            with open(self.index_path, 'r') as f:
+                return {url: CachedModpack(**data) for url, data in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, TypeError) as e:
+            logger.error(f"Ignoring unreadable modpack cache index: {e}")
+            return {}
+
+    async def _save_index(self):
+        async with self._index_lock:
+            data = {url: asdict(entry) for url, entry in self._index.items()}
+            await asyncio.to_thread(self._write_index, data)
+
+    def _write_index(self, data: Dict[str, dict]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".index.json.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
@@ -2,13 +2,17 @@
 Modpack utility functions for handling modpack URLs and validation
 """
 
-import aiohttp
 import asyncio
+import json
 import logging
+import struct
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional, Tuple
 import tempfile
 import zipfile
+import zlib
+
+from src.utils.http_client import HttpClient, shared_or_temporary
 
 logger = logging.getLogger(__name__)
 
@@ -17,51 +21,57 @@ class ModpackHelper:
     """Helper class for modpack operations"""
     
     @staticmethod
-    async def validate_modpack_url(url: str) -> bool:
+    async def validate_modpack_url(url: str, client: Optional[HttpClient] = None) -> bool:
         """Validate that a modpack URL is accessible and is a zip file"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, timeout=10) as response:
-                    if response.status == 200:
-                        content_type = response.headers.get('content-type', '').lower()
-                        content_disposition = response.headers.get('content-disposition', '').lower()
-                        
-                        # Check if it's a zip file by content type or filename
-                        is_zip = (
-                            'application/zip' in content_type or
-                            'application/x-zip' in content_type or
-                            '.zip' in content_disposition or
-                            url.lower().endswith('.zip')
-                        )
-                        
-                        return is_zip
-                    return False
+            async with shared_or_temporary(client) as http:
+                response = await http.head(url)
+            if response.status == 200:
+                content_type = response.headers.get('content-type', '').lower()
+                content_disposition = response.headers.get('content-disposition', '').lower()
+                
+                # Check if it's a zip file by content type or filename
+                is_zip = (
+                    'application/zip' in content_type or
+                    'application/x-zip' in content_type or
+                    '.zip' in content_disposition or
+                    url.lower().endswith('.zip')
+                )
+                
+                return is_zip
+            return False
         except Exception as e:
             logger.error(f"Error validating modpack URL {url}: {e}")
             return False
     
     @staticmethod
-    async def get_modpack_info(url: str) -> Optional[dict]:
-        """Get basic information about a modpack from its URL"""
+    async def get_modpack_info(url: str, client: Optional[HttpClient] = None) -> Optional[dict]:
+        """Get basic information about a modpack from its URL
+        
+        Pass the bot's shared client so this reuses the HEAD response of a
+        preceding ``validate_modpack_url`` call instead of sending another.
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, timeout=10) as response:
-                    if response.status == 200:
-                        content_length = response.headers.get('content-length')
-                        last_modified = response.headers.get('last-modified')
-                        
-                        # Extract filename from URL or content-disposition
-                        filename = url.split('/')[-1]
-                        content_disposition = response.headers.get('content-disposition', '')
-                        if 'filename=' in content_disposition:
-                            filename = content_disposition.split('filename=')[1].strip('"\'')
-                        
-                        return {
-                            'filename': filename,
-                            'size': int(content_length) if content_length else None,
-                            'last_modified': last_modified,
-                            'url': url
-                        }
+            async with shared_or_temporary(client) as http:
+                response = await http.head(url)
+            if response.status == 200:
+                content_length = response.headers.get('content-length')
+                last_modified = response.headers.get('last-modified')
+                
+                # Extract filename from URL or content-disposition
+                filename = url.split('/')[-1]
+                content_disposition = response.headers.get('content-disposition', '')
+                if 'filename=' in content_disposition:
+                    filename = content_disposition.split('filename=')[1].strip('"\'')
+                
+                return {
+                    'filename': filename,
+                    'size': int(content_length) if content_length else None,
+                    'last_modified': last_modified,
+                    'etag': response.headers.get('etag'),
+                    'accept_ranges': response.headers.get('accept-ranges', '').lower() == 'bytes',
+                    'url': url
+                }
         except Exception as e:
             logger.error(f"Error getting modpack info for {url}: {e}")
         
@@ -69,53 +79,282 @@ class ModpackHelper:
     
     @staticmethod
     def extract_modpack_metadata(zip_path: str) -> dict:
-        """Extract metadata from a modpack zip file"""
-        metadata = {
+        """Extract metadata from a modpack zip file
+
+        Only the central directory and the chosen manifest are read, so the
+        cost depends on the number of entries rather than the archive size.
+        """
+        try:
+            with open(zip_path, 'rb') as f:
+                def read_range(start: int, end: int) -> bytes:
+                    f.seek(start)
+                    return f.read(end - start)
+                
+                size = f.seek(0, 2)
+                tail_start = max(size - MAX_END_RECORD_SIZE, 0)
+                directory_start, directory_end = _locate_central_directory(read_range(tail_start, size), tail_start)
+                metadata, manifest = ModpackHelper._classify_entries(read_range(directory_start, directory_end))
+                if manifest is not None:
+                    start, end = _member_span(manifest, size)
+                    ModpackHelper._read_manifest(manifest, read_range(start, end), metadata)
+                return metadata
+        except Exception as e:
+            logger.error(f"Error extracting modpack metadata from {zip_path}: {e}")
+            return ModpackHelper._empty_metadata()
+    
+    @staticmethod
+    async def extract_remote_modpack_metadata(url: str, client: Optional[HttpClient] = None) -> Optional[dict]:
+        """Extract metadata from a remote modpack zip without downloading it
+
+        The tail of the file is fetched with an HTTP Range request to find the
+        central directory, then the directory and the manifest member are
+        fetched the same way. Returns ``None`` if the server does not support
+        Range requests.
+        """
+        try:
+            async with shared_or_temporary(client) as http:
+                response = await http.head(url)
+                size = response.headers.get('content-length')
+                if response.status != 200 or not size or \
+                        response.headers.get('accept-ranges', '').lower() != 'bytes':
+                    return None
+                size = int(size)
+                
+                tail_start = max(size - MAX_END_RECORD_SIZE, 0)
+                tail = await _fetch_range(http, url, tail_start, size)
+                directory_start, directory_end = _locate_central_directory(tail, tail_start)
+                if directory_start >= tail_start:
+                    directory = tail[directory_start - tail_start:directory_end - tail_start]
+                else:
+                    directory = await _fetch_range(http, url, directory_start, directory_end)
+                
+                metadata, manifest = ModpackHelper._classify_entries(directory)
+                if manifest is not None:
+                    start, end = _member_span(manifest, size)
+                    ModpackHelper._read_manifest(manifest, await _fetch_range(http, url, start, end), metadata)
+                return metadata
+        except Exception as e:
+            logger.error(f"Error extracting remote modpack metadata from {url}: {e}")
+            return None
+    
+    @staticmethod
+    def _empty_metadata() -> dict:
+        return {
             'minecraft_version': None,
             'mod_loader': None,
+            'loader_version': None,
             'mod_count': 0,
-            'has_config': False
+            'has_config': False,
+            'manifest_type': None,
+            'name': None,
+            'version': None
         }
+    
+    @staticmethod
+    def _classify_entries(directory: bytes) -> Tuple[dict, Optional['_ZipEntry']]:
+        """Walk the central directory once: count mods, spot loaders, pick the manifest
+
+        Names are classified as raw bytes and only the chosen manifest becomes
+        an entry object. Substring checks that do not depend on entry
+        boundaries run once over the whole directory instead of per entry.
+        """
+        metadata = ModpackHelper._empty_metadata()
+        manifest = None
+        best_rank = None
+        mod_count = 0
+        
+        unpack = DIRECTORY_HEADER.unpack_from
+        header_size = DIRECTORY_HEADER.size
+        position = 0
+        end = len(directory)
+        while position + header_size <= end:
+            (signature, _, _, flags, method, _, _, _, compress_size, file_size,
+             name_length, extra_length, comment_length, _, _, _, header_offset) = unpack(directory, position)
+            if signature != b'PK\x01\x02':
+                raise zipfile.BadZipFile("Bad central directory entry")
+            name_start = position + header_size
+            extra_start = name_start + name_length
+            position = extra_start + extra_length + comment_length
+            
+            raw_name = directory[name_start:extra_start]
+            lower = raw_name.replace(b'\\', b'/').lower()
+            if lower.endswith(b'.jar') and b'mods/' in lower:
+                mod_count += 1
+            
+            # The shallowest manifest of the best-ranked kind describes the pack
+            rank = MANIFEST_PRIORITY.get(lower.rpartition(b'/')[2])
+            if rank is not None:
+                if 0xFFFFFFFF in (compress_size, file_size, header_offset):
+                    file_size, compress_size, header_offset = _zip64_sizes(
+                        directory[extra_start:extra_start + extra_length], file_size, compress_size, header_offset
+                    )
+                rank = (rank, lower.count(b'/'))
+                if file_size <= MAX_MANIFEST_SIZE and (best_rank is None or rank < best_rank):
+                    name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437', errors='replace')
+                    manifest = _ZipEntry(name, method, compress_size, file_size, header_offset)
+                    best_rank = rank
         
+        names = directory.replace(b'\\', b'/').lower()
+        metadata['mod_count'] = mod_count
+        metadata['has_config'] = b'config/' in names
+        # Filenames only hint at the loader; a manifest overrides this
+        for loader in LOADER_HINTS:
+            if loader in names:
+                metadata['mod_loader'] = loader.decode('ascii')
+                break
+        
+        return metadata, manifest
+    
+    @staticmethod
+    def _read_manifest(entry: '_ZipEntry', data: bytes, metadata: dict):
+        """Fill in metadata from a CurseForge, Modrinth or Fabric manifest"""
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_file:
-                file_list = zip_file.namelist()
-                
-                # Count mod files
-                mod_files = [f for f in file_list if f.endswith('.jar') and ('mods/' in f or 'mods\\' in f)]
-                metadata['mod_count'] = len(mod_files)
-                
-                # Check for config directory
-                config_files = [f for f in file_list if 'config/' in f or 'config\\' in f]
-                metadata['has_config'] = len(config_files) > 0
-                
-                # Try to detect mod loader type
-                if any('forge' in f.lower() for f in file_list):
-                    metadata['mod_loader'] = 'forge'
-                elif any('fabric' in f.lower() for f in file_list):
-                    metadata['mod_loader'] = 'fabric'
-                elif any('neoforge' in f.lower() for f in file_list):
-                    metadata['mod_loader'] = 'neoforge'
-                elif any('quilt' in f.lower() for f in file_list):
-                    metadata['mod_loader'] = 'quilt'
-                
-                # Try to find version info from manifest or other files
-                for file_name in file_list:
-                    if 'manifest.json' in file_name.lower():
-                        try:
-                            manifest_content = zip_file.read(file_name).decode('utf-8')
-                            import json
-                            manifest = json.loads(manifest_content)
-                            if 'minecraft' in manifest:
-                                metadata['minecraft_version'] = manifest['minecraft'].get('version')
-                            if 'modLoaders' in manifest and manifest['modLoaders']:
-                                loader_info = manifest['modLoaders'][0]
-                                metadata['mod_loader'] = loader_info.get('id', '').split('-')[0]
-                        except Exception:
-                            pass
-                        break
-                
+            manifest = json.loads(_decompress_member(entry, data).decode('utf-8'))
+            kind = entry.name.replace('\\', '/').rsplit('/', 1)[-1].lower()
+            MANIFEST_PARSERS[kind](manifest, metadata)
         except Exception as e:
-            logger.error(f"Error extracting modpack metadata from {zip_path}: {e}")
-        
-        return metadata
+            logger.debug(f"Could not parse {entry.name}: {e}")
+
+
+def _parse_curseforge(manifest: dict, metadata: dict):
+    minecraft = manifest.get('minecraft') or {}
+    metadata['manifest_type'] = 'curseforge'
+    metadata['name'] = manifest.get('name')
+    metadata['version'] = manifest.get('version')
+    metadata['minecraft_version'] = minecraft.get('version')
+    loaders = minecraft.get('modLoaders') or manifest.get('modLoaders') or []
+    if loaders:
+        loader = next((entry for entry in loaders if entry.get('primary')), loaders[0])
+        loader_id, _, loader_version = loader.get('id', '').partition('-')
+        metadata['mod_loader'] = loader_id or metadata['mod_loader']
+        metadata['loader_version'] = loader_version or None
+    if not metadata['mod_count']:
+        metadata['mod_count'] = len(manifest.get('files') or [])
+
+
+def _parse_modrinth(index: dict, metadata: dict):
+    dependencies = index.get('dependencies') or {}
+    metadata['manifest_type'] = 'modrinth'
+    metadata['name'] = index.get('name')
+    metadata['version'] = index.get('versionId')
+    metadata['minecraft_version'] = dependencies.get('minecraft')
+    for key, loader in MODRINTH_LOADERS.items():
+        if key in dependencies:
+            metadata['mod_loader'] = loader
+            metadata['loader_version'] = dependencies[key]
+            break
+    if not metadata['mod_count']:
+        metadata['mod_count'] = sum(
+            1 for entry in index.get('files') or [] if entry.get('path', '').startswith('mods/')
+        )
+
+
+def _parse_fabric(mod: dict, metadata: dict):
+    depends = mod.get('depends') or {}
+    minecraft = depends.get('minecraft')
+    metadata['manifest_type'] = 'fabric'
+    metadata['name'] = mod.get('name') or mod.get('id')
+    metadata['version'] = mod.get('version')
+    metadata['minecraft_version'] = minecraft[0] if isinstance(minecraft, list) and minecraft else minecraft
+    metadata['mod_loader'] = 'fabric'
+    metadata['loader_version'] = depends.get('fabricloader')
+
+
+# Lower rank wins when a pack contains several manifests
+MANIFEST_PRIORITY = {b'modrinth.index.json': 0, b'manifest.json': 1, b'fabric.mod.json': 2}
+MANIFEST_PARSERS = {
+    'modrinth.index.json': _parse_modrinth,
+    'manifest.json': _parse_curseforge,
+    'fabric.mod.json': _parse_fabric,
+}
+MODRINTH_LOADERS = {
+    'neoforge': 'neoforge',
+    'forge': 'forge',
+    'fabric-loader': 'fabric',
+    'quilt-loader': 'quilt',
+}
+# Checked in order, so "neoforge" is not mistaken for "forge"
+LOADER_HINTS = (b'neoforge', b'forge', b'fabric', b'quilt')
+MAX_MANIFEST_SIZE = 16 * 1024 * 1024
+
+# Zip structures, see APPNOTE.TXT sections 4.3.7, 4.3.12 and 4.3.14-16
+END_RECORD = struct.Struct('<4s4H2LH')
+END_RECORD64_LOCATOR = struct.Struct('<4sLQL')
+END_RECORD64 = struct.Struct('<4sQ2H2L4Q')
+DIRECTORY_HEADER = struct.Struct('<4s6H3L5H2L')
+LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+# End of central directory record plus the longest possible archive comment
+MAX_END_RECORD_SIZE = END_RECORD.size + 0xFFFF + END_RECORD64.size + END_RECORD64_LOCATOR.size
+LOCAL_EXTRA_MARGIN = 1024
+
+
+class _ZipEntry(NamedTuple):
+    name: str
+    method: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+
+
+def _locate_central_directory(tail: bytes, tail_start: int) -> Tuple[int, int]:
+    """Return the byte span of the central directory from the archive's tail"""
+    position = tail.rfind(b'PK\x05\x06')
+    if position < 0:
+        raise zipfile.BadZipFile("End of central directory record not found")
+    record = END_RECORD.unpack_from(tail, position)
+    directory_size, directory_offset = record[5], record[6]
+    if directory_offset == 0xFFFFFFFF or directory_size == 0xFFFFFFFF:
+        locator = END_RECORD64_LOCATOR.unpack_from(tail, position - END_RECORD64_LOCATOR.size)
+        record64 = END_RECORD64.unpack_from(tail, locator[2] - tail_start)
+        directory_size, directory_offset = record64[8], record64[9]
+    return directory_offset, directory_offset + directory_size
+
+
+def _zip64_sizes(extra: bytes, file_size: int, compress_size: int, header_offset: int) -> Tuple[int, int, int]:
+    """Replace 0xFFFFFFFF placeholders with values from the ZIP64 extra field"""
+    position = 0
+    while position + 4 <= len(extra):
+        tag, length = struct.unpack_from('<2H', extra, position)
+        if tag == 0x0001:
+            values = iter(struct.unpack_from(f'<{length // 8}Q', extra, position + 4))
+            if file_size == 0xFFFFFFFF:
+                file_size = next(values)
+            if compress_size == 0xFFFFFFFF:
+                compress_size = next(values)
+            if header_offset == 0xFFFFFFFF:
+                header_offset = next(values)
+            break
+        position += 4 + length
+    return file_size, compress_size, header_offset
+
+
+def _member_span(entry: _ZipEntry, size: int) -> Tuple[int, int]:
+    """Byte span covering a member's local header and data"""
+    start = entry.header_offset
+    end = start + LOCAL_HEADER.size + len(entry.name.encode('utf-8')) + LOCAL_EXTRA_MARGIN + entry.compress_size
+    return start, min(end, size)
+
+
+def _decompress_member(entry: _ZipEntry, data: bytes) -> bytes:
+    """Return a member's contents from the bytes at its local header"""
+    header = LOCAL_HEADER.unpack_from(data, 0)
+    if header[0] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local header for {entry.name}")
+    start = LOCAL_HEADER.size + header[9] + header[10]
+    payload = data[start:start + entry.compress_size]
+    if len(payload) < entry.compress_size:
+        raise zipfile.BadZipFile(f"Local extra field of {entry.name} exceeds the fetched span")
+    if entry.method == zipfile.ZIP_STORED:
+        return payload
+    if entry.method == zipfile.ZIP_DEFLATED:
+        return zlib.decompress(payload, -15)
+    raise zipfile.BadZipFile(f"Unsupported compression method {entry.method} for {entry.name}")
+
+
+async def _fetch_range(http: HttpClient, url: str, start: int, end: int) -> bytes:
+    """Fetch bytes ``start`` to ``end`` (exclusive) of a remote file"""
+    async with http.request('GET', url, headers={'Range': f"bytes={start}-{end - 1}"}) as response:
+        if response.status != 206:
+            # A 200 would be the whole archive; refuse rather than download it
+            raise ValueError(f"Range request returned HTTP {response.status}")
+        return await response.read()
@@ -0,0 +1,105 @@
+"""
+Host port allocation for server containers
+"""
+
+import logging
+from collections import deque
+from typing import Iterable, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PortUnavailableError(Exception):
+    """Raised when a requested port is taken or the port range is exhausted"""
+
+
+class PortAllocator:
+    """Hands out host ports from the configured range in constant time
+
+    A bytearray marks which ports of ``DEFAULT_PORT_RANGE_START``..``END`` are
+    taken and a deque holds free candidates. Ports reserved explicitly stay in
+    the deque and are skipped when they reach the front, so every operation
+    is O(1) amortised. None of the methods await, which makes each call
+    atomic with respect to other commands on the event loop.
+    """
+
+    def __init__(self, start: Optional[int] = None, end: Optional[int] = None):
+        self.start = start if start is not None else settings.DEFAULT_PORT_RANGE_START
+        self.end = end if end is not None else settings.DEFAULT_PORT_RANGE_END
+        if self.end < self.start:
+            raise ValueError(f"Invalid port range {self.start}-{self.end}")
+        self.reset(())
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start + 1
+
+    @property
+    def available(self) -> int:
+        """Number of free ports left in the range"""
+        return self.size - self._taken
+
+    def reset(self, in_use: Iterable[int]):
+        """Rebuild the index from the ports currently bound or recorded"""
+        self._used = bytearray(self.size)
+        self._queued = bytearray(self.size)
+        self._outside: set = set()
+        self._taken = 0
+        for port in in_use:
+            self.mark(port)
+        self._free = deque()
+        for port in range(self.start, self.end + 1):
+            if not self._used[port - self.start]:
+                self._queued[port - self.start] = 1
+                self._free.append(port)
+
+    def _in_range(self, port: int) -> bool:
+        return self.start <= port <= self.end
+
+    def in_use(self, port: int) -> bool:
+        """Return whether a port is taken"""
+        if self._in_range(port):
+            return bool(self._used[port - self.start])
+        return port in self._outside
+
+    def mark(self, port: int):
+        """Record a port as taken, whether or not it already was"""
+        if not self._in_range(port):
+            self._outside.add(port)
+        elif not self._used[port - self.start]:
+            self._used[port - self.start] = 1
+            self._taken += 1
+
+    def allocate(self) -> int:
+        """Take the next free port from the range"""
+        while self._free:
+            port = self._free.popleft()
+            index = port - self.start
+            self._queued[index] = 0
+            if not self._used[index]:
+                self._used[index] = 1
+                self._taken += 1
+                return port
+        raise PortUnavailableError(f"All ports in {self.start}-{self.end} are in use")
+
+    def reserve(self, port: int):
+        """Take a specific port, failing if it is already in use"""
+        if self.in_use(port):
+            raise PortUnavailableError(f"Port {port} is already in use")
+        self.mark(port)
+
+    def release(self, port: int):
+        """Return a port so it can be handed out again"""
+        if not self._in_range(port):
+            self._outside.discard(port)
+            return
+        index = port - self.start
+        if not self._used[index]:
+            return
+        self._used[index] = 0
+        self._taken -= 1
+        if not self._queued[index]:
+            self._queued[index] = 1
+            self._free.append(port)
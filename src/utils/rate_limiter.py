@@ -0,0 +1,244 @@
+"""
+Token-bucket command rate limiting with a fair queue across guilds
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from config.settings import settings
+from src.utils.metrics import RATE_LIMIT_REJECTED, RATE_LIMIT_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Docker-heavy commands cost more than reads; anything not listed costs 1
+DEFAULT_COMMAND_COSTS = {
+    'create_server': 10,
+    'create_servers': 25,
+    'start_servers': 10,
+    'stop_servers': 10,
+    'restart_servers': 10,
+    'server_logs': 3,
+    'backup': 10,
+    'restore': 10,
+    'export_world': 10,
+    'import_world': 10,
+    'capacity': 2,
+}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a command cannot get tokens within the allowed wait"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"{scope} rate limit exceeded, retry in {retry_after:.0f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Holds up to ``capacity`` tokens, refilled at ``rate`` tokens per second"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated_at')
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = now
+
+    def refill(self, now: float):
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Seconds until ``cost`` tokens are available"""
+        self.refill(now)
+        missing = min(cost, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float('inf')
+
+    def take(self, cost: float):
+        self.tokens -= min(cost, self.capacity)
+
+
+@dataclass
+class _Waiter:
+    user: Hashable
+    guild: Hashable
+    cost: float
+    future: asyncio.Future
+
+
+class CommandRateLimiter:
+    """Per-user, per-guild and global token buckets shared by every cog
+
+    A command runs once all three buckets can pay its cost. Commands that
+    cannot go into a queue rather than being rejected. Waiting commands are
+    served round-robin by guild and, within a guild, in arrival order,
+    skipping ones whose user is still out of tokens. A busy guild therefore
+    cannot starve the others. A command is rejected with
+    ``RateLimitExceeded`` only when it would wait longer than
+    ``RATE_LIMIT_MAX_WAIT`` seconds or its user already has
+    ``RATE_LIMIT_MAX_QUEUED`` commands waiting.
+
+    Buckets are created on first use and dropped once they are full again,
+    so memory stays proportional to recently active users and guilds.
+    """
+
+    def __init__(self, costs: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.costs = {**DEFAULT_COMMAND_COSTS, **settings.COMMAND_COSTS, **(costs or {})}
+        self.clock = clock
+        self.limits = {
+            'user': (settings.RATE_LIMIT_USER_CAPACITY, settings.RATE_LIMIT_USER_PER_MINUTE / 60),
+            'guild': (settings.RATE_LIMIT_GUILD_CAPACITY, settings.RATE_LIMIT_GUILD_PER_MINUTE / 60),
+            'global': (settings.RATE_LIMIT_GLOBAL_CAPACITY, settings.RATE_LIMIT_GLOBAL_PER_MINUTE / 60),
+        }
+        self._buckets: Dict[Tuple[str, Hashable], TokenBucket] = {}
+        self._queues: 'collections.OrderedDict[Hashable, Deque[_Waiter]]' = collections.OrderedDict()
+        self._queued_per_user: Dict[Hashable, int] = collections.Counter()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def cost(self, command_name: str) -> float:
+        return self.costs.get(command_name, 1)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _bucket(self, scope: str, key: Hashable, now: float) -> TokenBucket:
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            capacity, rate = self.limits[scope]
+            bucket = self._buckets[(scope, key)] = TokenBucket(capacity, rate, now)
+        return bucket
+
+    def _wait_time(self, user: Hashable, guild: Hashable, cost: float, now: float) -> Tuple[float, str]:
+        """The longest wait among the three buckets, and which one it is"""
+        return max(
+            (self._bucket(scope, key, now).wait_time(cost, now), scope)
+            for scope, key in (('user', user), ('guild', guild), ('global', None))
+        )
+
+    def _take(self, user: Hashable, guild: Hashable, cost: float, now: float):
+        for scope, key in (('user', user), ('guild', guild), ('global', None)):
+            self._bucket(scope, key, now).take(cost)
+
+    def _estimate(self, user: Hashable, guild: Hashable, cost: float, now: float) -> Tuple[float, str]:
+        """Rough wait for a new request, counting tokens owed to commands already queued"""
+        wait, scope = self._wait_time(user, guild, cost, now)
+        ahead = sum(waiter.cost for queue in self._queues.values() for waiter in queue)
+        _, global_rate = self.limits['global']
+        backlog = ahead / global_rate if global_rate > 0 else float('inf')
+        if backlog > wait:
+            return backlog, 'global'
+        return wait, scope
+
+    async def acquire(self, user: Hashable, guild: Hashable, cost: float,
+                      on_queued: Optional[Callable[[float], Awaitable[None]]] = None) -> float:
+        """Wait until the command may run; return how long it waited
+
+        ``on_queued(estimated_wait)`` is awaited once if the command has to
+        queue, so the caller can tell the user.
+        """
+        now = self.clock()
+        self._prune(now)
+        if not self._queues and self._wait_time(user, guild, cost, now)[0] == 0:
+            self._take(user, guild, cost, now)
+            return 0.0
+
+        estimate, scope = self._estimate(user, guild, cost, now)
+        if self._queued_per_user[user] >= settings.RATE_LIMIT_MAX_QUEUED:
+            scope = 'user'
+        elif estimate <= settings.RATE_LIMIT_MAX_WAIT:
+            scope = None
+        if scope:
+            RATE_LIMIT_REJECTED.labels(scope).inc()
+            logger.info(f"Rejected command from {user} in {guild}: {scope} limit, ~{estimate:.0f}s wait")
+            raise RateLimitExceeded(scope, estimate)
+
+        waiter = _Waiter(user, guild, cost, asyncio.get_running_loop().create_future())
+        self._queues.setdefault(guild, collections.deque()).append(waiter)
+        self._queued_per_user[user] += 1
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            if on_queued:
+                await on_queued(estimate)
+            remaining = settings.RATE_LIMIT_MAX_WAIT - (self.clock() - now)
+            try:
+                await asyncio.wait_for(waiter.future, timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                RATE_LIMIT_REJECTED.labels('timeout').inc()
+                raise RateLimitExceeded('queue', settings.RATE_LIMIT_MAX_WAIT) from None
+        finally:
+            # Cancelled or timed out waiters are skipped by the dispatcher
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._wakeup.set()
+            self._queued_per_user[user] -= 1
+            if not self._queued_per_user[user]:
+                del self._queued_per_user[user]
+        waited = self.clock() - now
+        RATE_LIMIT_WAIT_SECONDS.observe(waited)
+        return waited
+
+    def _serve_one(self, now: float) -> Optional[float]:
+        """Start the next runnable waiter in guild rotation
+
+        Returns ``None`` if one was started, otherwise the shortest wait
+        until some queued command could run.
+        """
+        shortest = float('inf')
+        for guild in list(self._queues):
+            queue = self._queues[guild]
+            # Drop commands that were cancelled while waiting
+            while queue and queue[0].future.done():
+                queue.popleft()
+            for waiter in queue:
+                if waiter.future.done():
+                    continue
+                wait, _ = self._wait_time(waiter.user, guild, waiter.cost, now)
+                if wait == 0:
+                    self._take(waiter.user, guild, waiter.cost, now)
+                    queue.remove(waiter)
+                    waiter.future.set_result(None)
+                    # The guild goes to the back of the rotation
+                    del self._queues[guild]
+                    if queue:
+                        self._queues[guild] = queue
+                    return None
+                shortest = min(shortest, wait)
+            if not queue:
+                del self._queues[guild]
+        return shortest
+
+    async def _dispatch(self):
+        while self._queues:
+            self._wakeup.clear()
+            wait = self._serve_one(self.clock())
+            if wait is None:
+                continue
+            try:
+                # New arrivals and cancellations can change what runs next, so wake up for them too
+                await asyncio.wait_for(self._wakeup.wait(), timeout=None if wait == float('inf') else wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _prune(self, now: float):
+        """Forget buckets that have refilled completely"""
+        if len(self._buckets) < 1024:
+            return
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self._buckets[key]
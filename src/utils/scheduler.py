@@ -0,0 +1,196 @@
+"""
+Host capacity tracking and admission control for new servers
+"""
+
+import asyncio
+import contextlib
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.settings import settings
+from src.utils.validators import ServerValidator
+
+logger = logging.getLogger(__name__)
+
+MEMORY_LABEL = "minecraft.mem_limit"
+CPU_LABEL = "minecraft.nano_cpus"
+
+
+class InsufficientCapacityError(Exception):
+    """Raised when a server cannot be placed without overcommitting the host"""
+
+
+def template_resources(template) -> Tuple[int, int]:
+    """Return the container memory limit (bytes) and nano CPUs for a template
+
+    The JVM heap comes from the template's ``MEMORY``; the container limit
+    adds ``CONTAINER_MEMORY_OVERHEAD`` on top for metaspace, threads and
+    native buffers so the kernel does not OOM-kill a server at full heap.
+    """
+    heap = ServerValidator.parse_memory(template.environment.get('MEMORY', settings.DEFAULT_MEMORY))
+    memory = int(heap * (1 + settings.CONTAINER_MEMORY_OVERHEAD))
+    cpus = getattr(template, 'cpus', None) or settings.DEFAULT_CPUS
+    return memory, int(cpus * 1e9)
+
+
+def resource_labels(memory: int, nano_cpus: int) -> Dict[str, str]:
+    """Labels recording a container's limits so they can be read back cheaply"""
+    return {MEMORY_LABEL: str(memory), CPU_LABEL: str(nano_cpus)}
+
+
+@dataclass
+class Headroom:
+    """Capacity summary for a Docker host"""
+
+    memory_total: int
+    memory_reserved: int
+    cpu_total: int
+    cpu_reserved: int
+    running: int
+    pending: int
+    waiting: int
+
+    @property
+    def memory_free(self) -> int:
+        return max(self.memory_total - self.memory_reserved, 0)
+
+    @property
+    def cpu_free(self) -> int:
+        return max(self.cpu_total - self.cpu_reserved, 0)
+
+
+class CapacityScheduler:
+    """Admits new servers only when the host can fit their limits
+
+    Host totals come from ``client.info()`` and running reservations from
+    the resource labels of running containers, both fetched with one call
+    each. Creations that do not fit wait in a queue until capacity frees up
+    or ``ADMISSION_QUEUE_TIMEOUT`` passes.
+    """
+
+    def __init__(self, docker_helper):
+        self.docker_helper = docker_helper
+        self.memory_total = 0
+        self.cpu_total = 0
+        self._running: Dict[str, Tuple[int, int]] = {}
+        self._pending: Dict[str, Tuple[int, int]] = {}
+        self._waiting = 0
+        self._refreshed_at: Optional[float] = None
+        self._condition = asyncio.Condition()
+
+    def mark_stale(self):
+        """Force a refresh before the next admission decision"""
+        self._refreshed_at = None
+
+    async def refresh(self):
+        """Reload host totals and running container reservations"""
+        client = self.docker_helper.client
+        info = await self.docker_helper.run('info', client.info)
+        containers = await self.docker_helper.run(
+            'container_list', client.containers.list,
+            sparse=True, filters={'status': 'running'}
+        )
+
+        default_memory = ServerValidator.parse_memory(settings.DEFAULT_MEMORY)
+        running = {}
+        for container in containers:
+            attrs = container.attrs
+            name = (attrs.get('Names') or [''])[0].lstrip('/')
+            labels = attrs.get('Labels') or {}
+            if MEMORY_LABEL in labels:
+                running[name] = (int(labels[MEMORY_LABEL]), int(labels.get(CPU_LABEL, 0)))
+            elif name.startswith('minecraft_'):
+                # Servers created before limits were recorded
+                running[name] = (default_memory, int(settings.DEFAULT_CPUS * 1e9))
+
+        reserved_memory = ServerValidator.parse_memory(settings.HOST_RESERVED_MEMORY)
+        self.memory_total = max(info.get('MemTotal', 0) - reserved_memory, 0)
+        self.cpu_total = int(info.get('NCPU', 0) * 1e9 * settings.CPU_OVERCOMMIT)
+        self._running = running
+        self._refreshed_at = asyncio.get_running_loop().time()
+
+    def headroom(self) -> Headroom:
+        """Return the current capacity summary"""
+        reservations = list(self._running.values()) + list(self._pending.values())
+        return Headroom(
+            memory_total=self.memory_total,
+            memory_reserved=sum(memory for memory, _ in reservations),
+            cpu_total=self.cpu_total,
+            cpu_reserved=sum(cpus for _, cpus in reservations),
+            running=len(self._running),
+            pending=len(self._pending),
+            waiting=self._waiting
+        )
+
+    def _fits(self, memory: int, nano_cpus: int) -> bool:
+        headroom = self.headroom()
+        return memory <= headroom.memory_free and nano_cpus <= headroom.cpu_free
+
+    async def ensure_fresh(self):
+        """Refresh capacity data if it is older than the refresh interval"""
+        if self._is_stale():
+            await self.refresh()
+
+    def _is_stale(self) -> bool:
+        if self._refreshed_at is None:
+            return True
+        return asyncio.get_running_loop().time() - self._refreshed_at > settings.CAPACITY_REFRESH_INTERVAL
+
+    @contextlib.asynccontextmanager
+    async def admit(self, name: str, memory: int, nano_cpus: int,
+                    on_wait: Optional[Callable[[], Awaitable[None]]] = None) -> AsyncIterator[None]:
+        """Reserve capacity for a container while it is being created"""
+        key = f"minecraft_{name}"
+        await self._reserve(key, memory, nano_cpus, on_wait)
+        started = False
+        try:
+            yield
+            started = True
+        finally:
+            async with self._condition:
+                self._pending.pop(key, None)
+                if started:
+                    # Count it as running until the next refresh sees the container
+                    self._running[key] = (memory, nano_cpus)
+                self._condition.notify_all()
+
+    async def _reserve(self, key: str, memory: int, nano_cpus: int,
+                       on_wait: Optional[Callable[[], Awaitable[None]]]):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ADMISSION_QUEUE_TIMEOUT
+        waited = False
+        async with self._condition:
+            try:
+                while True:
+                    if self._is_stale():
+                        await self.refresh()
+                    if self._fits(memory, nano_cpus):
+                        self._pending[key] = (memory, nano_cpus)
+                        return
+                    if memory > self.memory_total or nano_cpus > self.cpu_total:
+                        raise InsufficientCapacityError(
+                            f"needs {memory / 1024 ** 3:.1f}G RAM, host can offer at most "
+                            f"{self.memory_total / 1024 ** 3:.1f}G"
+                        )
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        headroom = self.headroom()
+                        raise InsufficientCapacityError(
+                            f"needs {memory / 1024 ** 3:.1f}G RAM and {nano_cpus / 1e9:g} CPUs, "
+                            f"only {headroom.memory_free / 1024 ** 3:.1f}G and "
+                            f"{headroom.cpu_free / 1e9:g} CPUs free"
+                        )
+                    if not waited:
+                        waited = True
+                        self._waiting += 1
+                        if on_wait:
+                            await on_wait()
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), timeout=min(remaining, 5))
+                    except asyncio.TimeoutError:
+                        # Containers may have stopped outside the bot; look again
+                        self.mark_stale()
+            finally:
+                if waited:
+                    self._waiting -= 1
@@ -0,0 +1,208 @@
+"""
+Warm standby pool of pre-initialized server data volumes
+"""
+
+import asyncio
+import functools
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Set
+
+from config.settings import settings
+from src.utils.scheduler import resource_labels, template_resources
+from src.utils.validators import ServerValidator
+
+logger = logging.getLogger(__name__)
+
+STANDBY_LABEL = "minecraft.standby"
+
+
+class StandbyPool:
+    """Keeps pre-initialized data volumes ready for each template
+
+    A standby volume is produced by starting a throwaway container from the
+    template, waiting until the server has downloaded its jar and generated
+    the world, then stopping and removing the container. Claiming a volume
+    lets ``create_server`` start a container that boots straight into an
+    existing world, with its final name and port, instead of initializing one
+    from scratch.
+    """
+
+    def __init__(self, docker_helper, image_manager, sizes: Dict[str, int]):
+        self.docker_helper = docker_helper
+        self.image_manager = image_manager
+        self.sizes = sizes
+        self.templates: Dict[str, "ServerTemplate"] = {}
+        self.ready: Dict[str, List[str]] = {}
+        self.warming: Dict[str, int] = {}
+        self.memory_budget = ServerValidator.parse_memory(settings.STANDBY_MEMORY_BUDGET)
+        self._warming_memory = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._warm_tasks: Set[asyncio.Task] = set()
+
+    def start(self, templates: Dict[str, "ServerTemplate"], in_use: Iterable[str] = ()):
+        """Start refilling the pool for the configured templates"""
+        self.templates = templates
+        if not any(self.sizes.get(name, 0) > 0 for name in templates):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(set(in_use)))
+
+    async def stop(self):
+        """Stop the refill loop and any warm-ups in progress"""
+        tasks = [t for t in [self._task, *self._warm_tasks] if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._warm_tasks.clear()
+
+    def claim(self, template_name: str) -> Optional[str]:
+        """Take a ready volume for a template, or None if the pool is empty"""
+        volumes = self.ready.get(template_name)
+        if not volumes:
+            return None
+        volume_name = volumes.pop()
+        self._wakeup.set()
+        logger.info(f"Claimed standby volume {volume_name} for template {template_name}")
+        return volume_name
+
+    def release(self, template_name: str, volume_name: str):
+        """Return an unused claimed volume to the pool"""
+        self.ready.setdefault(template_name, []).append(volume_name)
+
+    async def _run(self, in_use: Set[str]):
+        """Discover existing standby volumes, then keep the pool topped up"""
+        await self._discover(in_use)
+        while True:
+            self._refill()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.STANDBY_REFILL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _discover(self, in_use: Set[str]):
+        """Rebuild the pool from labelled volumes left by a previous run"""
+        client = self.docker_helper.client
+        try:
+            # Warm-up containers that never finished are discarded along with their volume
+            stale = await self.docker_helper.run(
+                'container_list', client.containers.list,
+                all=True, filters={'label': STANDBY_LABEL}
+            )
+            for container in stale:
+                await self.docker_helper.run('container_remove', container.remove, force=True)
+
+            volumes = await self.docker_helper.run(
+                'volume_list', client.volumes.list,
+                filters={'label': STANDBY_LABEL, 'dangling': True}
+            )
+        except Exception as e:
+            logger.error(f"Error discovering standby volumes: {e}")
+            return
+
+        for volume in volumes:
+            if volume.name in in_use:
+                continue
+            if stale and any(volume.name == self._volume_for(c) for c in stale):
+                await self.docker_helper.run('volume_remove', volume.remove, force=True)
+                continue
+            template_name = volume.attrs.get('Labels', {}).get(STANDBY_LABEL)
+            if template_name in self.templates:
+                self.ready.setdefault(template_name, []).append(volume.name)
+
+        logger.info(f"Discovered standby volumes: { {k: len(v) for k, v in self.ready.items()} }")
+
+    @staticmethod
+    def _volume_for(container) -> Optional[str]:
+        """Return the data volume mounted by a warm-up container"""
+        for mount in container.attrs.get('Mounts', []):
+            if mount.get('Destination') == '/data':
+                return mount.get('Name')
+        return None
+
+    def _refill(self):
+        """Start warm-ups for templates below their target size"""
+        for template_name, target in self.sizes.items():
+            template = self.templates.get(template_name)
+            if template is None or target <= 0:
+                continue
+            if not self.image_manager.is_ready(template.image):
+                continue
+
+            memory, _ = template_resources(template)
+            deficit = target - len(self.ready.get(template_name, [])) - self.warming.get(template_name, 0)
+            while deficit > 0 and self._warming_memory + memory <= self.memory_budget:
+                self._warming_memory += memory
+                self.warming[template_name] = self.warming.get(template_name, 0) + 1
+                task = asyncio.create_task(self._warm(template_name, template, memory))
+                self._warm_tasks.add(task)
+                task.add_done_callback(self._warm_tasks.discard)
+                deficit -= 1
+
+    async def _warm(self, template_name: str, template, memory: int):
+        """Initialize one standby volume for a template"""
+        suffix = uuid.uuid4().hex[:8]
+        volume_name = f"mcstandby_{template_name}_{suffix}"
+        memory_limit, nano_cpus = template_resources(template)
+        labels = {STANDBY_LABEL: template_name}
+        client = self.docker_helper.client
+        container = None
+        try:
+            await self.docker_helper.run(
+                'volume_create', client.volumes.create, name=volume_name, labels=labels
+            )
+            container = await self.docker_helper.run(
+                'create',
+                client.containers.run,
+                self.image_manager.resolve(template.image),
+                name=volume_name,
+                environment=template.environment.copy(),
+                volumes={volume_name: {'bind': '/data', 'mode': 'rw'}},
+                labels={**labels, **resource_labels(memory_limit, nano_cpus)},
+                mem_limit=memory_limit,
+                nano_cpus=nano_cpus,
+                detach=True,
+                timeout=settings.DOCKER_CREATE_TIMEOUT
+            )
+            await self._wait_until_ready(container)
+            await self.docker_helper.run('stop', functools.partial(container.stop, timeout=60), timeout=90)
+            await self.docker_helper.run('container_remove', container.remove)
+
+            self.ready.setdefault(template_name, []).append(volume_name)
+            logger.info(f"Standby volume {volume_name} ready for template {template_name}")
+        except Exception as e:
+            logger.error(f"Error warming standby volume for template {template_name}: {e}")
+            await self._discard(container, volume_name)
+        finally:
+            self._warming_memory -= memory
+            self.warming[template_name] -= 1
+
+    async def _wait_until_ready(self, container):
+        """Wait until the server inside a container has finished starting"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.STANDBY_WARMUP_TIMEOUT
+        while loop.time() < deadline:
+            await asyncio.sleep(5)
+            await self.docker_helper.run('container_inspect', container.reload)
+            state = container.attrs.get('State', {})
+            if state.get('Status') == 'exited':
+                raise RuntimeError(f"warm-up container exited with code {state.get('ExitCode')}")
+            if state.get('Health', {}).get('Status') == 'healthy':
+                return
+            logs = await self.docker_helper.run('logs', container.logs, tail=20)
+            if b'Done (' in logs:
+                return
+        raise asyncio.TimeoutError("standby warm-up did not finish in time")
+
+    async def _discard(self, container, volume_name: str):
+        """Remove a failed warm-up container and its volume"""
+        try:
+            if container is not None:
+                await self.docker_helper.run('container_remove', container.remove, force=True)
+            volume = await self.docker_helper.run('volume_get', self.docker_helper.client.volumes.get, volume_name)
+            await self.docker_helper.run('volume_remove', volume.remove, force=True)
+        except Exception as e:
+            logger.error(f"Error discarding standby volume {volume_name}: {e}")
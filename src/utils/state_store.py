@@ -0,0 +1,424 @@
+"""
+Persistent storage backends for active server state
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis
+import redis.asyncio
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Base class for active server state backends
+
+    Records are plain dictionaries keyed by server name, as produced by
+    ``MinecraftServer.to_dict``. Backends must make every write atomic so a
+    crash never leaves the store half-written.
+
+    Local backends serialize per-server work with in-process locks; shared
+    backends override ``lock`` and report writes made by other bot replicas
+    to the callbacks registered with ``add_listener``.
+
+    Code on the event loop uses the ``a``-prefixed methods. Local backends
+    run them inline, as their reads and writes are small local file
+    operations; network backends override them so the loop never waits on
+    a round trip.
+    """
+
+    # Whether other bot replicas write to the same records
+    shared = False
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._listeners: List[Callable[[str, Optional[dict]], None]] = []
+
+    async def start(self):
+        """Start any background work needed by the backend"""
+
+    async def stop(self):
+        """Stop background work started by ``start``"""
+
+    @contextlib.asynccontextmanager
+    async def lock(self, name: str) -> AsyncIterator[None]:
+        """Hold an exclusive lock for a single server while changing it"""
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            yield
+
+    def add_listener(self, callback: Callable[[str, Optional[dict]], None]):
+        """Register a callback for records changed outside this process"""
+        self._listeners.append(callback)
+
+    def _notify(self, name: str, record: Optional[dict]):
+        for callback in self._listeners:
+            try:
+                callback(name, record)
+            except Exception as e:
+                logger.error(f"Error in state listener for {name}: {e}")
+
+    def load_all(self) -> Dict[str, dict]:
+        """Return every stored server record"""
+        raise NotImplementedError
+
+    def get(self, name: str) -> Optional[dict]:
+        """Return a single server record"""
+        raise NotImplementedError
+
+    def upsert(self, name: str, record: dict):
+        """Insert or replace a single server record"""
+        raise NotImplementedError
+
+    def upsert_many(self, records: Iterable[Tuple[str, dict]]):
+        """Insert or replace several server records"""
+        for name, record in records:
+            self.upsert(name, record)
+
+    def delete(self, name: str):
+        """Remove a server record"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+    async def aload_all(self) -> Dict[str, dict]:
+        return self.load_all()
+
+    async def aget(self, name: str) -> Optional[dict]:
+        return self.get(name)
+
+    async def aupsert(self, name: str, record: dict):
+        self.upsert(name, record)
+
+    async def aupsert_many(self, records: Iterable[Tuple[str, dict]]):
+        self.upsert_many(records)
+
+    async def adelete(self, name: str):
+        self.delete(name)
+
+
+class JsonStateStore(StateStore):
+    """Stores all records in a single JSON file, replaced atomically on write"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+        self._records: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._records is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._records = json.load(f)
+            except FileNotFoundError:
+                self._records = {}
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing servers file: {e}")
+                self._records = {}
+        return self._records
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._records, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def load_all(self) -> Dict[str, dict]:
+        return dict(self._load())
+
+    def get(self, name: str) -> Optional[dict]:
+        return self._load().get(name)
+
+    def upsert(self, name: str, record: dict):
+        self.upsert_many([(name, record)])
+
+    def upsert_many(self, records: Iterable[Tuple[str, dict]]):
+        with self._lock:
+            self._load().update(records)
+            self._write()
+
+    def delete(self, name: str):
+        with self._lock:
+            if self._load().pop(name, None) is not None:
+                self._write()
+
+
+class SQLiteStateStore(StateStore):
+    """Stores one row per server in SQLite using write-ahead logging
+
+    WAL mode gives atomic O(1) upserts and lets readers proceed while a write
+    is in flight. On first use an existing JSON servers file is imported.
+    """
+
+    def __init__(self, path: str, legacy_json: Optional[str] = None):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS servers (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        if legacy_json:
+            self._import_legacy(legacy_json)
+
+    def _import_legacy(self, legacy_json: str):
+        """Import records from the old JSON file if the table is empty"""
+        if not Path(legacy_json).exists():
+            return
+        if self._conn.execute("SELECT 1 FROM servers LIMIT 1").fetchone():
+            return
+        records = JsonStateStore(legacy_json).load_all()
+        if records:
+            self.upsert_many(records.items())
+            logger.info(f"Imported {len(records)} servers from {legacy_json}")
+
+    def load_all(self) -> Dict[str, dict]:
+        rows = self._conn.execute("SELECT name, data FROM servers").fetchall()
+        return {name: json.loads(data) for name, data in rows}
+
+    def get(self, name: str) -> Optional[dict]:
+        row = self._conn.execute("SELECT data FROM servers WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def upsert(self, name: str, record: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO servers (name, data) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                (name, json.dumps(record, separators=(',', ':')))
+            )
+
+    def upsert_many(self, records: Iterable[Tuple[str, dict]]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO servers (name, data) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                    ((name, json.dumps(record, separators=(',', ':'))) for name, record in records)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM servers WHERE name = ?", (name,))
+
+    def close(self):
+        self._conn.close()
+
+
+class RedisStateStore(StateStore):
+    """Shares server records between bot replicas through Redis
+
+    Records live in a single hash so each write is an O(1) ``HSET``. Every
+    write is published on a channel; other replicas use it to refresh their
+    in-memory view. Per-server locks are Redis locks, so two replicas cannot
+    create the same server at once.
+    """
+
+    shared = True
+
+    def __init__(self, client: redis.Redis, async_client: redis.asyncio.Redis,
+                 prefix: str = "minecraft"):
+        super().__init__()
+        self.client = client
+        self.async_client = async_client
+        self.key = f"{prefix}:servers"
+        self.channel = f"{prefix}:servers:changes"
+        self.lock_prefix = f"{prefix}:lock:"
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._pubsub = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "minecraft") -> 'RedisStateStore':
+        """Create a store connected to the given Redis URL"""
+        return cls(
+            redis.Redis.from_url(url, decode_responses=True),
+            redis.asyncio.Redis.from_url(url, decode_responses=True),
+            prefix=prefix
+        )
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._pubsub = self.async_client.pubsub()
+            await self._pubsub.subscribe(self.channel)
+            self._task = asyncio.create_task(self._listen(self._pubsub))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            # The client can swallow a cancellation that lands in the middle of a
+            # command, so the subscription is closed too; that ends the listener
+            await self._pubsub.aclose()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._pubsub = None
+        await self.async_client.aclose()
+
+    async def _listen(self, pubsub):
+        """Apply change notifications published by other replicas"""
+        async for message in pubsub.listen():
+            if message.get('type') != 'message':
+                continue
+            try:
+                change = json.loads(message['data'])
+            except (TypeError, json.JSONDecodeError):
+                continue
+            if change.get('origin') == self.origin:
+                continue
+            name = change['name']
+            data = await self.async_client.hget(self.key, name)
+            self._notify(name, json.loads(data) if data else None)
+
+    def _publish(self, pipe, name: str):
+        pipe.publish(self.channel, json.dumps({'origin': self.origin, 'name': name}))
+
+    @contextlib.asynccontextmanager
+    async def lock(self, name: str) -> AsyncIterator[None]:
+        """Hold a server lock shared by all replicas
+
+        ``REDIS_LOCK_TIMEOUT`` bounds the wait for it. The key expires after
+        ``REDIS_LOCK_LEASE`` so a replica that dies does not hold it forever,
+        and is renewed for as long as the lock is held.
+        """
+        key = f"{self.lock_prefix}{name}"
+        token = uuid.uuid4().hex
+        lease_ms = int(settings.REDIS_LOCK_LEASE * 1000)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.REDIS_LOCK_TIMEOUT
+        delay = 0.01
+        while not await self.async_client.set(key, token, nx=True, px=lease_ms):
+            if loop.time() >= deadline:
+                raise TimeoutError(f"Timed out waiting for lock on server {name}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+        renewal = asyncio.create_task(self._renew(key, token, name, lease_ms))
+        try:
+            yield
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+            await self._release(key, token, name)
+
+    async def _renew(self, key: str, token: str, name: str, lease_ms: int):
+        """Extend a held lock's expiry every third of its lease"""
+        while True:
+            await asyncio.sleep(lease_ms / 3000)
+            try:
+                async with self.async_client.pipeline() as pipe:
+                    await pipe.watch(key)
+                    if await pipe.get(key) != token:
+                        logger.error(f"Lock for server {name} was lost while held")
+                        return
+                    pipe.multi()
+                    pipe.pexpire(key, lease_ms)
+                    await pipe.execute()
+            except redis.exceptions.WatchError:
+                logger.error(f"Lock for server {name} changed while held")
+                return
+            except redis.exceptions.RedisError as e:
+                # Try again before the lease runs out
+                logger.warning(f"Could not renew the lock for server {name}: {e}")
+
+    async def _release(self, key: str, token: str, name: str):
+        """Delete a lock key only if it still holds our token"""
+        async with self.async_client.pipeline() as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != token:
+                    logger.warning(f"Lock for server {name} expired before release")
+                    return
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+            except redis.exceptions.WatchError:
+                logger.warning(f"Lock for server {name} changed before release")
+
+    def load_all(self) -> Dict[str, dict]:
+        return {name: json.loads(data) for name, data in self.client.hgetall(self.key).items()}
+
+    def get(self, name: str) -> Optional[dict]:
+        data = self.client.hget(self.key, name)
+        return json.loads(data) if data else None
+
+    def upsert(self, name: str, record: dict):
+        self.upsert_many([(name, record)])
+
+    def upsert_many(self, records: Iterable[Tuple[str, dict]]):
+        with self.client.pipeline() as pipe:
+            for name, record in records:
+                pipe.hset(self.key, name, json.dumps(record, separators=(',', ':')))
+                self._publish(pipe, name)
+            pipe.execute()
+
+    def delete(self, name: str):
+        with self.client.pipeline() as pipe:
+            pipe.hdel(self.key, name)
+            self._publish(pipe, name)
+            pipe.execute()
+
+    def close(self):
+        self.client.close()
+
+    async def aload_all(self) -> Dict[str, dict]:
+        return {name: json.loads(data) for name, data in (await self.async_client.hgetall(self.key)).items()}
+
+    async def aget(self, name: str) -> Optional[dict]:
+        data = await self.async_client.hget(self.key, name)
+        return json.loads(data) if data else None
+
+    async def aupsert(self, name: str, record: dict):
+        await self.aupsert_many([(name, record)])
+
+    async def aupsert_many(self, records: Iterable[Tuple[str, dict]]):
+        async with self.async_client.pipeline() as pipe:
+            for name, record in records:
+                pipe.hset(self.key, name, json.dumps(record, separators=(',', ':')))
+                self._publish(pipe, name)
+            await pipe.execute()
+
+    async def adelete(self, name: str):
+        async with self.async_client.pipeline() as pipe:
+            pipe.hdel(self.key, name)
+            self._publish(pipe, name)
+            await pipe.execute()
+
+
+def create_state_store(backend: Optional[str] = None) -> StateStore:
+    """Create the state backend selected by ``STATE_BACKEND``"""
+    backend = (backend or settings.STATE_BACKEND).lower()
+    if backend == 'json':
+        return JsonStateStore(settings.SERVERS_FILE)
+    if backend == 'sqlite':
+        return SQLiteStateStore(settings.STATE_DB_FILE, legacy_json=settings.SERVERS_FILE)
+    if backend == 'redis':
+        return RedisStateStore.from_url(settings.REDIS_URL, prefix=settings.REDIS_KEY_PREFIX)
+    raise ValueError(f"Unknown state backend: {backend}")
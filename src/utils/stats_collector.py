@@ -0,0 +1,330 @@
+"""
+Per-container resource stats kept in compact fixed-resolution ring buffers
+"""
+
+import asyncio
+import logging
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Each column is stored as an unsigned 16-bit integer in the given unit;
+# 0xFFFF marks a missing sample and larger values saturate just below it
+MISSING = 0xFFFF
+COLUMNS: Dict[str, float] = {
+    'cpu': 0.1,                # percent of one core, in tenths
+    'memory': 1024 ** 2,       # bytes, in MiB
+    'net_rx': 1024,            # bytes/s, in KiB/s
+    'net_tx': 1024,
+    'block_read': 1024,
+    'block_write': 1024,
+}
+
+
+@dataclass
+class StatsReading:
+    """Cumulative counters from one Docker stats sample"""
+
+    timestamp: float
+    cpu_total: int
+    system_total: int
+    online_cpus: int
+    memory: int
+    net_rx: int
+    net_tx: int
+    block_read: int
+    block_write: int
+
+    @classmethod
+    def from_api(cls, stats: Dict, timestamp: Optional[float] = None) -> 'StatsReading':
+        """Parse the Engine API stats object (cgroup v1 or v2)"""
+        cpu = stats.get('cpu_stats') or {}
+        usage = cpu.get('cpu_usage') or {}
+        memory = stats.get('memory_stats') or {}
+        memory_detail = memory.get('stats') or {}
+        # Page cache is reclaimable, so `docker stats` leaves it out too
+        cache = memory_detail.get('inactive_file', memory_detail.get('total_inactive_file', memory_detail.get('cache', 0)))
+        networks = (stats.get('networks') or {}).values()
+        block = {'read': 0, 'write': 0}
+        for entry in (stats.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []:
+            op = entry.get('op', '').lower()
+            if op in block:
+                block[op] += entry.get('value', 0)
+        return cls(
+            timestamp=timestamp if timestamp is not None else time.time(),
+            cpu_total=usage.get('total_usage', 0),
+            system_total=cpu.get('system_cpu_usage', 0),
+            online_cpus=cpu.get('online_cpus') or len(usage.get('percpu_usage') or []) or 1,
+            memory=max(memory.get('usage', 0) - cache, 0),
+            net_rx=sum(network.get('rx_bytes', 0) for network in networks),
+            net_tx=sum(network.get('tx_bytes', 0) for network in networks),
+            block_read=block['read'],
+            block_write=block['write'],
+        )
+
+    def rates(self, previous: 'StatsReading') -> Optional[Dict[str, float]]:
+        """Usage between two readings, in the units of ``COLUMNS`` before scaling"""
+        elapsed = self.timestamp - previous.timestamp
+        system_delta = self.system_total - previous.system_total
+        if elapsed <= 0 or system_delta <= 0 or self.cpu_total < previous.cpu_total:
+            # Out of order, or the container restarted and its counters reset
+            return None
+
+        def rate(name: str) -> float:
+            return max(getattr(self, name) - getattr(previous, name), 0) / elapsed
+
+        return {
+            'cpu': (self.cpu_total - previous.cpu_total) / system_delta * self.online_cpus * 100,
+            'memory': self.memory,
+            'net_rx': rate('net_rx'),
+            'net_tx': rate('net_tx'),
+            'block_read': rate('block_read'),
+            'block_write': rate('block_write'),
+        }
+
+
+class StatsSeries:
+    """A fixed-resolution ring of samples with one typed array per column
+
+    Slot ``n`` holds the sample for the ``resolution``-second interval
+    starting at ``n * resolution``, so timestamps are implied by position
+    and cost nothing. Intervals with no sample read back as missing.
+    """
+
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self.size = size
+        self.columns = {name: array('H', [MISSING]) * size for name in COLUMNS}
+        self.latest: Optional[int] = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+    def record(self, timestamp: float, values: Dict[str, float]):
+        """Store the sample for the interval containing ``timestamp``"""
+        slot = int(timestamp // self.resolution)
+        if self.latest is not None:
+            if slot <= self.latest - self.size:
+                return
+            # Clear intervals skipped since the last sample, at most the whole ring
+            for skipped in range(self.latest + 1, min(slot, self.latest + 1 + self.size)):
+                for column in self.columns.values():
+                    column[skipped % self.size] = MISSING
+        if self.latest is None or slot > self.latest:
+            self.latest = slot
+        for name, unit in COLUMNS.items():
+            value = values.get(name)
+            self.columns[name][slot % self.size] = (
+                MISSING if value is None else min(int(round(value / unit)), MISSING - 1)
+            )
+
+    def window(self, seconds: float) -> Tuple[float, Dict[str, List[Optional[float]]]]:
+        """The samples covering the last ``seconds``, oldest first, with the start time"""
+        if self.latest is None:
+            return time.time(), {name: [] for name in COLUMNS}
+        count = max(1, min(int(seconds // self.resolution), self.size))
+        first = self.latest - count + 1
+        result = {}
+        for name, unit in COLUMNS.items():
+            column = self.columns[name]
+            result[name] = [
+                None if slot < 0 or column[slot % self.size] == MISSING else column[slot % self.size] * unit
+                for slot in range(first, self.latest + 1)
+            ]
+        return first * self.resolution, result
+
+
+class _Downsampler:
+    """Averages per-second readings into one sample per resolution interval"""
+
+    def __init__(self, series: StatsSeries):
+        self.series = series
+        self.previous: Optional[StatsReading] = None
+        self.slot: Optional[int] = None
+        self.sums: Dict[str, float] = {}
+        self.count = 0
+
+    def add(self, reading: StatsReading):
+        previous, self.previous = self.previous, reading
+        rates = reading.rates(previous) if previous else None
+        if rates is None:
+            return
+        slot = int(reading.timestamp // self.series.resolution)
+        if slot != self.slot:
+            self.flush()
+            self.slot = slot
+        for name, value in rates.items():
+            self.sums[name] = self.sums.get(name, 0.0) + value
+        self.count += 1
+
+    def flush(self):
+        if self.count:
+            self.series.record(
+                self.slot * self.series.resolution,
+                {name: total / self.count for name, total in self.sums.items()}
+            )
+        self.sums, self.count = {}, 0
+
+
+class StatsCollector:
+    """Collects `docker stats` data for every running server on a host
+
+    Up to ``STATS_MAX_STREAMS`` containers get a long-lived stats stream on a
+    dedicated thread pool, averaged into one sample per
+    ``STATS_RESOLUTION`` seconds. Containers beyond that are polled with a
+    one-shot read each interval, which returns at once instead of waiting
+    for the daemon to take a second sample; rates come from the difference
+    to the previous poll. Which servers to follow comes from the status
+    poller's snapshot, so this makes no listing calls of its own.
+    """
+
+    def __init__(self, docker_helper, status_poller, resolution: Optional[int] = None,
+                 retention_hours: Optional[float] = None, max_streams: Optional[int] = None):
+        self.docker_helper = docker_helper
+        self.status_poller = status_poller
+        self.resolution = resolution or settings.STATS_RESOLUTION
+        self.size = int((retention_hours or settings.STATS_RETENTION_HOURS) * 3600 // self.resolution)
+        self.max_streams = max_streams if max_streams is not None else settings.STATS_MAX_STREAMS
+        self.series: Dict[str, StatsSeries] = {}
+        self._samplers: Dict[str, _Downsampler] = {}
+        self._streams: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start collecting in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop collecting and close every stream"""
+        tasks = list(self._streams.values())
+        if self._task:
+            tasks.append(self._task)
+            self._task = None
+        self._streams = {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get(self, server_name: str) -> Optional[StatsSeries]:
+        """Return a server's stats history"""
+        return self.series.get(server_name)
+
+    @property
+    def streaming(self) -> int:
+        return len(self._streams)
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Error collecting container stats: {e}")
+            await asyncio.sleep(max(self.resolution - (time.monotonic() - started), 0))
+
+    async def collect(self):
+        """Reconcile streams with the running servers and poll the rest once"""
+        running = {name: status for name, status in self.status_poller.snapshot.items() if status.state == 'running'}
+
+        for name in list(self._streams):
+            if name not in running:
+                self._streams.pop(name).cancel()
+        for name in set(self._samplers) - set(running):
+            self._samplers.pop(name).flush()
+        # History survives restarts but not removal
+        for name in set(self.series) - set(self.status_poller.snapshot):
+            del self.series[name]
+
+        polled = []
+        for name, status in running.items():
+            if name in self._streams:
+                continue
+            if len(self._streams) < self.max_streams:
+                self._streams[name] = asyncio.create_task(self._follow(name, status.container_id))
+            else:
+                polled.append((name, status.container_id))
+        await asyncio.gather(*(self._poll(name, container_id) for name, container_id in polled))
+
+    def _sampler(self, name: str) -> _Downsampler:
+        sampler = self._samplers.get(name)
+        if sampler is None:
+            series = self.series.get(name)
+            if series is None:
+                series = self.series[name] = StatsSeries(self.resolution, self.size)
+            sampler = self._samplers[name] = _Downsampler(series)
+        return sampler
+
+    async def _follow(self, name: str, container_id: str):
+        try:
+            async for stats in self.docker_helper.stream_stats(container_id):
+                self._sampler(name).add(StatsReading.from_api(stats))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Stats stream for {name} ended: {e}")
+        finally:
+            # Started again on the next round if the server is still running
+            if self._streams.get(name) is asyncio.current_task():
+                del self._streams[name]
+
+    async def _poll(self, name: str, container_id: str):
+        try:
+            stats = await self.docker_helper.stats_once(container_id)
+        except Exception as e:
+            logger.debug(f"Could not read stats for {name}: {e}")
+            return
+        sampler = self._sampler(name)
+        sampler.add(StatsReading.from_api(stats))
+        # One reading per interval, so each completes its slot
+        sampler.flush()
+
+
+def parse_window(text: str) -> Optional[int]:
+    """Parse a window such as ``90s``, ``30m``, ``6h`` or ``1d`` into seconds"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    text = text.strip().lower()
+    if text[-1:] in units and text[:-1].isdigit():
+        return int(text[:-1]) * units[text[-1]]
+    if text.isdigit():
+        return int(text) * 60
+    return None
+
+
+def sparkline(values: Sequence[Optional[float]], width: int = 40) -> str:
+    """Draw values as block characters, averaging them into ``width`` columns
+
+    Columns with no data are blank. The scale runs from zero to the
+    largest value shown.
+    """
+    if not values:
+        return ""
+    buckets: List[Optional[float]] = []
+    per_bucket = max(len(values) / width, 1)
+    position = 0.0
+    while int(position) < len(values):
+        chunk = [value for value in values[int(position):int(position + per_bucket)] if value is not None]
+        buckets.append(sum(chunk) / len(chunk) if chunk else None)
+        position += per_bucket
+    top = max((value for value in buckets if value is not None), default=0)
+    return "".join(
+        " " if value is None else SPARK_CHARS[min(int(value / top * len(SPARK_CHARS)), len(SPARK_CHARS) - 1) if top else 0]
+        for value in buckets
+    )
+
+
+def summarize(values: Sequence[Optional[float]]) -> Optional[Tuple[float, float, float]]:
+    """Latest, mean and peak of the samples that are present"""
+    present = [value for value in values if value is not None and not math.isnan(value)]
+    if not present:
+        return None
+    return present[-1], sum(present) / len(present), max(present)
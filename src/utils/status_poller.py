@@ -0,0 +1,142 @@
+"""
+Background container status polling with an in-memory snapshot
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATTERN = re.compile(r'\((?:health: )?(healthy|unhealthy|starting)\)')
+
+
+@dataclass
+class ContainerStatus:
+    """Point-in-time status of a server container"""
+
+    server_name: str
+    container_id: str
+    state: str
+    status: str
+    health: Optional[str]
+    updated_at: float
+    # Published ports (container port -> host port) and labels; empty until a listing includes the container
+    ports: Dict[int, int] = field(default_factory=dict)
+    labels: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_list_entry(cls, attrs: Dict, updated_at: float) -> Optional['ContainerStatus']:
+        """Build a status from a ``containers.list`` entry"""
+        names = [name.lstrip('/') for name in attrs.get('Names', [])]
+        name = next((n for n in names if n.startswith('minecraft_')), None)
+        if name is None:
+            return None
+        status = attrs.get('Status', '')
+        match = HEALTH_PATTERN.search(status)
+        return cls(
+            server_name=name[len('minecraft_'):],
+            container_id=attrs.get('Id', ''),
+            state=attrs.get('State', 'unknown'),
+            status=status,
+            health=match.group(1) if match else None,
+            updated_at=updated_at,
+            ports={
+                binding['PrivatePort']: binding['PublicPort']
+                for binding in attrs.get('Ports') or []
+                if binding.get('PublicPort')
+            },
+            labels=attrs.get('Labels') or {}
+        )
+
+
+class StatusPoller:
+    """Keeps a snapshot of every server container's status
+
+    Each refresh lists all server containers with a single API call, so
+    status commands can answer from memory without touching the daemon.
+    """
+
+    def __init__(self, docker_helper, interval: Optional[float] = None):
+        self.docker_helper = docker_helper
+        self.interval = interval if interval is not None else settings.STATUS_POLL_INTERVAL
+        self.snapshot: Dict[str, ContainerStatus] = {}
+        self.updated_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start polling in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        """Stop polling"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self):
+        """Replace the snapshot with the current state of all containers"""
+        try:
+            entries = await self.docker_helper.list_server_containers()
+        except Exception as e:
+            logger.error(f"Error polling container status: {e}")
+            return
+
+        now = time.time()
+        snapshot = {}
+        for attrs in entries:
+            status = ContainerStatus.from_list_entry(attrs, now)
+            if status:
+                snapshot[status.server_name] = status
+        self.snapshot = snapshot
+        self.updated_at = now
+
+    def apply(self, server_name: str, container_id: str, timestamp: float,
+              state: Optional[str] = None, health: Optional[str] = None):
+        """Update a single server's status from an external source"""
+        current = self.snapshot.get(server_name)
+        if current is None:
+            current = ContainerStatus(
+                server_name=server_name,
+                container_id=container_id,
+                state=state or 'unknown',
+                status='',
+                health=health,
+                updated_at=timestamp
+            )
+            self.snapshot[server_name] = current
+        if state is not None:
+            current.state = state
+            current.status = state
+            if state != 'running':
+                current.health = None
+        if health is not None:
+            current.health = health
+        current.container_id = container_id or current.container_id
+        current.updated_at = timestamp
+        self.updated_at = max(self.updated_at or 0, timestamp)
+
+    def get(self, server_name: str) -> Optional[ContainerStatus]:
+        """Return the last known status of a server"""
+        return self.snapshot.get(server_name)
+
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was last refreshed"""
+        if self.updated_at is None:
+            return None
+        return time.time() - self.updated_at
@@ -0,0 +1,557 @@
+"""
+Live player and TPS telemetry over Server List Ping and pooled RCON connections
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import math
+import re
+import struct
+import time
+from array import array
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+GAME_PORT = 25565
+RCON_PORT = 25575
+# Set on server containers by DockerHelper.create_server
+RCON_PASSWORD_LABEL = 'minecraft.rcon_password'
+
+# "Unknown" protocol version; servers answer status pings for any version
+SLP_PROTOCOL_VERSION = -1
+
+RCON_LOGIN = 3
+RCON_COMMAND = 2
+RCON_MAX_PAYLOAD = 4096 + 10
+
+FORMATTING_CODES = re.compile(r'§.')
+LIST_PATTERN = re.compile(r'There are (\d+) (?:of a max(?: of)? |/)(\d+) players online:?(.*)', re.S)
+TPS_PATTERNS = (
+    # Paper/Spigot/Purpur: "TPS from last 1m, 5m, 15m: 20.0, 20.0, 20.0"
+    re.compile(r'TPS from last [^:]*:\s*\*?([\d.]+)'),
+    # Forge/NeoForge: "Overall: Mean tick time: 0.651 ms. Mean TPS: 20.000"
+    re.compile(r'Overall.*?Mean TPS: ([\d.]+)', re.S),
+)
+# Tried in order until one answers in a recognised format
+TPS_COMMANDS = ('tps', 'forge tps', 'neoforge tps')
+
+
+class TelemetryError(Exception):
+    """Raised when a server cannot be queried"""
+
+
+def host_address(base_url: Optional[str]) -> str:
+    """The address published server ports are reachable on for a Docker host URL"""
+    parsed = urlparse(base_url or '')
+    if parsed.scheme in ('tcp', 'http', 'https', 'ssh') and parsed.hostname:
+        return parsed.hostname
+    return settings.TELEMETRY_LOCAL_ADDRESS
+
+
+def pack_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def unpack_varint(data: bytes, offset: int = 0) -> Tuple[int, int]:
+    """Decode a VarInt at ``offset``; return the value and the offset after it"""
+    value = 0
+    for shift in range(0, 35, 7):
+        if offset >= len(data):
+            raise TelemetryError("truncated VarInt")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            if value & 0x80000000:
+                value -= 1 << 32
+            return value, offset
+    raise TelemetryError("VarInt too long")
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    data = b''
+    while True:
+        byte = await reader.readexactly(1)
+        data += byte
+        if not byte[0] & 0x80 or len(data) == 5:
+            return unpack_varint(data)[0]
+
+
+def encode_packet(packet_id: int, payload: bytes = b'') -> bytes:
+    body = pack_varint(packet_id) + payload
+    return pack_varint(len(body)) + body
+
+
+async def read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    length = await read_varint(reader)
+    if not 0 < length <= 1 << 21:
+        raise TelemetryError(f"bad packet length {length}")
+    data = await reader.readexactly(length)
+    packet_id, offset = unpack_varint(data)
+    return packet_id, data[offset:]
+
+
+def _flatten_text(component) -> str:
+    """Plain text of a chat component as used in MOTDs"""
+    if isinstance(component, str):
+        return FORMATTING_CODES.sub('', component)
+    if isinstance(component, list):
+        return ''.join(_flatten_text(part) for part in component)
+    if isinstance(component, dict):
+        return _flatten_text(component.get('text', '')) + _flatten_text(component.get('extra', []))
+    return ''
+
+
+@dataclass
+class PingResult:
+    """A Server List Ping response"""
+
+    players_online: int
+    players_max: int
+    version: str
+    motd: str
+    latency: float
+    sample: List[str] = field(default_factory=list)
+
+
+async def server_list_ping(host: str, port: int, timeout: Optional[float] = None) -> PingResult:
+    """Query a server's status the way the multiplayer screen does"""
+    timeout = timeout if timeout is not None else settings.TELEMETRY_TIMEOUT
+    try:
+        return await asyncio.wait_for(_ping(host, port), timeout)
+    except asyncio.TimeoutError:
+        raise TelemetryError(f"no status response from {host}:{port} within {timeout:g}s") from None
+    except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+        raise TelemetryError(f"status ping to {host}:{port} failed: {e}") from e
+
+
+async def _ping(host: str, port: int) -> PingResult:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        address = host.encode()
+        handshake = (
+            pack_varint(SLP_PROTOCOL_VERSION) + pack_varint(len(address)) + address
+            + struct.pack('>H', port) + pack_varint(1)
+        )
+        writer.write(encode_packet(0x00, handshake) + encode_packet(0x00))
+        await writer.drain()
+        packet_id, payload = await read_packet(reader)
+        if packet_id != 0x00:
+            raise TelemetryError(f"unexpected status packet {packet_id:#x}")
+        length, offset = unpack_varint(payload)
+        status = json.loads(payload[offset:offset + length].decode('utf-8'))
+
+        token = time.monotonic_ns()
+        started = time.perf_counter()
+        writer.write(encode_packet(0x01, struct.pack('>q', token)))
+        await writer.drain()
+        packet_id, payload = await read_packet(reader)
+        latency = time.perf_counter() - started
+        if packet_id != 0x01 or struct.unpack('>q', payload[:8])[0] != token:
+            raise TelemetryError("bad pong")
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    players = status.get('players') or {}
+    return PingResult(
+        players_online=int(players.get('online', 0)),
+        players_max=int(players.get('max', 0)),
+        version=(status.get('version') or {}).get('name', ''),
+        motd=_flatten_text(status.get('description', '')).strip(),
+        latency=latency,
+        sample=[entry.get('name', '') for entry in players.get('sample') or []],
+    )
+
+
+class RconClient:
+    """A persistent RCON connection that reconnects when it drops
+
+    Commands are serialised over the one connection; a response is matched
+    to its request by id. Minecraft splits responses over 4096 bytes into
+    several packets, which the short queries made here never produce.
+    """
+
+    def __init__(self, host: str, port: int, password: str, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout if timeout is not None else settings.TELEMETRY_TIMEOUT
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def command(self, text: str) -> str:
+        """Run a console command and return its output
+
+        A broken connection is reopened once before giving up.
+        """
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if not self.connected:
+                        await asyncio.wait_for(self._connect(), self.timeout)
+                    return await asyncio.wait_for(self._request(RCON_COMMAND, text), self.timeout)
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                    await self._disconnect()
+                    if attempt:
+                        raise TelemetryError(f"RCON {self.host}:{self.port} failed: {e or type(e).__name__}") from e
+                except TelemetryError:
+                    await self._disconnect()
+                    raise
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        request_id = next(self._ids)
+        self._send(request_id, RCON_LOGIN, self.password)
+        await self._writer.drain()
+        response_id, _ = await self._receive()
+        if response_id == -1:
+            raise TelemetryError(f"RCON login to {self.host}:{self.port} was refused")
+        if response_id != request_id:
+            raise TelemetryError("RCON login response did not match the request")
+
+    async def _request(self, kind: int, body: str) -> str:
+        request_id = next(self._ids)
+        self._send(request_id, kind, body)
+        await self._writer.drain()
+        while True:
+            response_id, payload = await self._receive()
+            # Responses to requests that timed out earlier are skipped
+            if response_id == request_id:
+                return payload
+
+    def _send(self, request_id: int, kind: int, body: str):
+        payload = struct.pack('<ii', request_id, kind) + body.encode('utf-8') + b'\x00\x00'
+        self._writer.write(struct.pack('<i', len(payload)) + payload)
+
+    async def _receive(self) -> Tuple[int, str]:
+        length, = struct.unpack('<i', await self._reader.readexactly(4))
+        if not 10 <= length <= RCON_MAX_PAYLOAD:
+            raise TelemetryError(f"bad RCON packet length {length}")
+        data = await self._reader.readexactly(length)
+        response_id, _ = struct.unpack('<ii', data[:8])
+        return response_id, data[8:-2].decode('utf-8', errors='replace')
+
+    async def _disconnect(self):
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def close(self):
+        async with self._lock:
+            await self._disconnect()
+
+
+class RconPool:
+    """One persistent RCON client per server, replaced when its endpoint changes"""
+
+    def __init__(self):
+        self.clients: Dict[str, RconClient] = {}
+
+    def get(self, key: str, host: str, port: int, password: str) -> RconClient:
+        client = self.clients.get(key)
+        if client is None or (client.host, client.port, client.password) != (host, port, password):
+            if client is not None:
+                asyncio.create_task(client.close())
+            client = self.clients[key] = RconClient(host, port, password)
+        return client
+
+    async def discard(self, key: str):
+        client = self.clients.pop(key, None)
+        if client is not None:
+            await client.close()
+
+    async def close(self):
+        clients, self.clients = list(self.clients.values()), {}
+        await asyncio.gather(*(client.close() for client in clients))
+
+
+@asynccontextmanager
+async def saving_paused(console: Optional[RconClient], server_name: str) -> AsyncIterator[bool]:
+    """Flush a server's world to disk and keep it from writing while the block runs
+
+    Yields whether saving was paused; without a console the world is left
+    as it is, which is only consistent while the server is stopped.
+    """
+    if console is None:
+        yield False
+        return
+    await console.command("save-off")
+    try:
+        await console.command("save-all flush")
+        yield True
+    finally:
+        try:
+            await console.command("save-on")
+        except Exception as e:
+            logger.error(f"Could not turn saving back on for {server_name}: {e}")
+
+
+def parse_player_list(text: str) -> Optional[Tuple[int, int, List[str]]]:
+    """Parse the output of ``list`` into (online, max, names)"""
+    match = LIST_PATTERN.search(FORMATTING_CODES.sub('', text))
+    if match is None:
+        return None
+    names = [name.strip() for name in match.group(3).split(',') if name.strip()]
+    return int(match.group(1)), int(match.group(2)), names
+
+
+def parse_tps(text: str) -> Optional[float]:
+    """Parse the one-minute (or overall) TPS from a ``tps`` command's output"""
+    text = FORMATTING_CODES.sub('', text)
+    for pattern in TPS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class TelemetryHistory:
+    """A fixed-size ring of samples kept in typed arrays
+
+    Each sample takes 18 bytes (timestamp, players, TPS and latency), so a
+    day of history at the default interval costs about 50 KB per server.
+    Unknown values are stored as -1 players or NaN.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.timestamps = array('d', [0.0]) * size
+        self.players = array('h', [-1]) * size
+        self.tps = array('f', [math.nan]) * size
+        self.latency = array('f', [math.nan]) * size
+        self._next = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: float, players: Optional[int], tps: Optional[float], latency: Optional[float]):
+        i = self._next
+        self.timestamps[i] = timestamp
+        self.players[i] = -1 if players is None else min(players, 0x7FFF)
+        self.tps[i] = math.nan if tps is None else tps
+        self.latency[i] = math.nan if latency is None else latency
+        self._next = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def window(self, seconds: Optional[float] = None,
+               now: Optional[float] = None) -> List[Tuple[float, Optional[int], Optional[float], Optional[float]]]:
+        """Samples from the last ``seconds`` (all if None), oldest first"""
+        cutoff = (now or time.time()) - seconds if seconds is not None else -math.inf
+        samples = []
+        for offset in range(self.count):
+            i = (self._next - self.count + offset) % self.size
+            if self.timestamps[i] < cutoff:
+                continue
+            samples.append((
+                self.timestamps[i],
+                None if self.players[i] < 0 else self.players[i],
+                None if math.isnan(self.tps[i]) else self.tps[i],
+                None if math.isnan(self.latency[i]) else self.latency[i],
+            ))
+        return samples
+
+
+@dataclass
+class Telemetry:
+    """The latest telemetry of one server"""
+
+    server_name: str
+    timestamp: float
+    online: bool
+    players_online: Optional[int] = None
+    players_max: Optional[int] = None
+    player_names: List[str] = field(default_factory=list)
+    tps: Optional[float] = None
+    latency: Optional[float] = None
+    version: str = ""
+    motd: str = ""
+    error: Optional[str] = None
+
+
+@dataclass
+class _Endpoint:
+    game_port: Optional[int]
+    rcon_port: Optional[int]
+    rcon_password: Optional[str]
+
+
+class TelemetryCollector:
+    """Samples every running server on a Docker host on a schedule
+
+    Servers are found in the status poller's snapshot, along with their
+    published ports and RCON password label, so collecting costs no Docker
+    calls except for containers the snapshot has not listed yet. Each round
+    pings every server and, where RCON is published, runs ``list`` and a TPS
+    query over the server's pooled connection. Status commands read the
+    latest values from memory.
+    """
+
+    def __init__(self, docker_helper, status_poller, address: str,
+                 interval: Optional[float] = None, history: Optional[int] = None):
+        self.docker_helper = docker_helper
+        self.status_poller = status_poller
+        self.address = address
+        self.interval = interval if interval is not None else settings.TELEMETRY_INTERVAL
+        self.history_size = history or settings.TELEMETRY_HISTORY
+        self.latest: Dict[str, Telemetry] = {}
+        self.history: Dict[str, TelemetryHistory] = {}
+        self.rcon = RconPool()
+        self._endpoints: Dict[str, _Endpoint] = {}
+        self._tps_commands: Dict[str, Optional[str]] = {}
+        self._semaphore = asyncio.Semaphore(settings.TELEMETRY_CONCURRENCY)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop sampling and close the RCON connections"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.rcon.close()
+
+    def get(self, server_name: str) -> Optional[Telemetry]:
+        """Return the latest telemetry of a server"""
+        return self.latest.get(server_name)
+
+    async def console(self, server_name: str) -> Optional[RconClient]:
+        """Return a running server's pooled RCON client, if it publishes RCON"""
+        status = self.status_poller.snapshot.get(server_name)
+        if status is None or status.state != 'running':
+            return None
+        endpoint = await self._endpoint(status)
+        if not (endpoint.rcon_port and endpoint.rcon_password):
+            return None
+        return self.rcon.get(server_name, self.address, endpoint.rcon_port, endpoint.rcon_password)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Error collecting telemetry: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def collect(self):
+        """Sample every running server once"""
+        running = {name: status for name, status in self.status_poller.snapshot.items() if status.state == 'running'}
+        for name in set(self.latest) - set(running):
+            await self._forget(name)
+        # History outlives restarts but not removal
+        for name in set(self.history) - set(self.status_poller.snapshot):
+            del self.history[name]
+        live_containers = {status.container_id for status in running.values()}
+        for container_id in set(self._endpoints) - live_containers:
+            del self._endpoints[container_id]
+        await asyncio.gather(*(self._sample(status) for status in running.values()))
+
+    async def _forget(self, name: str):
+        self.latest.pop(name, None)
+        self._tps_commands.pop(name, None)
+        await self.rcon.discard(name)
+
+    async def _endpoint(self, status) -> _Endpoint:
+        endpoint = self._endpoints.get(status.container_id)
+        if endpoint is None:
+            ports, labels = status.ports, status.labels
+            if not ports:
+                # Not in a listing yet (e.g. only seen through events); inspect it once
+                container = await self.docker_helper.get_container(status.container_id)
+                ports = {
+                    int(port.split('/')[0]): int(bindings[0]['HostPort'])
+                    for port, bindings in (container.attrs['NetworkSettings'].get('Ports') or {}).items()
+                    if bindings and bindings[0].get('HostPort')
+                }
+                labels = container.labels
+            endpoint = self._endpoints[status.container_id] = _Endpoint(
+                ports.get(GAME_PORT), ports.get(RCON_PORT), labels.get(RCON_PASSWORD_LABEL)
+            )
+        return endpoint
+
+    async def _sample(self, status):
+        name = status.server_name
+        async with self._semaphore:
+            telemetry = Telemetry(server_name=name, timestamp=time.time(), online=False)
+            try:
+                endpoint = await self._endpoint(status)
+                if endpoint.game_port is None:
+                    raise TelemetryError("game port is not published")
+                ping = await server_list_ping(self.address, endpoint.game_port)
+                telemetry.online = True
+                telemetry.players_online = ping.players_online
+                telemetry.players_max = ping.players_max
+                telemetry.player_names = ping.sample
+                telemetry.version = ping.version
+                telemetry.motd = ping.motd
+                telemetry.latency = ping.latency
+                if endpoint.rcon_port and endpoint.rcon_password:
+                    await self._query_rcon(name, endpoint, telemetry)
+            except Exception as e:
+                # Ports may have moved (e.g. a recreated container); look them up again next round
+                self._endpoints.pop(status.container_id, None)
+                telemetry.error = str(e)
+                logger.debug(f"Telemetry for {name} failed: {e}")
+
+        self.latest[name] = telemetry
+        history = self.history.get(name)
+        if history is None:
+            history = self.history[name] = TelemetryHistory(self.history_size)
+        history.append(telemetry.timestamp, telemetry.players_online, telemetry.tps, telemetry.latency)
+
+    async def _query_rcon(self, name: str, endpoint: _Endpoint, telemetry: Telemetry):
+        client = self.rcon.get(name, self.address, endpoint.rcon_port, endpoint.rcon_password)
+        players = parse_player_list(await client.command('list'))
+        if players:
+            telemetry.players_online, telemetry.players_max, telemetry.player_names = players
+
+        if name not in self._tps_commands:
+            # Find the TPS command this server type understands, once; a probe
+            # cut short by an RCON error is tried again on the next sample
+            for command in TPS_COMMANDS:
+                tps = parse_tps(await client.command(command))
+                if tps is not None:
+                    self._tps_commands[name] = command
+                    telemetry.tps = tps
+                    return
+            self._tps_commands[name] = None
+        elif self._tps_commands[name]:
+            telemetry.tps = parse_tps(await client.command(self._tps_commands[name]))
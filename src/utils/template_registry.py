@@ -0,0 +1,139 @@
+"""
+Registry of server templates, reloaded when the templates file changes
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from config.settings import settings
+from src.models.template import ServerTemplate
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateRegistry:
+    """Holds parsed, validated templates keyed by their name in the file
+
+    The file's mtime and size are polled every ``TEMPLATE_RELOAD_INTERVAL``
+    seconds; a stat call is all an unchanged file costs. On change only the
+    entries whose definition differs are parsed again, and unchanged ones
+    keep their existing instance. A template that fails validation keeps
+    its previous version, and a file that fails to parse is ignored.
+    ``version`` increases with every effective change.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.TEMPLATES_FILE
+        self.version = 0
+        self._templates: Dict[str, ServerTemplate] = {}
+        self._raw: Dict[str, dict] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._listeners: List[Callable[[Set[str], Set[str]], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._templates)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, name: str) -> Optional[ServerTemplate]:
+        return self._templates.get(name)
+
+    def items(self):
+        return self._templates.items()
+
+    def as_dict(self) -> Dict[str, ServerTemplate]:
+        """A snapshot of the current templates"""
+        return dict(self._templates)
+
+    def images(self) -> Set[str]:
+        """Docker images referenced by the templates"""
+        return {template.image for template in self._templates.values()}
+
+    def add_listener(self, callback: Callable[[Set[str], Set[str]], None]):
+        """Call ``callback(changed, removed)`` after each effective reload"""
+        self._listeners.append(callback)
+
+    def reload(self) -> bool:
+        """Re-read the file if it changed; return whether any template changed"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._signature is None and not self._templates:
+                logger.error(f"Templates file not found: {self.path}")
+            self._signature = None
+            return False
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+
+        try:
+            with open(self.path, 'r') as f:
+                raw = json.load(f)
+            if not isinstance(raw, dict):
+                raise ValueError("top level must be an object")
+        except (OSError, ValueError) as e:
+            logger.error(f"Error parsing templates file, keeping current templates: {e}")
+            return False
+
+        templates = {}
+        changed = set()
+        for name, data in raw.items():
+            if name in self._templates and self._raw.get(name) == data:
+                templates[name] = self._templates[name]
+                continue
+            try:
+                templates[name] = ServerTemplate.validated(name, data)
+                changed.add(name)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Invalid template '{name}': {e}")
+                if name in self._templates:
+                    templates[name] = self._templates[name]
+                    raw[name] = self._raw[name]
+        removed = set(self._templates) - set(templates)
+
+        self._templates = templates
+        self._raw = {name: raw[name] for name in templates}
+        if not changed and not removed:
+            return False
+
+        self.version += 1
+        logger.info(f"Loaded templates (v{self.version}): {len(changed)} changed, {len(removed)} removed")
+        for callback in self._listeners:
+            try:
+                callback(changed, removed)
+            except Exception as e:
+                logger.error(f"Error in template listener: {e}")
+        return True
+
+    def start(self):
+        """Watch the templates file in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Stop watching the templates file"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(settings.TEMPLATE_RELOAD_INTERVAL)
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Error reloading templates: {e}")
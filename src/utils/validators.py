@@ -30,6 +30,15 @@ class ServerValidator:
         pattern = r'^\d+[GMgm]$'
         return bool(re.match(pattern, memory))
     
+    @staticmethod
+    def parse_memory(memory: str) -> int:
+        """Convert a memory string (e.g., '2G', '512M') to bytes"""
+        units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+        value = memory.strip().upper()
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    
     @staticmethod
     def validate_minecraft_version(version: str) -> bool:
         """Validate Minecraft version format"""
@@ -0,0 +1,243 @@
+"""
+Streaming world copies between server volumes, skipping unchanged region files
+"""
+
+import asyncio
+import io
+import queue
+import struct
+import tarfile
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from src.utils.docker_helper import DATA_PATH
+
+# Region, entity and POI files share the Anvil layout: a 4 KiB table of chunk
+# locations followed by a 4 KiB table of chunk save times (big-endian seconds)
+REGION_SUFFIX = ".mca"
+REGION_HEADER = 8192
+REGION_CHUNKS = 1024
+
+# Blocks of the tar stream buffered between the reading and the writing side
+PIPE_BLOCKS = 16
+PIPE_BLOCK_SIZE = 1024 * 1024
+
+# Sync times are compared with the source host's clock; a margin absorbs skew
+SYNC_MARGIN = 300
+
+# Exported worlds are volumes named after the world, labelled with the image
+# of the server they came from so a stopped container can be made to read them
+WORLD_VOLUME_PREFIX = "mcworld_"
+WORLD_LABEL = 'minecraft.world'
+WORLD_IMAGE_LABEL = 'minecraft.world.image'
+
+
+class TransferAborted(Exception):
+    """Raised on the reading side when the writing side has given up"""
+
+
+class WorldNotFoundError(Exception):
+    """Raised when a world source is neither a server nor an exported world"""
+
+
+def world_volume(world_name: str) -> str:
+    return f"{WORLD_VOLUME_PREFIX}{world_name}"
+
+
+def newest_chunk(header: bytes) -> Optional[int]:
+    """The latest save time of any chunk in a region file header
+
+    Returns None when ``header`` is too short to be one; 0 for a region
+    file without chunks.
+    """
+    if len(header) < REGION_HEADER:
+        return None
+    locations = struct.unpack_from(f'>{REGION_CHUNKS}I', header, 0)
+    timestamps = struct.unpack_from(f'>{REGION_CHUNKS}I', header, 4096)
+    return max((timestamp for location, timestamp in zip(locations, timestamps) if location), default=0)
+
+
+@dataclass
+class TransferStats:
+    """What a world copy sent and what it left out as unchanged"""
+
+    bytes: int = 0
+    files: int = 0
+    regions: int = 0
+    skipped_files: int = 0
+    skipped_regions: int = 0
+    skipped_bytes: int = 0
+
+
+class _Pipe:
+    """A bounded queue of blocks from a reading thread to a writing thread
+
+    The reader blocks once ``PIPE_BLOCKS`` are waiting, so memory stays
+    bounded, while the two sides still read the source and write the
+    target at the same time.
+    """
+
+    _END = object()
+
+    def __init__(self, blocks: int = PIPE_BLOCKS):
+        self._queue: queue.Queue = queue.Queue(blocks)
+        self._aborted = threading.Event()
+
+    def write(self, data: bytes) -> int:
+        while True:
+            if self._aborted.is_set():
+                raise TransferAborted("the target stopped reading")
+            try:
+                self._queue.put(bytes(data), timeout=1)
+                return len(data)
+            except queue.Full:
+                continue
+
+    def close(self, error: Optional[BaseException] = None):
+        """Mark the end of the stream, or pass the reader's error on to the writer"""
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(error or self._END, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def abort(self):
+        self._aborted.set()
+
+    def blocks(self) -> Iterator[bytes]:
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._aborted.is_set():
+                    raise TransferAborted("the transfer was abandoned") from None
+                continue
+            if item is self._END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+class _IteratorReader(io.RawIOBase):
+    """A read-only file over an iterator of byte blocks"""
+
+    def __init__(self, blocks: Iterable[bytes]):
+        self._blocks = iter(blocks)
+        self._pending = memoryview(b'')
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            block = next(self._blocks, None)
+            if block is None:
+                return 0
+            self._pending = memoryview(block)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class _Prefixed:
+    """A member's data with its already-read header put back in front"""
+
+    def __init__(self, head: bytes, rest):
+        self._head = head
+        self._rest = rest
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._rest.read(size)
+        if 0 <= size < len(self._head):
+            head, self._head = self._head[:size], self._head[size:]
+            return head
+        head, self._head = self._head, b''
+        return head + self._rest.read(size - len(head) if size >= 0 else -1)
+
+
+def filter_archive(source: Iterable[bytes], since: float, out, stats: TransferStats):
+    """Copy a tar stream, leaving out files unchanged since ``since``
+
+    Region files are judged by their chunk timestamp table rather than their
+    mtime, so a region file is skipped only when no chunk in it was saved
+    after ``since``. Other files are judged by mtime. Directories and links
+    are always copied. Both archives are read and written as streams.
+    """
+    reader = tarfile.open(fileobj=_IteratorReader(source), mode='r|', bufsize=PIPE_BLOCK_SIZE)
+    writer = tarfile.open(fileobj=out, mode='w|', bufsize=PIPE_BLOCK_SIZE, copybufsize=PIPE_BLOCK_SIZE)
+    with reader, writer:
+        for member in reader:
+            if not member.isfile():
+                writer.addfile(member)
+                continue
+            data = reader.extractfile(member)
+            if member.name.endswith(REGION_SUFFIX) and member.size >= REGION_HEADER:
+                header = data.read(REGION_HEADER)
+                if newest_chunk(header) <= since:
+                    stats.skipped_regions += 1
+                    stats.skipped_bytes += member.size
+                    continue
+                stats.regions += 1
+                data = _Prefixed(header, data)
+            elif member.mtime <= since:
+                stats.skipped_files += 1
+                stats.skipped_bytes += member.size
+                continue
+            stats.files += 1
+            stats.bytes += member.size
+            writer.addfile(member, data)
+
+
+def _pump(source: Iterable[bytes], pipe: _Pipe, since: Optional[float], stats: TransferStats):
+    try:
+        if since is None:
+            # A full copy passes the daemon's tar through untouched
+            for block in source:
+                stats.bytes += len(block)
+                pipe.write(block)
+        else:
+            filter_archive(source, since, pipe, stats)
+    except BaseException as e:
+        pipe.close(e)
+        raise
+    else:
+        pipe.close()
+    finally:
+        close = getattr(source, 'close', None)
+        if close:
+            close()
+
+
+async def transfer_world(source_helper, source_id: str, target_helper, target_id: str,
+                         since: Optional[float] = None, timeout: Optional[float] = None) -> TransferStats:
+    """Stream one container's ``/data`` into another's
+
+    The source tar is read on one worker thread and sent to the target on
+    another, through a small bounded pipe, so a copy runs at the speed of
+    the slower disk and nothing is staged on the bot's disk. The two
+    containers may be on different Docker hosts. With ``since``, only files
+    changed after that time are sent (see ``filter_archive``); the target
+    must already hold the rest.
+    """
+    source = await source_helper.open_archive(source_id, DATA_PATH)
+    pipe = _Pipe()
+    stats = TransferStats()
+    loop = asyncio.get_running_loop()
+    reader = loop.run_in_executor(None, _pump, source, pipe, since, stats)
+    try:
+        # The archive's entries are under data/, so it is extracted at the root
+        await target_helper.put_archive(target_id, "/", pipe.blocks(), timeout=timeout)
+    except Exception as error:
+        pipe.abort()
+        pumped, = await asyncio.gather(reader, return_exceptions=True)
+        # A failure reading the source surfaces on the target side too; report the cause
+        if isinstance(pumped, Exception) and not isinstance(pumped, TransferAborted):
+            raise pumped from error
+        raise
+    await reader
+    return stats
@@ -0,0 +1,176 @@
+"""
+Tests for content-defined chunking, the chunk store and backup snapshots
+"""
+
+import asyncio
+import io
+import random
+import tarfile
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.utils.backup import BackupEngine, BackupError, ChunkStore, ContentDefinedChunker
+
+
+def chunk_all(data: bytes, block: int = 100_000) -> list:
+    chunker = ContentDefinedChunker()
+    chunks = []
+    for offset in range(0, len(data), block):
+        chunks.extend(chunker.feed(data[offset:offset + block]))
+    rest = chunker.finish()
+    return chunks + ([rest] if rest else [])
+
+
+def world_tar(region: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as archive:
+        for name, content in (('data/world/region/r.0.0.mca', region), ('data/server.properties', b'motd=Test\n')):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class FakeDocker:
+    """Serves and receives tar streams in place of a container"""
+
+    def __init__(self, archive: bytes):
+        self.archive = archive
+        self.received = None
+        self.clear_volume = AsyncMock()
+
+    async def stream_archive(self, container_id, path):
+        for offset in range(0, len(self.archive), 65536):
+            yield self.archive[offset:offset + 65536]
+
+    async def put_archive(self, container_id, path, data):
+        self.received = b''.join(data)
+
+
+class TestBackup:
+    """Test cases for chunking, storage and the backup engine"""
+
+    def test_chunks_survive_insertions(self):
+        """Test chunk boundaries depend on content, so an insertion only changes nearby chunks"""
+        data = random.Random(1).randbytes(8 * 1024 ** 2)
+        original = chunk_all(data)
+        shifted = chunk_all(data[:1000] + b'inserted' + data[1000:])
+
+        assert b''.join(original) == data
+        assert all(64 * 1024 <= len(chunk) <= 1024 ** 2 for chunk in original[:-1])
+        # Splitting the stream into different blocks gives the same chunks
+        assert chunk_all(data, block=7777) == original
+        assert len(set(shifted) & set(original)) >= len(original) - 2
+
+    def test_store_deduplicates_and_verifies(self, tmp_path):
+        """Test chunks are stored once, compressed, and checked on read"""
+        store = ChunkStore(tmp_path, level=3)
+        digest, written = store.put(b'a' * 100_000)
+        assert 0 < written < 1000
+        assert store.put(b'a' * 100_000) == (digest, 0)
+        assert store.get(digest) == b'a' * 100_000
+
+        store.path(digest).write_bytes(store.path(digest).read_bytes()[:-4] + b'\x00\x00\x00\x00')
+        with pytest.raises(BackupError):
+            store.get(digest)
+
+    @pytest.mark.asyncio
+    async def test_incremental_backup_and_restore(self, tmp_path):
+        """Test a second backup stores only the change and restores byte for byte"""
+        engine = BackupEngine(tmp_path)
+        region = random.Random(2).randbytes(4 * 1024 ** 2)
+        console = Mock(command=AsyncMock(return_value=""))
+
+        docker = FakeDocker(world_tar(region))
+        first = await engine.backup('lobby', 'abc', docker, console=console)
+        assert first.quiesced and first.size == len(docker.archive)
+        assert [call.args[0] for call in console.command.await_args_list] == ['save-off', 'save-all flush', 'save-on']
+
+        changed = region[:2 * 1024 ** 2] + b'x' * 4096 + region[2 * 1024 ** 2 + 4096:]
+        docker = FakeDocker(world_tar(changed))
+        second = await engine.backup('lobby', 'abc', docker)
+        assert not second.quiesced
+        assert second.stored < first.stored / 4
+
+        await engine.restore(engine.find('lobby', 'latest'), 'abc', 'minecraft_lobby', 'image', docker)
+        docker.clear_volume.assert_awaited_once_with('minecraft_lobby', 'image')
+        assert docker.received == docker.archive
+
+    @pytest.mark.asyncio
+    async def test_prune_and_garbage_collection(self, tmp_path):
+        """Test pruned snapshots' unique chunks are collected and broken snapshots are not restored"""
+        engine = BackupEngine(tmp_path)
+        for seed in (3, 4):
+            await engine.backup('lobby', 'abc', FakeDocker(world_tar(random.Random(seed).randbytes(1024 ** 2))))
+
+        assert engine.prune('lobby', keep=1) == 1
+        count, freed = await engine.collect_garbage()
+        assert count > 0 and freed > 0
+        latest = engine.find('lobby')
+        assert set(engine.store.digests()) == set(latest.chunks)
+
+        engine.store.delete(latest.chunks[0])
+        docker = FakeDocker(b'')
+        with pytest.raises(BackupError):
+            await engine.restore(latest, 'abc', 'minecraft_lobby', 'image', docker)
+        docker.clear_volume.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_backups_and_garbage_collection_exclude_each_other(self, tmp_path):
+        """Test a collection skips during a backup and a backup waits for a collection"""
+        engine = BackupEngine(tmp_path)
+        archive = world_tar(random.Random(5).randbytes(1024 ** 2))
+        first = await engine.backup('lobby', 'abc', FakeDocker(archive))
+        engine.prune('lobby', keep=0)
+
+        # Every chunk is now unreferenced, and a new backup of the same world reuses them all
+        streaming = asyncio.Event()
+        proceed = asyncio.Event()
+
+        class SlowDocker(FakeDocker):
+            async def stream_archive(self, container_id, path):
+                streaming.set()
+                await proceed.wait()
+                async for data in super().stream_archive(container_id, path):
+                    yield data
+
+        backup = asyncio.create_task(engine.backup('lobby', 'abc', SlowDocker(archive)))
+        await streaming.wait()
+        assert await engine.collect_garbage() == (0, 0)
+        proceed.set()
+        second = await backup
+        assert second.stored == 0 and second.chunks == first.chunks
+
+        engine.prune('lobby', keep=0)
+        release = asyncio.Event()
+        sweep = engine._sweep
+
+        def slow_sweep():
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+            return sweep()
+
+        loop = asyncio.get_running_loop()
+        engine._sweep = slow_sweep
+        collection = asyncio.create_task(engine.collect_garbage())
+        await asyncio.sleep(0)
+        backup = asyncio.create_task(engine.backup('lobby', 'abc', FakeDocker(archive)))
+        await asyncio.sleep(0.05)
+        assert not backup.done()
+        release.set()
+        assert (await collection)[0] == len(set(first.chunks))
+        third = await backup
+        assert third.stored > 0
+        await engine.restore(third, 'abc', 'minecraft_lobby', 'image', FakeDocker(b''))
+
+    @pytest.mark.asyncio
+    async def test_corrupt_chunk_leaves_volume_untouched(self, tmp_path):
+        """Test a restore checks chunk contents before emptying the volume"""
+        engine = BackupEngine(tmp_path)
+        snapshot = await engine.backup('lobby', 'abc', FakeDocker(world_tar(random.Random(6).randbytes(1024 ** 2))))
+        path = engine.store.path(snapshot.chunks[-1])
+        path.write_bytes(path.read_bytes()[:-4] + b'\x00\x00\x00\x00')
+
+        docker = FakeDocker(b'')
+        with pytest.raises(BackupError):
+            await engine.restore(snapshot, 'abc', 'minecraft_lobby', 'image', docker)
+        docker.clear_volume.assert_not_awaited()
+        assert docker.received is None
@@ -0,0 +1,64 @@
+"""
+Tests for the benchmark harness and the fake Docker daemon
+"""
+
+import asyncio
+import pytest
+from benchmarks.fake_docker import FakeDockerDaemon
+from benchmarks.harness import BenchmarkResult, BenchmarkRun, compare, percentile
+from src.utils.docker_helper import DockerHelper
+
+
+class TestBenchmarkHarness:
+    """Test cases for result summaries and regression checks"""
+
+    def test_summary_and_key(self):
+        """Test percentiles, throughput and the stable result key"""
+        result = BenchmarkResult.from_samples(
+            'state.save_all', {'servers': 1000, 'backend': 'sqlite'},
+            [0.001 * i for i in range(1, 101)], wall_seconds=2.0, concurrency=4
+        )
+        assert result.p50 == percentile([0.001 * i for i in range(1, 101)], 0.5) == pytest.approx(0.051)
+        assert result.p99 == pytest.approx(0.1)
+        assert result.throughput == 50
+        assert result.key == 'state.save_all[backend=sqlite,concurrency=4,servers=1000]'
+
+    def test_compare_flags_slowdowns(self, tmp_path):
+        """Test only slowdowns beyond the tolerance and noise floor are regressions"""
+        baseline = BenchmarkRun()
+        baseline.results = [
+            BenchmarkResult.from_samples('a', {}, [0.010] * 10, 1.0),
+            BenchmarkResult.from_samples('b', {}, [0.010] * 10, 1.0),
+            BenchmarkResult.from_samples('tiny', {}, [0.00001] * 10, 1.0),
+        ]
+        baseline.save(tmp_path / 'baseline.json')
+        current = [
+            BenchmarkResult.from_samples('a', {}, [0.011] * 10, 1.0),
+            BenchmarkResult.from_samples('b', {}, [0.020] * 10, 1.0),
+            BenchmarkResult.from_samples('tiny', {}, [0.0001] * 10, 1.0),
+            BenchmarkResult.from_samples('new', {}, [1.0] * 10, 1.0),
+        ]
+        regressions = compare(BenchmarkRun.load(tmp_path / 'baseline.json'), current, tolerance=0.25)
+        assert [(r.key, r.metric) for r in regressions] == [('b[]', 'p50'), ('b[]', 'p99')]
+
+    def test_fake_daemon_serves_docker_helper(self):
+        """Test the real docker SDK can create and list containers on the fake daemon"""
+        async def scenario():
+            daemon = FakeDockerDaemon(latency=0.001)
+            await daemon.start()
+            try:
+                helper = DockerHelper(base_url=daemon.url, name='fake')
+                daemon.add_container('minecraft_existing', port=25570)
+                await helper.stop_container('minecraft_existing')
+                containers = await helper.list_server_containers()
+                ports = await helper.list_bound_ports()
+                helper.close()
+                return containers, ports, daemon.requests
+            finally:
+                await daemon.stop()
+
+        containers, ports, requests = asyncio.run(scenario())
+        assert [c['Names'] for c in containers] == [['/minecraft_existing']]
+        assert containers[0]['State'] == 'exited'
+        assert ports == set()
+        assert requests >= 4
@@ -0,0 +1,89 @@
+"""
+Tests for bulk server operations
+"""
+
+import asyncio
+import pytest
+from src.utils.bulk import BulkProgress, BulkResult, expand_names, run_bulk
+
+
+class FakeMessage:
+    """Records edits made to a sent message"""
+
+    def __init__(self, content):
+        self.contents = [content]
+
+    async def edit(self, content):
+        self.contents.append(content)
+
+
+class TestBulk:
+    """Test cases for bulk operation helpers"""
+
+    def test_expand_names(self):
+        """Test globs and exact names expand without duplicates"""
+        names = ['lobby1', 'lobby2', 'survival', 'creative']
+        matched, missing = expand_names(['lobby*', 'lobby1', 'survival', 'skyblock', 'x?'], names)
+        assert matched == ['lobby1', 'lobby2', 'survival']
+        assert missing == ['skyblock', 'x?']
+
+    @pytest.mark.asyncio
+    async def test_run_bulk_bounds_concurrency(self):
+        """Test operations overlap up to the limit and failures stay isolated"""
+        running = 0
+        peak = 0
+
+        async def operation(name):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            if name == 's3':
+                raise RuntimeError("container not found")
+            return f"done {name}"
+
+        names = [f"s{i}" for i in range(10)]
+        results, elapsed = await run_bulk(names, operation, concurrency=4)
+        assert peak == 4
+        assert [result.name for result in results] == names
+        assert [result.name for result in results if not result.ok] == ['s3']
+        assert results[3].detail == "container not found"
+        assert results[0].detail == "done s0"
+        assert elapsed < 0.02 * 10
+
+    @pytest.mark.asyncio
+    async def test_progress_edits_one_message(self):
+        """Test progress is throttled into edits of a single message"""
+        sent = []
+
+        async def send(content):
+            message = FakeMessage(content)
+            sent.append(message)
+            return message
+
+        async def operation(name):
+            await asyncio.sleep(0.001)
+            if name == 'bad':
+                raise RuntimeError("boom")
+
+        names = ['bad'] + [f"ok{i}" for i in range(20)]
+        progress = BulkProgress(send, "Restarting 21 servers", len(names), interval=10)
+        await progress.start()
+        _, elapsed = await run_bulk(names, operation, progress=progress, concurrency=5)
+        report = await progress.finish(elapsed, names)
+        assert len(sent) == 1
+        # The initial post, at most one live edit inside the interval, and the report
+        assert len(sent[0].contents) <= 3
+        assert sent[0].contents[-1] == report
+        assert report.startswith("⚠️ Restarting 21 servers: 20/21 succeeded")
+        assert report.splitlines()[1] == "❌ `bad`: boom"
+
+    def test_report_fits_discord_limit(self):
+        """Test long reports are truncated with a count of hidden lines"""
+        names = [f"server_{i:04d}" for i in range(500)]
+        progress = BulkProgress(None, "Starting 500 servers", len(names))
+        progress.results = [BulkResult(name, True, "", 1.0) for name in names]
+        report = progress.report(12.0, names)
+        assert len(report) <= 2000
+        assert report.rstrip().split("\n")[-1].startswith("… and ")
@@ -3,6 +3,8 @@ Tests for Docker helper utilities
 """
 
 import pytest
+import asyncio
+import time
 from unittest.mock import Mock, patch
 from src.utils.docker_helper import DockerHelper
 from src.models.server import MinecraftServer
@@ -67,3 +69,26 @@ class TestDockerHelper:
         status = await docker_helper.get_container_status("test_id")
         
         assert status == "running"
+
+    @pytest.mark.asyncio
+    async def test_run_times_out(self, docker_helper):
+        """Test that slow Docker calls are bounded by the operation timeout"""
+        with pytest.raises(asyncio.TimeoutError):
+            await docker_helper.run('slow', time.sleep, 0.5, timeout=0.05)
+    
+    @pytest.mark.asyncio
+    async def test_run_does_not_block_event_loop(self, docker_helper):
+        """Test that blocking Docker calls leave the event loop free"""
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        
+        task = asyncio.create_task(ticker())
+        await docker_helper.run('slow', time.sleep, 0.2)
+        task.cancel()
+        
+        assert ticks > 5
@@ -0,0 +1,70 @@
+"""
+Tests for idle-server hibernation and the wake-on-join listener
+"""
+
+import asyncio
+import json
+import struct
+import pytest
+from unittest.mock import AsyncMock
+from src.utils.hibernation import HibernationManager
+from src.utils.telemetry import Telemetry, encode_packet, pack_varint, read_packet, server_list_ping
+
+
+def sample(timestamp, players, online=True):
+    return Telemetry(server_name='lobby', timestamp=timestamp, online=online, players_online=players, players_max=10)
+
+
+class TestHibernation:
+    """Test cases for the HibernationManager class"""
+
+    @pytest.mark.asyncio
+    async def test_hibernates_after_idle_timeout(self):
+        """Test only servers empty for their whole timeout are stopped"""
+        telemetry = {'lobby': sample(0, 0), 'busy': sample(0, 3)}
+        candidates = lambda: [(name, t, 600) for name, t in telemetry.items()]
+        hibernate = AsyncMock(return_value=0)
+        manager = HibernationManager(candidates, hibernate=hibernate, wake=AsyncMock())
+
+        await manager.check()
+        telemetry['lobby'] = sample(300, 0)
+        await manager.check()
+        hibernate.assert_not_called()
+
+        # A player joining restarts the clock; being unreachable does not count as empty
+        telemetry['lobby'] = sample(400, 1)
+        await manager.check()
+        telemetry['lobby'] = sample(700, 0, online=False)
+        await manager.check()
+        telemetry['lobby'] = sample(800, 0)
+        await manager.check()
+        telemetry['lobby'] = sample(1400, 0)
+        await manager.check()
+
+        hibernate.assert_awaited_once_with('lobby')
+        assert manager.is_sleeping('lobby')
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_listener_shows_sleeping_and_wakes_on_join(self):
+        """Test status pings see the sleeping MOTD and a login wakes the server"""
+        woke = asyncio.Event()
+        manager = HibernationManager(list, hibernate=AsyncMock(), wake=AsyncMock(side_effect=lambda name: woke.set()))
+        assert await manager.sleep('lobby', 0, players_max=10)
+        port = manager.listeners['lobby'].port
+
+        ping = await server_list_ping('127.0.0.1', port, timeout=2)
+        assert 'sleeping' in ping.motd
+        assert (ping.players_online, ping.players_max) == (0, 10)
+
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        handshake = pack_varint(765) + pack_varint(9) + b'127.0.0.1' + struct.pack('>H', port) + pack_varint(2)
+        writer.write(encode_packet(0x00, handshake) + encode_packet(0x00, pack_varint(5) + b'Steve'))
+        packet_id, payload = await read_packet(reader)
+        writer.close()
+
+        assert packet_id == 0x00
+        assert 'waking up' in json.loads(payload[1:])['text']
+        await asyncio.wait_for(woke.wait(), 2)
+        manager.wake_server.assert_awaited_once_with('lobby')
+        assert not manager.is_sleeping('lobby')
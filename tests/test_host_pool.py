@@ -0,0 +1,81 @@
+"""
+Tests for Docker host placement
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.utils.host_pool import DockerHostPool
+from src.utils.scheduler import Headroom
+
+GIB = 1024 ** 3
+
+
+def make_host(name, memory_total, memory_reserved, reachable=True):
+    """Create a stand-in host whose scheduler reports the given memory"""
+    host = Mock()
+    host.name = name
+    host.scheduler.ensure_fresh = AsyncMock(side_effect=None if reachable else ConnectionError("down"))
+    host.scheduler.headroom.return_value = Headroom(
+        memory_total=memory_total,
+        memory_reserved=memory_reserved,
+        cpu_total=int(8e9),
+        cpu_reserved=0,
+        running=0,
+        pending=0,
+        waiting=0
+    )
+    return host
+
+
+class TestDockerHostPool:
+    """Test cases for the DockerHostPool class"""
+
+    @pytest.fixture
+    def hosts(self):
+        """Three hosts: a roomy one, a nearly full one and a small one"""
+        return {
+            'big': make_host('big', 32 * GIB, 4 * GIB),
+            'busy': make_host('busy', 32 * GIB, 28 * GIB),
+            'small': make_host('small', 8 * GIB, 2 * GIB),
+        }
+
+    def test_least_loaded_prefers_largest_free_share(self, hosts):
+        """Test least_loaded spreads servers onto the emptiest host"""
+        pool = DockerHostPool(hosts, policy='least_loaded')
+        host = asyncio.run(pool.place(2 * GIB, int(1e9)))
+        assert host.name == 'big'
+
+    def test_bin_pack_prefers_tightest_fit(self, hosts):
+        """Test bin_pack fills the fullest host that still fits"""
+        pool = DockerHostPool(hosts, policy='bin_pack')
+        host = asyncio.run(pool.place(3 * GIB, int(1e9)))
+        assert host.name == 'busy'
+        host = asyncio.run(pool.place(5 * GIB, int(1e9)))
+        assert host.name == 'small'
+
+    def test_skips_unreachable_hosts(self, hosts):
+        """Test placement ignores hosts that cannot be refreshed"""
+        hosts['big'] = make_host('big', 32 * GIB, 0, reachable=False)
+        pool = DockerHostPool(hosts, policy='least_loaded')
+        host = asyncio.run(pool.place(2 * GIB, int(1e9)))
+        assert host.name == 'small'
+
+    def test_no_fit_falls_back_to_freest_host(self, hosts):
+        """Test a server too big for every host queues on the freest one"""
+        pool = DockerHostPool(hosts, policy='bin_pack')
+        host = asyncio.run(pool.place(64 * GIB, int(1e9)))
+        assert host.name == 'big'
+
+    def test_records_without_host_use_default(self, hosts):
+        """Test legacy records route to the first configured host"""
+        pool = DockerHostPool(hosts)
+        assert pool.for_server({}).name == 'big'
+        assert pool.for_server({'host': 'small'}).name == 'small'
+        with pytest.raises(KeyError):
+            pool.for_server({'host': 'gone'})
+
+    def test_rejects_unknown_policy(self, hosts):
+        """Test an unknown placement policy is refused"""
+        with pytest.raises(ValueError):
+            DockerHostPool(hosts, policy='random')
@@ -0,0 +1,79 @@
+"""
+Tests for the shared HTTP client
+"""
+
+import asyncio
+from aiohttp import web
+from src.utils.http_client import HttpClient
+from src.utils.modpack_helper import ModpackHelper
+
+
+async def serve(handler):
+    """Start a local server for ``handler`` and return its runner and base URL"""
+    app = web.Application()
+    app.router.add_route('*', '/{name}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+class TestHttpClient:
+    """Test cases for the HttpClient class"""
+
+    def test_validate_and_info_share_one_head(self):
+        """Test validation and info lookups reuse a cached HEAD response"""
+        heads = []
+
+        async def handler(request):
+            heads.append(request.method)
+            await asyncio.sleep(0.05)
+            return web.Response(headers={
+                'Content-Type': 'application/zip',
+                'Content-Length': '1234',
+                'ETag': '"abc"',
+            })
+
+        async def scenario():
+            runner, base = await serve(handler)
+            try:
+                async with HttpClient() as client:
+                    url = f"{base}/pack.zip"
+                    valid, info = await asyncio.gather(
+                        ModpackHelper.validate_modpack_url(url, client=client),
+                        ModpackHelper.get_modpack_info(url, client=client)
+                    )
+                    again = await ModpackHelper.get_modpack_info(url, client=client)
+                    return valid, info, again, client.latency_summary()
+            finally:
+                await runner.cleanup()
+
+        valid, info, again, latency = asyncio.run(scenario())
+        assert valid is True
+        assert info['size'] == 1234
+        assert info['etag'] == '"abc"'
+        assert again == info
+        assert heads == ['HEAD']
+        assert latency['127.0.0.1']['requests'] == 1
+
+    def test_failed_head_is_not_cached(self):
+        """Test server errors are retried and counted per host"""
+        statuses = [500, 200]
+
+        async def handler(request):
+            return web.Response(status=statuses.pop(0))
+
+        async def scenario():
+            runner, base = await serve(handler)
+            try:
+                async with HttpClient() as client:
+                    first = await client.head(f"{base}/a.zip")
+                    second = await client.head(f"{base}/a.zip")
+                    return first, second, client.latency_summary()
+            finally:
+                await runner.cleanup()
+
+        first, second, latency = asyncio.run(scenario())
+        assert (first.status, second.status) == (500, 200)
+        assert latency['127.0.0.1']['errors'] == 1
+        assert latency['127.0.0.1']['requests'] == 2
@@ -0,0 +1,43 @@
+"""
+Tests for the image pre-pull manager
+"""
+
+import pytest
+from unittest.mock import Mock
+from src.utils.image_manager import ImageManager
+
+
+class TestImageManager:
+    """Test cases for the ImageManager class"""
+
+    @pytest.fixture
+    def image_manager(self):
+        """Create an ImageManager backed by a mocked Docker helper"""
+        helper = Mock()
+
+        async def run(operation, func, *args, timeout=None, **kwargs):
+            return func(*args, **kwargs)
+
+        helper.run = run
+        return ImageManager(helper)
+
+    @pytest.mark.asyncio
+    async def test_pull_pins_digest(self, image_manager):
+        """Test that a pulled image resolves to its repository digest"""
+        pulled = Mock()
+        pulled.attrs = {'RepoDigests': ['itzg/minecraft-server@sha256:abc']}
+        image_manager.docker_helper.client.images.pull.return_value = pulled
+
+        record = await image_manager.pull('itzg/minecraft-server:latest')
+
+        image_manager.docker_helper.client.images.pull.assert_called_once_with(
+            'itzg/minecraft-server', tag='latest'
+        )
+        assert record.pull_duration is not None
+        assert image_manager.is_ready('itzg/minecraft-server:latest')
+        assert image_manager.resolve('itzg/minecraft-server:latest') == 'itzg/minecraft-server@sha256:abc'
+
+    def test_unknown_image_is_not_ready(self, image_manager):
+        """Test that untracked images resolve to themselves"""
+        assert not image_manager.is_ready('itzg/minecraft-server:latest')
+        assert image_manager.resolve('itzg/minecraft-server:latest') == 'itzg/minecraft-server:latest'
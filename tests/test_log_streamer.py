@@ -0,0 +1,77 @@
+"""
+Tests for log streaming and message batching
+"""
+
+import gzip
+import pytest
+from src.utils.log_streamer import LogBatcher, LogRelay, iter_log_lines
+
+
+async def chunks(*parts):
+    """Yield raw log chunks like the Docker logs stream"""
+    for part in parts:
+        yield part
+
+
+async def lines(count):
+    """Yield numbered log lines"""
+    for i in range(count):
+        yield f"[Server thread/INFO]: line {i}"
+
+
+def _collector(target):
+    """Build an async send callback that records messages"""
+    async def send(message):
+        target.append(message)
+    return send
+
+
+class TestLogStreamer:
+    """Test cases for the log streaming helpers"""
+
+    @pytest.mark.asyncio
+    async def test_iter_log_lines_joins_partial_chunks(self):
+        """Test that lines split across chunks are reassembled"""
+        result = [line async for line in iter_log_lines(chunks(b"first li", b"ne\nsecond\n", b"tail"))]
+
+        assert result == ["first line", "second", "tail"]
+
+    def test_batcher_respects_discord_limit(self):
+        """Test that batched messages never exceed 2000 characters"""
+        batcher = LogBatcher()
+        messages = []
+        for i in range(500):
+            messages.extend(batcher.add(f"line {i} " + "x" * 50))
+        messages.append(batcher.flush())
+
+        assert all(len(message) <= 2000 for message in messages)
+        assert sum(message.count("line ") for message in messages) == 500
+
+    @pytest.mark.asyncio
+    async def test_short_output_is_sent_inline(self):
+        """Test that short logs are posted as messages"""
+        sent, files = [], []
+
+        async def send_file(buffer, filename):
+            files.append(buffer)
+
+        relay = LogRelay(_collector(sent), send_file, messages_per_second=1000)
+        await relay.relay(lines(10))
+
+        assert len(sent) == 1
+        assert files == []
+
+    @pytest.mark.asyncio
+    async def test_long_output_becomes_attachment(self):
+        """Test that long logs are sent as one gzip attachment"""
+        sent, files = [], []
+
+        async def send_file(buffer, filename):
+            files.append(gzip.decompress(buffer.read()).decode())
+
+        relay = LogRelay(_collector(sent), send_file, messages_per_second=1000, max_messages=3)
+        await relay.relay(lines(5000))
+
+        assert sent == []
+        assert len(files) == 1
+        assert files[0].count("\n") == 5000
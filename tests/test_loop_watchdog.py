@@ -0,0 +1,58 @@
+"""
+Tests for the event loop watchdog
+"""
+
+import asyncio
+import time
+from src.utils.loop_watchdog import LoopWatchdog
+
+
+def blocking_job():
+    """Block the event loop the way a synchronous call would"""
+    time.sleep(0.3)
+
+
+class TestLoopWatchdog:
+    """Test cases for the LoopWatchdog class"""
+
+    def test_stall_is_recorded_with_blocking_frame(self):
+        """Test a blocking call is caught with its task and stack"""
+        async def save_state():
+            blocking_job()
+
+        async def scenario():
+            watchdog = LoopWatchdog(interval=0.02, threshold=0.1)
+            watchdog.start()
+            try:
+                await asyncio.sleep(0.05)
+                await asyncio.create_task(save_state(), name="state-writer")
+                await asyncio.sleep(0.05)
+            finally:
+                await watchdog.stop()
+            return watchdog
+
+        watchdog = asyncio.run(scenario())
+        assert len(watchdog.stalls) == 1
+        stall = watchdog.stalls[0]
+        assert stall.duration >= 0.2
+        assert stall.task.startswith("state-writer (") and stall.task.endswith("save_state)")
+        assert 'test_loop_watchdog.py' in stall.culprit
+        assert stall.culprit.endswith('in blocking_job')
+        assert watchdog.max_drift >= 0.2
+
+    def test_short_pauses_are_not_stalls(self):
+        """Test drift under the threshold is only sampled"""
+        async def scenario():
+            watchdog = LoopWatchdog(interval=0.01, threshold=0.5)
+            watchdog.start()
+            try:
+                await asyncio.sleep(0.05)
+                time.sleep(0.02)
+                await asyncio.sleep(0.05)
+            finally:
+                await watchdog.stop()
+            return watchdog
+
+        watchdog = asyncio.run(scenario())
+        assert not watchdog.stalls
+        assert len(watchdog.samples) >= 3
@@ -0,0 +1,51 @@
+"""
+Tests for the metrics endpoint
+"""
+
+import asyncio
+import aiohttp
+from src.utils.metrics import (
+    REGISTRY, ContainerCollector, MetricsServer, STATE_WRITE_SECONDS, observe_modpack_download
+)
+
+
+class TestMetrics:
+    """Test cases for the MetricsServer class"""
+
+    def test_endpoint_serves_registered_metrics(self):
+        """Test /metrics exposes histograms and container counts"""
+        states = [('node1', 'running'), ('node1', 'running'), ('node2', 'exited')]
+        collector = ContainerCollector(lambda: iter(states))
+
+        async def scenario():
+            server = MetricsServer(host='127.0.0.1', port=0)
+            REGISTRY.register(collector)
+            await server.start()
+            try:
+                with STATE_WRITE_SECONDS.labels('sqlite', 'upsert').time():
+                    pass
+                observe_modpack_download(8 * 1024 ** 2, 2.0)
+                host, port = server.address
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(f"http://{host}:{port}/metrics") as response:
+                        return response.status, await response.text()
+            finally:
+                REGISTRY.unregister(collector)
+                await server.stop()
+
+        status, body = asyncio.run(scenario())
+        assert status == 200
+        assert 'minecraft_bot_containers{host="node1",status="running"} 2.0' in body
+        assert 'minecraft_bot_containers{host="node2",status="exited"} 1.0' in body
+        assert 'minecraft_bot_state_write_seconds_count{backend="sqlite",operation="upsert"}' in body
+        assert 'minecraft_bot_modpack_download_bytes_per_second_bucket{le="4e+06"}' in body
+        assert 'minecraft_bot_event_loop_lag_seconds_bucket' in body
+
+    def test_collector_survives_source_errors(self):
+        """Test a failing status source yields an empty gauge instead of breaking scrapes"""
+        def broken():
+            raise RuntimeError("state store unavailable")
+
+        families = list(ContainerCollector(broken).collect())
+        assert families[0].name == 'minecraft_bot_containers'
+        assert families[0].samples == []
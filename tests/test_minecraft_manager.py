@@ -0,0 +1,195 @@
+"""
+Tests for the server manager cog
+"""
+
+import contextlib
+import json
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+from config.settings import settings
+from src.cogs.minecraft_manager import MinecraftServerManager
+from src.utils.host_pool import DockerHostPool
+from src.utils.port_allocator import PortAllocator
+from src.utils.state_store import JsonStateStore, RedisStateStore
+from src.utils.status_poller import ContainerStatus
+from src.utils.template_registry import TemplateRegistry
+
+
+def make_host(name, states):
+    """Create a stand-in host whose status poller knows the given container states"""
+    host = Mock()
+    host.name = name
+    host.event_watcher.connected = True
+    host.status_poller.get.side_effect = lambda server_name: (
+        ContainerStatus(server_name, f"id-{server_name}", states[server_name], "Up", None, 0.0)
+        if server_name in states else None
+    )
+    host.telemetry.get.return_value = None
+    return host
+
+
+@pytest.fixture
+def manager():
+    """A cog on two hosts, with the state store and permissions stubbed out"""
+    hosts = {
+        'alpha': make_host('alpha', {'lobby': 'running'}),
+        'beta': make_host('beta', {'survival': 'exited'}),
+    }
+    with patch('src.cogs.minecraft_manager.DockerHostPool.from_settings', return_value=DockerHostPool(hosts)), \
+            patch('src.cogs.minecraft_manager.create_state_store'):
+        cog = MinecraftServerManager(SimpleNamespace(http_client=Mock()))
+    # Normally done by bot.add_cog
+    for command in cog.get_commands():
+        command.cog = cog
+    cog.permission_checker = Mock()
+    cog.permission_checker.has_required_role.return_value = True
+    cog._active_servers = {
+        'lobby': {'name': 'lobby', 'template_name': 'Vanilla Minecraft', 'port': 25565, 'created_by': 'alice'},
+        'survival': {'name': 'survival', 'template_name': 'Vanilla Minecraft', 'port': 25566,
+                     'created_by': 'bob', 'host': 'beta'},
+        'gone': {'name': 'gone', 'template_name': 'Vanilla Minecraft', 'port': 25567, 'host': 'beta'},
+    }
+    return cog
+
+
+def prepare_creation(manager, tmp_path):
+    """Give the cog a real state store and a host that creates containers at once"""
+    manager.state_store = JsonStateStore(str(tmp_path / "servers.json"))
+    host = manager.hosts.get('alpha')
+    host.ports = PortAllocator(25600, 25610)
+    host.standby_pool.claim.return_value = None
+
+    @contextlib.asynccontextmanager
+    async def admit(name, memory, nano_cpus, on_wait=None):
+        yield
+
+    host.scheduler.admit = admit
+    host.docker_helper.create_server = AsyncMock(return_value=Mock(id="container-1"))
+    manager.hosts.place = AsyncMock(return_value=host)
+    return host
+
+
+class TestMinecraftServerManager:
+    """Test cases for the MinecraftServerManager cog"""
+
+    @pytest.mark.asyncio
+    async def test_list_servers_reads_status_from_each_host(self, manager):
+        """Test !list_servers shows each server's state from the host it lives on"""
+        ctx = Mock()
+        ctx.send = AsyncMock()
+
+        await manager.list_servers(ctx)
+
+        embed = ctx.send.await_args.kwargs['embed']
+        lines = embed.description.splitlines()
+        assert embed.title == "Servers (3)"
+        assert lines[0].startswith("⚫ **gone** · missing")
+        assert "**lobby** · running" in lines[1]
+        assert "**survival** · exited" in lines[2]
+        assert embed.footer.text == "Live status from Docker events"
+        manager.hosts.get('beta').status_poller.get.assert_any_call('survival')
+
+    def test_template_idle_timeout_overrides_default(self, manager, tmp_path, monkeypatch):
+        """Test hibernation uses the idle timeout of the template a server was created from"""
+        path = tmp_path / "templates.json"
+        template = {'description': 'Test', 'image': 'itzg/minecraft-server:latest', 'environment': {}}
+        path.write_text(json.dumps({
+            'lobby': {**template, 'name': 'Lobby Server', 'idle_timeout': 5},
+            'vanilla': {**template, 'name': 'Vanilla Minecraft'},
+        }))
+        manager.templates = TemplateRegistry(str(path))
+        manager.templates.reload()
+        monkeypatch.setattr(settings, 'HIBERNATION_IDLE_MINUTES', 30)
+        manager.hosts.get('alpha').local = True
+        manager.hosts.get('alpha').status_poller.get.side_effect = lambda server_name: ContainerStatus(
+            server_name, f"id-{server_name}", 'running', "Up", None, 0.0
+        )
+        manager._active_servers = {
+            'lobby': {'name': 'lobby', 'template_key': 'lobby', 'template_name': 'Lobby Server', 'port': 25565},
+            'survival': {'name': 'survival', 'template_key': 'vanilla', 'template_name': 'Vanilla Minecraft',
+                         'port': 25566},
+            # Recorded before template_key; found by its display name
+            'legacy': {'name': 'legacy', 'template_name': 'Lobby Server', 'port': 25567},
+        }
+
+        timeouts = {name: timeout for name, _, timeout in manager.hibernation_candidates()}
+        assert timeouts == {'lobby': 300, 'survival': 1800, 'legacy': 300}
+
+    @pytest.mark.asyncio
+    async def test_world_copy_runs_outside_the_creation_lock(self, manager, tmp_path):
+        """Test a cloned server is recorded as creating and its lock released before the copy"""
+        host = prepare_creation(manager, tmp_path)
+
+        async def clone_world(source, target_host, volume_name, image):
+            assert not manager.state_store._locks['copy'].locked()
+            assert manager.state_store.get('copy')['status'] == 'creating'
+            assert manager.server_state('copy', manager.active_servers['copy']) == 'creating'
+            return {'name': source, 'synced_at': 100.0}
+
+        manager.clone_world = clone_world
+        server, container, _, _ = await manager.provision_server('copy', 'vanilla', 'alice', clone_from='lobby')
+
+        record = manager.state_store.get('copy')
+        assert (record['status'], record['container_id'], record['port']) == ('created', 'container-1', server.port)
+        assert record['world_source'] == {'name': 'lobby', 'synced_at': 100.0}
+        assert host.ports.in_use(server.port)
+
+    @pytest.mark.asyncio
+    async def test_failed_creation_frees_name_and_port(self, manager, tmp_path):
+        """Test a creation that fails after reserving removes its record and port"""
+        host = prepare_creation(manager, tmp_path)
+        manager.clone_world = AsyncMock(side_effect=ConnectionError("source went away"))
+
+        with pytest.raises(ConnectionError):
+            await manager.provision_server('copy', 'vanilla', 'alice', clone_from='lobby')
+
+        assert 'copy' not in manager.active_servers
+        assert manager.state_store.get('copy') is None
+        assert host.ports.available == host.ports.size
+
+    @pytest.mark.asyncio
+    async def test_ports_are_checked_against_other_replicas(self, manager, tmp_path):
+        """Test a port taken by another replica is skipped before its change is announced"""
+        host = prepare_creation(manager, tmp_path)
+        server = fakeredis.FakeServer()
+        manager.state_store = RedisStateStore(
+            fakeredis.FakeRedis(server=server, decode_responses=True),
+            fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        )
+        other_replica = RedisStateStore(
+            fakeredis.FakeRedis(server=server, decode_responses=True),
+            fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        )
+        await other_replica.aupsert('arena', {'name': 'arena', 'port': 25600, 'host': 'alpha', 'status': 'creating'})
+
+        created, _, _, _ = await manager.provision_server('skyblock', 'vanilla', 'alice')
+
+        assert created.port == 25601
+        assert host.ports.in_use(25600)
+        await other_replica.stop()
+        await manager.state_store.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_full_import_leaves_server_stopped(self, manager):
+        """Test a full import that fails after emptying the volume does not restart the server"""
+        host = manager.hosts.get('alpha')
+        host.docker_helper.get_container = AsyncMock(return_value=Mock(status='running', attrs={'Image': 'image'}))
+        host.docker_helper.stop_container = AsyncMock()
+        host.docker_helper.start_container = AsyncMock()
+        host.docker_helper.clear_volume = AsyncMock()
+        manager.copy_world = AsyncMock(side_effect=ConnectionError("source went away"))
+        manager.save_active_servers = AsyncMock()
+        manager.active_servers['lobby']['world_source'] = {'name': 'survival', 'synced_at': 100.0}
+        ctx = Mock()
+        ctx.send = AsyncMock()
+
+        await manager.import_world(ctx, 'lobby', 'survival')
+
+        host.docker_helper.clear_volume.assert_awaited_once()
+        host.docker_helper.start_container.assert_not_awaited()
+        assert 'world_source' not in manager.active_servers['lobby']
+        manager.save_active_servers.assert_awaited_once_with('lobby')
+        assert "left stopped" in ctx.send.await_args.args[0]
@@ -0,0 +1,169 @@
+"""
+Tests for the modpack download cache
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from aiohttp import web
+from src.utils.modpack_cache import ModpackCache
+
+
+class PackServer:
+    """A local HTTP server hosting modpack zips with ETags and Range support"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+
+    async def handle(self, request):
+        name = request.match_info['name']
+        body, etag = self.files[name]
+        self.requests.append((request.method, name, request.headers.get('Range')))
+        headers = {'ETag': etag, 'Accept-Ranges': 'bytes'}
+        range_header = request.headers.get('Range')
+        if request.method == 'GET' and range_header and request.headers.get('If-Range') == etag:
+            start = int(range_header.split('=')[1].rstrip('-'))
+            return web.Response(body=body[start:], status=206, headers=headers)
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(body))
+            return web.Response(headers=headers)
+        return web.Response(body=body, headers=headers)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route('*', '/{name}', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+    def gets(self):
+        return [r for r in self.requests if r[0] == 'GET']
+
+
+class TestModpackCache:
+    """Test cases for the ModpackCache class"""
+
+    def test_downloads_once_and_reuses_fresh_copy(self, tmp_path):
+        """Test a second fetch with the same ETag skips the download"""
+        async def scenario():
+            async with PackServer() as server:
+                server.files['pack.zip'] = (b'x' * 300_000, '"v1"')
+                cache = ModpackCache(directory=str(tmp_path), quota=10 ** 7)
+                first = await cache.fetch(f"{server.base}/pack.zip")
+                second = await cache.fetch(f"{server.base}/pack.zip")
+                return server, first, second
+
+        server, first, second = asyncio.run(scenario())
+        assert first.sha256 == hashlib.sha256(b'x' * 300_000).hexdigest()
+        assert second.sha256 == first.sha256
+        assert len(server.gets()) == 1
+        assert (tmp_path / 'blobs' / f"{first.sha256}.zip").stat().st_size == 300_000
+
+    def test_writes_run_off_the_event_loop(self, tmp_path, monkeypatch):
+        """Test downloaded chunks and the index are written on worker threads"""
+        threads = set()
+        append, write_index = ModpackCache._append, ModpackCache._write_index
+
+        def recording_append(f, digest, chunk):
+            threads.add(threading.get_ident())
+            append(f, digest, chunk)
+
+        def recording_write_index(self, data):
+            threads.add(threading.get_ident())
+            write_index(self, data)
+
+        monkeypatch.setattr(ModpackCache, '_append', staticmethod(recording_append))
+        monkeypatch.setattr(ModpackCache, '_write_index', recording_write_index)
+
+        async def scenario():
+            async with PackServer() as server:
+                server.files['pack.zip'] = (b'x' * 3_000_000, '"v1"')
+                cache = ModpackCache(directory=str(tmp_path), quota=10 ** 7)
+                return await cache.fetch(f"{server.base}/pack.zip"), threading.get_ident()
+
+        entry, loop_thread = asyncio.run(scenario())
+        assert entry.sha256 == hashlib.sha256(b'x' * 3_000_000).hexdigest()
+        assert threads and loop_thread not in threads
+        assert json.loads((tmp_path / 'index.json').read_text())[entry.url]['sha256'] == entry.sha256
+
+    def test_changed_etag_downloads_again(self, tmp_path):
+        """Test a new ETag invalidates the cached copy"""
+        async def scenario():
+            async with PackServer() as server:
+                cache = ModpackCache(directory=str(tmp_path), quota=10 ** 7)
+                server.files['pack.zip'] = (b'old', '"v1"')
+                old = await cache.fetch(f"{server.base}/pack.zip")
+                server.files['pack.zip'] = (b'new', '"v2"')
+                new = await cache.fetch(f"{server.base}/pack.zip")
+                return old, new
+
+        old, new = asyncio.run(scenario())
+        assert old.sha256 != new.sha256
+        assert new.etag == '"v2"'
+
+    def test_resumes_partial_download(self, tmp_path):
+        """Test an interrupted download continues with a Range request"""
+        body = bytes(range(256)) * 1000
+
+        async def scenario():
+            async with PackServer() as server:
+                server.files['pack.zip'] = (body, '"v1"')
+                url = f"{server.base}/pack.zip"
+                cache = ModpackCache(directory=str(tmp_path), quota=10 ** 7)
+                key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+                (tmp_path / 'partial' / f"{key}.part").write_bytes(body[:1000])
+                (tmp_path / 'partial' / f"{key}.json").write_text(json.dumps({'url': url, 'validator': '"v1"'}))
+                entry = await cache.fetch(url)
+                return server, entry
+
+        server, entry = asyncio.run(scenario())
+        assert server.gets() == [('GET', 'pack.zip', 'bytes=1000-')]
+        assert entry.sha256 == hashlib.sha256(body).hexdigest()
+        assert entry.size == len(body)
+
+    def test_evicts_least_recently_used_unpinned_blobs(self, tmp_path):
+        """Test eviction keeps the cache under quota but spares mounted packs"""
+        async def scenario():
+            async with PackServer() as server:
+                for name in ('a', 'b', 'c'):
+                    server.files[f'{name}.zip'] = (name.encode() * 400, f'"{name}"')
+                pinned = set()
+                cache = ModpackCache(directory=str(tmp_path), quota=1000, in_use=lambda: pinned)
+                a = await cache.fetch(f"{server.base}/a.zip")
+                pinned.add(a.sha256)
+                b = await cache.fetch(f"{server.base}/b.zip")
+                c = await cache.fetch(f"{server.base}/c.zip")
+                return cache, a, b, c
+
+        cache, a, b, c = asyncio.run(scenario())
+        assert cache.blob_path(a.sha256).exists()
+        assert not cache.blob_path(b.sha256).exists()
+        assert cache.blob_path(c.sha256).exists()
+        assert cache.get(b.url) is None
+
+    def test_pinned_blobs_survive_eviction_until_unpinned(self, tmp_path):
+        """Test a pack fetched for a creation in progress is not evicted before its record is saved"""
+        async def scenario():
+            async with PackServer() as server:
+                for name in ('a', 'b', 'c'):
+                    server.files[f'{name}.zip'] = (name.encode() * 400, f'"{name}"')
+                cache = ModpackCache(directory=str(tmp_path), quota=500)
+                a = await cache.fetch(f"{server.base}/a.zip", pin=True)
+                await cache.fetch(f"{server.base}/b.zip")
+                kept = cache.blob_path(a.sha256).exists()
+                cache.unpin(a.sha256)
+                await cache.fetch(f"{server.base}/c.zip")
+                return cache, a, kept
+
+        cache, a, kept = asyncio.run(scenario())
+        assert kept
+        assert not cache.blob_path(a.sha256).exists()
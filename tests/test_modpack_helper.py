@@ -0,0 +1,161 @@
+"""
+Tests for modpack metadata extraction
+"""
+
+import asyncio
+import json
+import os
+import time
+import zipfile
+from aiohttp import web
+from src.utils.modpack_helper import ModpackHelper
+
+
+def make_zip(path, entries):
+    """Write a zip with the given {name: bytes or dict} entries"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in entries.items():
+            if isinstance(content, dict):
+                content = json.dumps(content).encode('utf-8')
+            zip_file.writestr(name, content)
+    return str(path)
+
+
+class RangeServer:
+    """A local HTTP server that serves one file and honours Range requests"""
+
+    def __init__(self, body):
+        self.body = body
+        self.served = 0
+
+    async def handle(self, request):
+        headers = {'Accept-Ranges': 'bytes'}
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(len(self.body))
+            return web.Response(headers=headers)
+        start, _, end = request.headers['Range'].split('=')[1].partition('-')
+        chunk = self.body[int(start):int(end) + 1]
+        self.served += len(chunk)
+        return web.Response(body=chunk, status=206, headers=headers)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_route('*', '/pack.zip', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', 0).start()
+        self.url = f"http://127.0.0.1:{self.runner.addresses[0][1]}/pack.zip"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+class TestExtractModpackMetadata:
+    """Test cases for ModpackHelper.extract_modpack_metadata"""
+
+    def test_curseforge_manifest(self, tmp_path):
+        """Test a CurseForge pack reads version and primary loader"""
+        path = make_zip(tmp_path / 'cf.zip', {
+            'manifest.json': {
+                'manifestType': 'minecraftModpack',
+                'name': 'Test Pack',
+                'version': '1.2',
+                'minecraft': {
+                    'version': '1.20.1',
+                    'modLoaders': [{'id': 'neoforge-47.1.0', 'primary': True}]
+                },
+                'files': [{'projectID': 1}, {'projectID': 2}]
+            },
+            'overrides/config/jei.toml': b'',
+            'overrides/mods/extra.jar': b'',
+        })
+        metadata = ModpackHelper.extract_modpack_metadata(path)
+        assert metadata['manifest_type'] == 'curseforge'
+        assert metadata['minecraft_version'] == '1.20.1'
+        assert metadata['mod_loader'] == 'neoforge'
+        assert metadata['loader_version'] == '47.1.0'
+        assert metadata['mod_count'] == 1
+        assert metadata['has_config'] is True
+
+    def test_modrinth_index_wins_over_nested_manifests(self, tmp_path):
+        """Test the Modrinth index is preferred to manifests inside overrides"""
+        path = make_zip(tmp_path / 'mr.mrpack', {
+            'overrides/config/some/manifest.json': {'minecraft': {'version': '1.7.10'}},
+            'modrinth.index.json': {
+                'formatVersion': 1,
+                'name': 'Fabulous',
+                'versionId': '3.0',
+                'files': [{'path': 'mods/a.jar'}, {'path': 'mods/b.jar'}, {'path': 'resourcepacks/c.zip'}],
+                'dependencies': {'minecraft': '1.20.4', 'fabric-loader': '0.15.7'}
+            },
+        })
+        metadata = ModpackHelper.extract_modpack_metadata(path)
+        assert metadata['manifest_type'] == 'modrinth'
+        assert metadata['minecraft_version'] == '1.20.4'
+        assert metadata['mod_loader'] == 'fabric'
+        assert metadata['mod_count'] == 2
+
+    def test_fabric_mod_json(self, tmp_path):
+        """Test a bare fabric.mod.json is understood"""
+        path = make_zip(tmp_path / 'fabric.zip', {
+            'fabric.mod.json': {'id': 'demo', 'version': '1.0', 'depends': {'minecraft': '~1.20', 'fabricloader': '>=0.14'}},
+        })
+        metadata = ModpackHelper.extract_modpack_metadata(path)
+        assert metadata['manifest_type'] == 'fabric'
+        assert metadata['minecraft_version'] == '~1.20'
+        assert metadata['mod_loader'] == 'fabric'
+
+    def test_loader_hint_from_filenames(self, tmp_path):
+        """Test neoforge jars are not reported as forge"""
+        path = make_zip(tmp_path / 'plain.zip', {'mods/neoforge-compat.jar': b'', 'mods/other.jar': b''})
+        metadata = ModpackHelper.extract_modpack_metadata(path)
+        assert metadata['mod_loader'] == 'neoforge'
+        assert metadata['mod_count'] == 2
+        assert metadata['manifest_type'] is None
+
+    def test_large_pack_is_fast(self, tmp_path):
+        """Test a pack with 50k entries is scanned quickly"""
+        path = tmp_path / 'big.zip'
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zip_file:
+            for i in range(50_000):
+                zip_file.writestr(f"mods/mod_{i}.jar", b'')
+            zip_file.writestr('manifest.json', json.dumps({'minecraft': {'version': '1.21'}}))
+        started = time.perf_counter()
+        metadata = ModpackHelper.extract_modpack_metadata(str(path))
+        assert time.perf_counter() - started < 2
+        assert metadata['mod_count'] == 50_000
+        assert metadata['minecraft_version'] == '1.21'
+
+    def test_invalid_zip_returns_defaults(self, tmp_path):
+        """Test an unreadable file yields empty metadata"""
+        path = tmp_path / 'broken.zip'
+        path.write_bytes(b'not a zip')
+        metadata = ModpackHelper.extract_modpack_metadata(str(path))
+        assert metadata['mod_count'] == 0
+        assert metadata['mod_loader'] is None
+
+
+class TestExtractRemoteModpackMetadata:
+    """Test cases for ModpackHelper.extract_remote_modpack_metadata"""
+
+    def test_reads_only_directory_and_manifest(self, tmp_path):
+        """Test a remote pack is inspected without downloading its contents"""
+        path = tmp_path / 'remote.zip'
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zip_file:
+            zip_file.writestr('mods/huge.jar', os.urandom(4 * 1024 * 1024))
+            zip_file.writestr('manifest.json', json.dumps({
+                'minecraft': {'version': '1.19.2', 'modLoaders': [{'id': 'forge-43.2.0', 'primary': True}]}
+            }))
+        body = path.read_bytes()
+
+        async def scenario():
+            async with RangeServer(body) as server:
+                metadata = await ModpackHelper.extract_remote_modpack_metadata(server.url)
+                return server, metadata
+
+        server, metadata = asyncio.run(scenario())
+        assert metadata['minecraft_version'] == '1.19.2'
+        assert metadata['mod_loader'] == 'forge'
+        assert metadata['mod_count'] == 1
+        assert server.served < len(body) // 10
@@ -0,0 +1,54 @@
+"""
+Tests for host port allocation
+"""
+
+import pytest
+from src.utils.port_allocator import PortAllocator, PortUnavailableError
+
+
+class TestPortAllocator:
+    """Test cases for the PortAllocator class"""
+
+    @pytest.fixture
+    def allocator(self):
+        """Create an allocator over a five-port range"""
+        return PortAllocator(25565, 25569)
+
+    def test_allocates_in_order_until_exhausted(self, allocator):
+        """Test ports are handed out lowest first and never twice"""
+        ports = [allocator.allocate() for _ in range(5)]
+        assert ports == [25565, 25566, 25567, 25568, 25569]
+        assert allocator.available == 0
+        with pytest.raises(PortUnavailableError):
+            allocator.allocate()
+
+    def test_reset_skips_ports_in_use(self, allocator):
+        """Test rebuilding from recorded and bound ports"""
+        allocator.reset([25565, 25567, 30000])
+        assert allocator.available == 3
+        assert allocator.in_use(30000)
+        assert allocator.allocate() == 25566
+        assert allocator.allocate() == 25568
+
+    def test_reserve_rejects_taken_port(self, allocator):
+        """Test explicit ports cannot collide with allocated ones"""
+        port = allocator.allocate()
+        with pytest.raises(PortUnavailableError):
+            allocator.reserve(port)
+        allocator.reserve(25566)
+        assert allocator.allocate() == 25567
+
+    def test_release_makes_port_reusable(self, allocator):
+        """Test a released port is handed out again"""
+        ports = [allocator.allocate() for _ in range(5)]
+        allocator.release(ports[2])
+        assert allocator.available == 1
+        assert allocator.allocate() == ports[2]
+
+    def test_repeated_reserve_release_does_not_grow_queue(self, allocator):
+        """Test the free queue never holds more entries than the range"""
+        for _ in range(100):
+            allocator.reserve(25566)
+            allocator.release(25566)
+        assert len(allocator._free) <= allocator.size
+        assert sorted(allocator.allocate() for _ in range(5)) == list(range(25565, 25570))
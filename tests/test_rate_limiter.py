@@ -0,0 +1,83 @@
+"""
+Tests for the command rate limiter
+"""
+
+import asyncio
+import pytest
+from config.settings import settings
+from src.utils.rate_limiter import CommandRateLimiter, RateLimitExceeded, TokenBucket
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Small buckets refilling ten tokens a second so queues drain quickly"""
+    for scope in ('USER', 'GUILD', 'GLOBAL'):
+        monkeypatch.setattr(settings, f"RATE_LIMIT_{scope}_CAPACITY", 2)
+        monkeypatch.setattr(settings, f"RATE_LIMIT_{scope}_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_WAIT", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_QUEUED", 10)
+    monkeypatch.setattr(settings, "COMMAND_COSTS", {})
+
+
+class TestRateLimiter:
+    """Test cases for TokenBucket and CommandRateLimiter"""
+
+    def test_bucket_refills_over_time(self):
+        """Test tokens refill at the configured rate up to capacity"""
+        bucket = TokenBucket(capacity=10, rate=2, now=0)
+        bucket.take(10)
+        assert bucket.wait_time(4, now=0) == pytest.approx(2)
+        assert bucket.wait_time(4, now=2) == 0
+        assert bucket.wait_time(1, now=100) == 0
+        assert bucket.tokens == 10
+
+    def test_docker_commands_cost_more(self, limits, monkeypatch):
+        """Test default costs, overrides from settings, and the default of one"""
+        monkeypatch.setattr(settings, "COMMAND_COSTS", {'capacity': 7})
+        limiter = CommandRateLimiter()
+        assert limiter.cost('create_server') > limiter.cost('list_servers') == 1
+        assert limiter.cost('capacity') == 7
+
+    def test_busy_guild_does_not_starve_others(self, limits):
+        """Test queued commands are served round-robin across guilds"""
+        async def scenario():
+            limiter = CommandRateLimiter()
+            order = []
+            queued = []
+
+            async def command(user, guild):
+                async def on_queued(estimate):
+                    queued.append((user, guild))
+                await limiter.acquire(user, guild, 1, on_queued=on_queued)
+                order.append(guild)
+
+            tasks = [asyncio.create_task(command(user, 'busy')) for user in range(6)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(command('other-user', 'quiet')))
+            await asyncio.gather(*tasks)
+            return order, queued
+
+        order, queued = asyncio.run(scenario())
+        # The first two fit the burst; the quiet guild's command runs right after the next busy one
+        assert order[:2] == ['busy', 'busy']
+        assert 'quiet' in order[2:4]
+        assert ('other-user', 'quiet') in queued
+
+    def test_rejects_when_wait_is_too_long(self, limits, monkeypatch):
+        """Test commands are rejected rather than queued past the maximum wait"""
+        monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_MINUTE", 1)
+        monkeypatch.setattr(settings, "RATE_LIMIT_GUILD_CAPACITY", 10)
+        monkeypatch.setattr(settings, "RATE_LIMIT_GLOBAL_CAPACITY", 10)
+
+        async def scenario():
+            limiter = CommandRateLimiter()
+            await limiter.acquire('user', 'guild', 2)
+            with pytest.raises(RateLimitExceeded) as error:
+                await limiter.acquire('user', 'guild', 2)
+            # Other users are unaffected
+            assert await limiter.acquire('someone-else', 'guild', 1) == 0
+            return error.value
+
+        error = asyncio.run(scenario())
+        assert error.scope == 'user'
+        assert error.retry_after > settings.RATE_LIMIT_MAX_WAIT
@@ -0,0 +1,90 @@
+"""
+Tests for host capacity scheduling
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+from src.utils.scheduler import CapacityScheduler, InsufficientCapacityError, template_resources
+
+GIB = 1024 ** 3
+
+
+class TestCapacityScheduler:
+    """Test cases for the CapacityScheduler class"""
+
+    @pytest.fixture
+    def scheduler(self):
+        """Create a scheduler for an 8G, 4 CPU host with one 3G server running"""
+        helper = Mock()
+
+        async def run(operation, func, *args, timeout=None, **kwargs):
+            return func(*args, **kwargs)
+
+        running = Mock()
+        running.attrs = {
+            'Names': ['/minecraft_lobby'],
+            'Labels': {'minecraft.mem_limit': str(3 * GIB), 'minecraft.nano_cpus': str(int(1e9))},
+        }
+        helper.run = run
+        helper.client.info.return_value = {'MemTotal': 9 * GIB, 'NCPU': 4}
+        helper.client.containers.list.return_value = [running]
+        with patch('src.utils.scheduler.settings') as settings:
+            settings.HOST_RESERVED_MEMORY = '1G'
+            settings.CPU_OVERCOMMIT = 1.0
+            settings.DEFAULT_MEMORY = '2G'
+            settings.DEFAULT_CPUS = 2
+            settings.ADMISSION_QUEUE_TIMEOUT = 0.2
+            settings.CAPACITY_REFRESH_INTERVAL = 60
+            yield CapacityScheduler(helper)
+
+    @pytest.mark.asyncio
+    async def test_admits_when_capacity_available(self, scheduler):
+        """Test that a server which fits is admitted and counted"""
+        async with scheduler.admit('creative', 4 * GIB, int(2e9)):
+            assert scheduler.headroom().memory_free == 1 * GIB
+
+        assert scheduler.headroom().running == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_queue_timeout(self, scheduler):
+        """Test that a server which does not fit waits, then is rejected"""
+        waits = []
+
+        async def on_wait():
+            waits.append(True)
+
+        with pytest.raises(InsufficientCapacityError):
+            async with scheduler.admit('modded', 6 * GIB, int(1e9), on_wait=on_wait):
+                pass
+
+        assert waits == [True]
+
+    @pytest.mark.asyncio
+    async def test_queued_server_admitted_when_capacity_frees(self, scheduler):
+        """Test that a queued creation proceeds once another one fails"""
+        async def first():
+            async with scheduler.admit('first', 4 * GIB, int(1e9)):
+                await asyncio.sleep(0.05)
+                raise RuntimeError("container failed")
+
+        async def second():
+            await asyncio.sleep(0.01)
+            async with scheduler.admit('second', 4 * GIB, int(1e9)):
+                return True
+
+        results = await asyncio.gather(first(), second(), return_exceptions=True)
+
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] is True
+
+    def test_template_resources_adds_overhead(self):
+        """Test that container limits include JVM overhead"""
+        template = Mock(environment={'MEMORY': '4G'}, cpus=1.5)
+
+        with patch('src.utils.scheduler.settings') as settings:
+            settings.CONTAINER_MEMORY_OVERHEAD = 0.25
+            memory, nano_cpus = template_resources(template)
+
+        assert memory == 5 * GIB
+        assert nano_cpus == int(1.5e9)
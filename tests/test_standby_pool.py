@@ -0,0 +1,140 @@
+"""
+Tests for the warm standby volume pool
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+from src.models.template import ServerTemplate
+from src.utils.scheduler import template_resources
+from src.utils.standby_pool import STANDBY_LABEL, StandbyPool
+
+TEMPLATE = ServerTemplate.from_dict('vanilla', {
+    'name': 'Vanilla Minecraft',
+    'image': 'itzg/minecraft-server:latest',
+    'environment': {'EULA': 'TRUE', 'MEMORY': '2G'},
+})
+
+
+class FakeDockerHelper:
+    """Runs Docker SDK calls inline against a mocked client"""
+
+    def __init__(self):
+        self.client = Mock()
+        self.operations = []
+
+    async def run(self, operation, func, *args, timeout=None, **kwargs):
+        self.operations.append(operation)
+        return func(*args, **kwargs)
+
+
+def make_volume(name, template_name):
+    volume = Mock()
+    volume.name = name
+    volume.attrs = {'Labels': {STANDBY_LABEL: template_name}}
+    return volume
+
+
+@pytest.fixture
+def pool():
+    """A pool for one template whose image is already pulled"""
+    image_manager = Mock()
+    image_manager.is_ready.return_value = True
+    image_manager.resolve.side_effect = lambda image: image
+    pool = StandbyPool(FakeDockerHelper(), image_manager, {'vanilla': 3})
+    pool.templates = {'vanilla': TEMPLATE}
+    return pool
+
+
+class TestStandbyPool:
+    """Test cases for the StandbyPool class"""
+
+    def test_claim_and_release(self, pool):
+        """Test claims take ready volumes until the pool is empty and releases return them"""
+        pool.ready['vanilla'] = ['mcstandby_vanilla_a', 'mcstandby_vanilla_b']
+
+        assert pool.claim('vanilla') == 'mcstandby_vanilla_b'
+        assert pool.claim('vanilla') == 'mcstandby_vanilla_a'
+        assert pool.claim('vanilla') is None
+        assert pool.claim('forge') is None
+        assert pool._wakeup.is_set()
+
+        pool.release('vanilla', 'mcstandby_vanilla_a')
+        assert pool.ready['vanilla'] == ['mcstandby_vanilla_a']
+
+    @pytest.mark.asyncio
+    async def test_refill_stays_within_memory_budget(self, pool):
+        """Test warm-ups start only while their memory fits the standby budget"""
+        memory, _ = template_resources(TEMPLATE)
+        pool.memory_budget = 2 * memory
+        started = []
+        finish = asyncio.Event()
+
+        async def warm(template_name, template, reserved):
+            started.append(template_name)
+            await finish.wait()
+
+        pool._warm = warm
+        pool.ready['vanilla'] = []
+        pool._refill()
+        await asyncio.sleep(0)
+
+        assert started == ['vanilla', 'vanilla']
+        assert pool.warming['vanilla'] == 2
+        assert pool._warming_memory == 2 * memory
+
+        # Nothing more starts until a warm-up returns its memory
+        pool._refill()
+        await asyncio.sleep(0)
+        assert len(started) == 2
+        finish.set()
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_discovers_existing_volumes(self, pool):
+        """Test labelled volumes are reused unless in use, half-warmed or for an unknown template"""
+        stale = Mock(attrs={'Mounts': [{'Destination': '/data', 'Name': 'mcstandby_vanilla_stale'}]})
+        volumes = [
+            make_volume('mcstandby_vanilla_good', 'vanilla'),
+            make_volume('mcstandby_vanilla_used', 'vanilla'),
+            make_volume('mcstandby_vanilla_stale', 'vanilla'),
+            make_volume('mcstandby_gone_old', 'gone'),
+        ]
+        client = pool.docker_helper.client
+        client.containers.list.return_value = [stale]
+        client.volumes.list.return_value = volumes
+
+        await pool._discover({'mcstandby_vanilla_used'})
+
+        assert pool.ready == {'vanilla': ['mcstandby_vanilla_good']}
+        stale.remove.assert_called_once_with(force=True)
+        volumes[2].remove.assert_called_once_with(force=True)
+        volumes[1].remove.assert_not_called()
+        assert client.volumes.list.call_args.kwargs['filters'] == {'label': STANDBY_LABEL, 'dangling': True}
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_is_cleaned_up(self, pool):
+        """Test a warm-up that fails removes its container and volume and returns its memory"""
+        memory, _ = template_resources(TEMPLATE)
+        client = pool.docker_helper.client
+        container = Mock()
+        client.containers.run.return_value = container
+        volume = Mock()
+        client.volumes.get.return_value = volume
+
+        async def fail(container):
+            raise RuntimeError("warm-up container exited with code 1")
+
+        pool._wait_until_ready = fail
+        pool._warming_memory = memory
+        pool.warming['vanilla'] = 1
+
+        await pool._warm('vanilla', TEMPLATE, memory)
+
+        volume_name = client.volumes.create.call_args.kwargs['name']
+        assert volume_name.startswith('mcstandby_vanilla_')
+        container.remove.assert_called_once_with(force=True)
+        client.volumes.get.assert_called_once_with(volume_name)
+        volume.remove.assert_called_once_with(force=True)
+        assert not pool.ready.get('vanilla')
+        assert (pool.warming['vanilla'], pool._warming_memory) == (0, 0)
@@ -0,0 +1,164 @@
+"""
+Tests for the server state storage backends
+"""
+
+import asyncio
+import json
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from config.settings import settings
+from src.utils.state_store import JsonStateStore, RedisStateStore, SQLiteStateStore
+
+
+class TestSQLiteStateStore:
+    """Test cases for the SQLiteStateStore class"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Create a SQLite store in a temporary directory"""
+        store = SQLiteStateStore(str(tmp_path / "servers.db"))
+        yield store
+        store.close()
+
+    def test_upsert_and_get(self, store):
+        """Test that upserts replace a single record"""
+        store.upsert("survival", {"name": "survival", "status": "created"})
+        store.upsert("survival", {"name": "survival", "status": "running"})
+
+        assert store.get("survival")["status"] == "running"
+        assert list(store.load_all()) == ["survival"]
+
+    def test_delete(self, store):
+        """Test that deleted records are no longer returned"""
+        store.upsert("survival", {"name": "survival"})
+        store.delete("survival")
+
+        assert store.get("survival") is None
+
+    def test_upsert_many_at_scale(self, store):
+        """Test bulk writes and reads of many records"""
+        store.upsert_many((f"server_{i}", {"name": f"server_{i}"}) for i in range(10000))
+
+        assert len(store.load_all()) == 10000
+
+    def test_imports_legacy_json(self, tmp_path):
+        """Test that an existing JSON servers file is migrated on first use"""
+        legacy = tmp_path / "active_servers.json"
+        legacy.write_text(json.dumps({"lobby": {"name": "lobby"}}))
+
+        store = SQLiteStateStore(str(tmp_path / "servers.db"), legacy_json=str(legacy))
+
+        assert store.get("lobby") == {"name": "lobby"}
+        store.close()
+
+
+class TestJsonStateStore:
+    """Test cases for the JsonStateStore class"""
+
+    def test_write_is_atomic(self, tmp_path):
+        """Test that writes replace the file without leaving temp files"""
+        path = tmp_path / "active_servers.json"
+        store = JsonStateStore(str(path))
+
+        store.upsert("lobby", {"name": "lobby"})
+
+        assert json.loads(path.read_text()) == {"lobby": {"name": "lobby"}}
+        assert [p.name for p in tmp_path.iterdir()] == ["active_servers.json"]
+
+
+class TestRedisStateStore:
+    """Test cases for the RedisStateStore class"""
+
+    @pytest.fixture
+    def server(self):
+        """Create a fake Redis server shared by several replicas"""
+        return fakeredis.FakeServer()
+
+    def make_store(self, server):
+        """Create a store connected to the shared fake server"""
+        return RedisStateStore(
+            fakeredis.FakeRedis(server=server, decode_responses=True),
+            fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        )
+
+    @pytest.mark.asyncio
+    async def test_replicas_share_records(self, server):
+        """Test that a write from one replica is visible and announced to another"""
+        first, second = self.make_store(server), self.make_store(server)
+        changes = asyncio.Queue()
+        second.add_listener(lambda name, record: changes.put_nowait((name, record)))
+        await second.start()
+
+        first.upsert("lobby", {"name": "lobby"})
+
+        assert second.get("lobby") == {"name": "lobby"}
+        assert await asyncio.wait_for(changes.get(), timeout=2) == ("lobby", {"name": "lobby"})
+        await second.stop()
+        await first.stop()
+
+    @pytest.mark.asyncio
+    async def test_async_methods_do_not_block_the_loop(self, server):
+        """Test the event-loop methods go through the async client only"""
+        first, second = self.make_store(server), self.make_store(server)
+        first.client = None
+        changes = asyncio.Queue()
+        second.add_listener(lambda name, record: changes.put_nowait((name, record)))
+        await second.start()
+
+        await first.aupsert_many([("lobby", {"name": "lobby"}), ("survival", {"name": "survival"})])
+        await first.adelete("survival")
+
+        assert await first.aget("lobby") == {"name": "lobby"}
+        assert await first.aload_all() == {"lobby": {"name": "lobby"}}
+        assert second.load_all() == {"lobby": {"name": "lobby"}}
+        # Listeners re-read the record, so a change may already show a later write
+        seen = {}
+        while seen.get("survival", {}) is not None:
+            name, record = await asyncio.wait_for(changes.get(), timeout=2)
+            seen[name] = record
+        assert seen == {"lobby": {"name": "lobby"}, "survival": None}
+        await second.stop()
+        await first.stop()
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive_across_replicas(self, server):
+        """Test that two replicas cannot hold the same server lock"""
+        first, second = self.make_store(server), self.make_store(server)
+        order = []
+
+        async def hold(store, label):
+            async with store.lock("lobby"):
+                order.append(f"{label}-start")
+                await asyncio.sleep(0.05)
+                order.append(f"{label}-end")
+
+        await asyncio.gather(hold(first, "a"), hold(second, "b"))
+
+        assert order in (["a-start", "a-end", "b-start", "b-end"],
+                         ["b-start", "b-end", "a-start", "a-end"])
+        await first.stop()
+        await second.stop()
+
+    @pytest.mark.asyncio
+    async def test_lock_is_renewed_while_held(self, server, monkeypatch):
+        """Test that a lock held past its lease is not taken by another replica"""
+        monkeypatch.setattr(settings, 'REDIS_LOCK_LEASE', 0.15)
+        first, second = self.make_store(server), self.make_store(server)
+        order = []
+
+        async def hold(store, label, seconds):
+            async with store.lock("lobby"):
+                order.append(f"{label}-start")
+                await asyncio.sleep(seconds)
+                order.append(f"{label}-end")
+
+        holder = asyncio.create_task(hold(first, "a", 0.5))
+        await asyncio.sleep(0.01)
+        await hold(second, "b", 0)
+        await holder
+
+        assert order == ["a-start", "a-end", "b-start", "b-end"]
+        assert not await first.async_client.exists(f"{first.lock_prefix}lobby")
+        await first.stop()
+        await second.stop()
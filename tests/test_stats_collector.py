@@ -0,0 +1,88 @@
+"""
+Tests for container stats collection and storage
+"""
+
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from src.utils.stats_collector import StatsCollector, StatsReading, StatsSeries, parse_window, sparkline
+
+
+def api_stats(tick: int) -> dict:
+    """A cgroup v2 stats object after ``tick`` seconds of half a core and steady I/O"""
+    return {
+        'cpu_stats': {'cpu_usage': {'total_usage': tick * 500_000_000}, 'system_cpu_usage': tick * 4_000_000_000,
+                      'online_cpus': 4},
+        'memory_stats': {'usage': 3 * 1024 ** 3, 'stats': {'inactive_file': 1024 ** 3}},
+        'networks': {'eth0': {'rx_bytes': tick * 10_240, 'tx_bytes': tick * 2048}},
+        'blkio_stats': {'io_service_bytes_recursive': [{'op': 'read', 'value': tick * 4096},
+                                                       {'op': 'write', 'value': tick * 8192}]},
+    }
+
+
+class TestStatsCollector:
+    """Test cases for StatsReading, StatsSeries and StatsCollector"""
+
+    def test_rates_between_readings(self):
+        """Test CPU percent, memory without page cache and byte rates"""
+        first = StatsReading.from_api(api_stats(1), timestamp=100)
+        second = StatsReading.from_api(api_stats(3), timestamp=102)
+        rates = second.rates(first)
+
+        assert rates['cpu'] == pytest.approx(50)
+        assert rates['memory'] == 2 * 1024 ** 3
+        assert rates['net_rx'] == pytest.approx(10_240)
+        assert rates['block_write'] == pytest.approx(8192)
+        # Counters going backwards mean the container restarted
+        assert first.rates(second) is None
+
+    def test_series_ring_and_gaps(self):
+        """Test samples land in fixed slots, gaps read as missing and old slots are overwritten"""
+        series = StatsSeries(resolution=10, size=6)
+        for timestamp in (0, 10, 20, 50, 60, 70):
+            series.record(timestamp, {'cpu': timestamp / 10, 'memory': 512 * 1024 ** 2})
+
+        _, columns = series.window(60)
+        assert [None if value is None else round(value, 1) for value in columns['cpu']] == [2, None, None, 5, 6, 7]
+        assert columns['memory'][-1] == 512 * 1024 ** 2
+        assert columns['net_rx'] == [None] * 6
+        # 500 servers at 10s for a day stay within a few tens of MB
+        assert 500 * StatsSeries(10, 8640).nbytes < 60 * 1024 ** 2
+
+    @pytest.mark.asyncio
+    async def test_streams_are_bounded_and_the_rest_polled(self):
+        """Test containers over the stream limit are polled once per round"""
+        ticks = iter(range(1, 100))
+
+        async def stream_stats(container_id):
+            for tick in range(1, 4):
+                yield api_stats(tick)
+            await asyncio.Event().wait()
+
+        docker_helper = Mock(stream_stats=stream_stats)
+        docker_helper.stats_once = AsyncMock(side_effect=lambda container_id: api_stats(next(ticks)))
+        running = lambda name: SimpleNamespace(state='running', container_id=f"id-{name}")
+        poller = SimpleNamespace(snapshot={'alpha': running('alpha'), 'beta': running('beta')})
+        collector = StatsCollector(docker_helper, poller, resolution=10, retention_hours=1, max_streams=1)
+
+        await collector.collect()
+        await asyncio.sleep(0.01)
+        await collector.collect()
+
+        assert collector.streaming == 1
+        streamed, polled = sorted(collector.series, key=lambda name: name in collector._streams, reverse=True)
+        assert collector._samplers[streamed].count == 2
+        assert docker_helper.stats_once.await_count == 2
+        assert collector.get(polled).latest is not None
+        await collector.stop()
+        assert collector.streaming == 0
+
+    def test_sparkline_and_window(self):
+        """Test sparkline scaling, blanks for gaps and window parsing"""
+        assert sparkline([0, 1, 2, 3, 4, 5, 6, 7], width=8) == "▁▂▃▄▅▆▇█"
+        assert sparkline([1, None, 1], width=3) == "█ █"
+        assert len(sparkline(list(range(360)), width=40)) == 40
+        assert parse_window("30m") == 1800
+        assert parse_window("1d") == 86400
+        assert parse_window("soon") is None
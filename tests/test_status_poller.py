@@ -0,0 +1,93 @@
+"""
+Tests for the container status poller and Docker event watcher
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.utils.event_watcher import DockerEventWatcher, ServerEvent
+from src.utils.status_poller import StatusPoller
+
+
+class TestStatusPoller:
+    """Test cases for the StatusPoller class"""
+
+    @pytest.fixture
+    def poller(self):
+        """Create a StatusPoller backed by a mocked Docker helper"""
+        helper = Mock()
+        helper.list_server_containers = AsyncMock(return_value=[
+            {'Names': ['/minecraft_lobby'], 'Id': 'abc', 'State': 'running', 'Status': 'Up 2 hours (healthy)'},
+            {'Names': ['/minecraft_creative'], 'Id': 'def', 'State': 'exited', 'Status': 'Exited (0) 5 minutes ago'},
+        ])
+        return StatusPoller(helper)
+
+    @pytest.mark.asyncio
+    async def test_refresh_builds_snapshot(self, poller):
+        """Test that one listing call populates the snapshot for every server"""
+        await poller.refresh()
+
+        poller.docker_helper.list_server_containers.assert_awaited_once()
+        assert poller.get('lobby').state == 'running'
+        assert poller.get('lobby').health == 'healthy'
+        assert poller.get('creative').health is None
+        assert poller.age() is not None
+
+    def test_unknown_server(self, poller):
+        """Test lookups before the first refresh"""
+        assert poller.get('lobby') is None
+        assert poller.age() is None
+
+
+class TestServerEvent:
+    """Test cases for parsing Docker events"""
+
+    def test_parse_health_event(self):
+        """Test that health_status events carry the health value"""
+        event = ServerEvent.from_docker({
+            'Type': 'container',
+            'Action': 'health_status: unhealthy',
+            'Actor': {'ID': 'abc', 'Attributes': {'name': 'minecraft_lobby'}},
+            'timeNano': 1700000000000000000,
+        })
+
+        assert event.server_name == 'lobby'
+        assert event.state is None
+        assert event.health == 'unhealthy'
+        assert event.timestamp == 1700000000.0
+
+    def test_ignores_other_containers(self):
+        """Test that events for non-server containers are dropped"""
+        event = ServerEvent.from_docker({
+            'Action': 'start',
+            'Actor': {'ID': 'abc', 'Attributes': {'name': 'redis'}},
+        })
+
+        assert event is None
+
+    @pytest.mark.asyncio
+    async def test_watcher_applies_events_to_snapshot(self):
+        """Test that streamed events update the snapshot and are not replayed twice"""
+        raw = {
+            'Action': 'die',
+            'Actor': {'ID': 'abc', 'Attributes': {'name': 'minecraft_lobby', 'exitCode': '137'}},
+            'timeNano': 1700000000000000000,
+        }
+
+        async def stream(operation, func, *args, **kwargs):
+            for item in (raw, raw):
+                yield item
+
+        helper = Mock()
+        helper.stream = stream
+        poller = StatusPoller(helper)
+        handled = []
+
+        async def on_event(event):
+            handled.append(event)
+
+        watcher = DockerEventWatcher(helper, poller, on_event=on_event)
+        await watcher._follow()
+
+        assert poller.get('lobby').state == 'exited'
+        assert [e.exit_code for e in handled] == ['137']
+        assert watcher.last_timestamp == 1700000000.0
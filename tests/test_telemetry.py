@@ -0,0 +1,196 @@
+"""
+Tests for Server List Ping, the RCON client and the telemetry collector
+"""
+
+import asyncio
+import json
+import struct
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+from src.utils.status_poller import ContainerStatus
+from src.utils.telemetry import (
+    GAME_PORT, RCON_PASSWORD_LABEL, RCON_PORT, RconClient, TelemetryCollector, TelemetryError,
+    TelemetryHistory, pack_varint, encode_packet, read_packet, server_list_ping
+)
+
+
+class FakeMinecraftServer:
+    """Answers status pings and RCON commands like a Paper server"""
+
+    def __init__(self, password="secret", players=("Alex", "Steve")):
+        self.password = password
+        self.players = list(players)
+        self.rcon_connections = 0
+        self.commands = []
+        # Commands whose connection is dropped instead of answered, once per entry
+        self.drop = []
+        self._servers = []
+
+    async def start(self):
+        game = await asyncio.start_server(self._handle_slp, '127.0.0.1', 0)
+        rcon = await asyncio.start_server(self._handle_rcon, '127.0.0.1', 0)
+        self._servers = [game, rcon]
+        self.game_port = game.sockets[0].getsockname()[1]
+        self.rcon_port = rcon.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    async def _handle_slp(self, reader, writer):
+        try:
+            packet_id, payload = await read_packet(reader)
+            assert packet_id == 0x00
+            await read_packet(reader)
+            status = json.dumps({
+                'version': {'name': 'Paper 1.20.4', 'protocol': 765},
+                'players': {'online': len(self.players), 'max': 20,
+                            'sample': [{'name': name, 'id': '0'} for name in self.players]},
+                'description': {'text': '§aA ', 'extra': [{'text': 'Test Server'}]},
+            }).encode()
+            writer.write(encode_packet(0x00, pack_varint(len(status)) + status))
+            packet_id, payload = await read_packet(reader)
+            writer.write(encode_packet(0x01, payload))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_rcon(self, reader, writer):
+        self.rcon_connections += 1
+        authenticated = False
+        try:
+            while True:
+                length, = struct.unpack('<i', await reader.readexactly(4))
+                data = await reader.readexactly(length)
+                request_id, kind = struct.unpack('<ii', data[:8])
+                body = data[8:-2].decode()
+                if kind == 3:
+                    authenticated = body == self.password
+                    self._reply(writer, request_id if authenticated else -1, "")
+                elif authenticated:
+                    self.commands.append(body)
+                    if body in self.drop:
+                        self.drop.remove(body)
+                        break
+                    self._reply(writer, request_id, self._run(body))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    def _run(self, command):
+        if command == 'list':
+            return f"There are {len(self.players)} of a max of 20 players online: {', '.join(self.players)}"
+        if command == 'tps':
+            return "§6TPS from last 1m, 5m, 15m: §a19.5, §a*20.0, §a20.0"
+        return "Unknown or incomplete command, see below for error"
+
+    @staticmethod
+    def _reply(writer, request_id, text):
+        payload = struct.pack('<ii', request_id, 0) + text.encode() + b'\x00\x00'
+        writer.write(struct.pack('<i', len(payload)) + payload)
+
+
+@pytest_asyncio.fixture
+async def fake_server():
+    server = FakeMinecraftServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+class TestTelemetry:
+    """Test cases for telemetry collection against a fake server"""
+
+    @pytest.mark.asyncio
+    async def test_server_list_ping(self, fake_server):
+        """Test the status ping reports players, version and MOTD"""
+        result = await server_list_ping('127.0.0.1', fake_server.game_port, timeout=2)
+
+        assert (result.players_online, result.players_max) == (2, 20)
+        assert result.sample == ['Alex', 'Steve']
+        assert result.version == 'Paper 1.20.4'
+        assert result.motd == 'A Test Server'
+        assert result.latency >= 0
+
+    @pytest.mark.asyncio
+    async def test_rcon_reconnects_and_rejects_bad_password(self, fake_server):
+        """Test commands reuse one connection, survive a drop, and fail on a wrong password"""
+        client = RconClient('127.0.0.1', fake_server.rcon_port, 'secret', timeout=2)
+        assert "2 of a max of 20" in await client.command('list')
+        assert "TPS" in await client.command('tps')
+        assert fake_server.rcon_connections == 1
+
+        client._writer.close()
+        assert "Alex" in await client.command('list')
+        assert fake_server.rcon_connections == 2
+        await client.close()
+
+        with pytest.raises(TelemetryError):
+            await RconClient('127.0.0.1', fake_server.rcon_port, 'wrong', timeout=2).command('list')
+
+    @pytest.mark.asyncio
+    async def test_collector_keeps_latest_and_history(self, fake_server):
+        """Test sampling uses the snapshot's ports, pools RCON and remembers the TPS command"""
+        status = ContainerStatus(
+            server_name='lobby', container_id='abc', state='running', status='Up', health=None, updated_at=0,
+            ports={GAME_PORT: fake_server.game_port, RCON_PORT: fake_server.rcon_port},
+            labels={RCON_PASSWORD_LABEL: 'secret'}
+        )
+        poller = SimpleNamespace(snapshot={'lobby': status})
+        docker_helper = Mock()
+        collector = TelemetryCollector(docker_helper, poller, '127.0.0.1', interval=1, history=10)
+
+        await collector.collect()
+        await collector.collect()
+
+        telemetry = collector.get('lobby')
+        assert telemetry.online and telemetry.error is None
+        assert telemetry.player_names == ['Alex', 'Steve']
+        assert telemetry.tps == 19.5
+        assert len(collector.history['lobby']) == 2
+        assert fake_server.rcon_connections == 1
+        assert fake_server.commands == ['list', 'tps', 'list', 'tps']
+        docker_helper.get_container.assert_not_called()
+
+        # Stopped servers are dropped along with their connection
+        status.state = 'exited'
+        await collector.collect()
+        assert collector.get('lobby') is None
+        assert not collector.rcon.clients
+        await collector.stop()
+
+    def test_history_ring_wraps(self):
+        """Test the ring keeps the newest samples in order"""
+        history = TelemetryHistory(3)
+        for i in range(5):
+            history.append(100 + i, i, None if i == 4 else 20.0, 0.01)
+
+        samples = history.window()
+        assert [sample[0] for sample in samples] == [102, 103, 104]
+        assert samples[-1][2] is None
+        assert [sample[1] for sample in history.window(1.5, now=104)] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_tps_probe_is_retried_after_rcon_error(self, fake_server):
+        """Test a TPS probe cut short by an RCON error does not rule TPS out for good"""
+        status = ContainerStatus(
+            server_name='lobby', container_id='abc', state='running', status='Up', health=None, updated_at=0,
+            ports={GAME_PORT: fake_server.game_port, RCON_PORT: fake_server.rcon_port},
+            labels={RCON_PASSWORD_LABEL: 'secret'}
+        )
+        collector = TelemetryCollector(Mock(), SimpleNamespace(snapshot={'lobby': status}), '127.0.0.1',
+                                       interval=1, history=10)
+        # The client reconnects once before giving up
+        fake_server.drop.extend(['tps', 'tps'])
+
+        await collector.collect()
+        assert collector.get('lobby').tps is None
+        await collector.collect()
+
+        assert collector.get('lobby').tps == 19.5
+        await collector.stop()
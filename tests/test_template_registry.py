@@ -0,0 +1,86 @@
+"""
+Tests for the template registry
+"""
+
+import json
+import os
+import pytest
+from src.utils.template_registry import TemplateRegistry
+
+
+def write_templates(path, templates, mtime_ns=None):
+    """Write a templates file and give it a distinct mtime"""
+    path.write_text(json.dumps(templates))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestTemplateRegistry:
+    """Test cases for the TemplateRegistry class"""
+
+    @pytest.fixture
+    def templates_file(self, tmp_path):
+        """A templates file with two templates"""
+        path = tmp_path / 'templates.json'
+        write_templates(path, {
+            'vanilla': {'name': 'Vanilla', 'image': 'itzg/minecraft-server', 'environment': {'MEMORY': '2G'}},
+            'paper': {'name': 'Paper', 'image': 'itzg/minecraft-server', 'environment': {'TYPE': 'PAPER'}},
+        }, mtime_ns=1_000_000_000)
+        return path
+
+    def test_templates_are_immutable(self, templates_file):
+        """Test parsed templates cannot be modified by callers"""
+        registry = TemplateRegistry(str(templates_file))
+        registry.reload()
+        template = registry.get('vanilla')
+        with pytest.raises(Exception):
+            template.image = 'other'
+        with pytest.raises(TypeError):
+            template.environment['MEMORY'] = '8G'
+        assert template.environment.copy() == {'MEMORY': '2G'}
+
+    def test_unchanged_file_is_not_reparsed(self, templates_file):
+        """Test a reload without a file change is a no-op"""
+        registry = TemplateRegistry(str(templates_file))
+        assert registry.reload() is True
+        assert registry.reload() is False
+        assert registry.version == 1
+
+    def test_reload_is_incremental(self, templates_file):
+        """Test only edited templates get new instances"""
+        registry = TemplateRegistry(str(templates_file))
+        registry.reload()
+        vanilla, paper = registry.get('vanilla'), registry.get('paper')
+        events = []
+        registry.add_listener(lambda changed, removed: events.append((changed, removed)))
+
+        write_templates(templates_file, {
+            'vanilla': {'name': 'Vanilla', 'image': 'itzg/minecraft-server', 'environment': {'MEMORY': '2G'}},
+            'fabric': {'name': 'Fabric', 'image': 'itzg/minecraft-server:java21'},
+        }, mtime_ns=2_000_000_000)
+        assert registry.reload() is True
+
+        assert registry.get('vanilla') is vanilla
+        assert registry.get('paper') is None
+        assert paper is not None
+        assert registry.get('fabric').image == 'itzg/minecraft-server:java21'
+        assert events == [({'fabric'}, {'paper'})]
+        assert registry.version == 2
+
+    def test_invalid_edits_keep_previous_templates(self, templates_file):
+        """Test a broken template or file does not drop working templates"""
+        registry = TemplateRegistry(str(templates_file))
+        registry.reload()
+        vanilla = registry.get('vanilla')
+
+        write_templates(templates_file, {
+            'vanilla': {'name': 'Vanilla', 'image': 'itzg/minecraft-server', 'environment': {'MEMORY': 'lots'}},
+            'paper': {'name': 'Paper', 'image': 'itzg/minecraft-server', 'environment': {'TYPE': 'PAPER'}},
+        }, mtime_ns=2_000_000_000)
+        registry.reload()
+        assert registry.get('vanilla') is vanilla
+
+        templates_file.write_text('{not json')
+        os.utime(templates_file, ns=(3_000_000_000, 3_000_000_000))
+        assert registry.reload() is False
+        assert set(registry) == {'vanilla', 'paper'}
@@ -0,0 +1,109 @@
+"""
+Tests for streaming world copies and region timestamp filtering
+"""
+
+import io
+import struct
+import tarfile
+import pytest
+from src.utils.world_transfer import REGION_HEADER, newest_chunk, transfer_world
+
+
+def region_file(timestamps: dict, chunks: int = 2) -> bytes:
+    """An Anvil region file whose chunk slots have the given save times"""
+    locations = [0] * 1024
+    times = [0] * 1024
+    for slot, timestamp in timestamps.items():
+        locations[slot] = ((2 + slot) << 8) | 1
+        times[slot] = timestamp
+    return struct.pack('>1024I', *locations) + struct.pack('>1024I', *times) + b'\x01' * 4096 * chunks
+
+
+def world_tar(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as archive:
+        directory = tarfile.TarInfo('data/world/region')
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for name, (content, mtime) in files.items():
+            info = tarfile.TarInfo(f'data/{name}')
+            info.size = len(content)
+            info.mtime = mtime
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+class FakeDocker:
+    """Serves a tar from one container and extracts into another"""
+
+    def __init__(self, archive: bytes = b'', fail_after: int = None):
+        self.archive = archive
+        self.fail_after = fail_after
+        self.received = None
+
+    async def open_archive(self, container_id, path):
+        def blocks():
+            for index, offset in enumerate(range(0, len(self.archive), 4096)):
+                if self.fail_after is not None and index == self.fail_after:
+                    raise ConnectionError("source went away")
+                yield self.archive[offset:offset + 4096]
+        return blocks()
+
+    async def put_archive(self, container_id, path, data, timeout=None):
+        self.received = b''.join(data)
+
+
+def members(archive: bytes) -> dict:
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        return {member.name: tar.extractfile(member).read() if member.isfile() else None for member in tar}
+
+
+class TestWorldTransfer:
+    """Test cases for world transfers"""
+
+    def test_newest_chunk(self):
+        """Test the newest save time ignores empty slots"""
+        header = region_file({0: 100, 5: 300})[:REGION_HEADER]
+        assert newest_chunk(header) == 300
+        assert newest_chunk(region_file({})[:REGION_HEADER]) == 0
+        assert newest_chunk(b'short') is None
+
+    @pytest.mark.asyncio
+    async def test_full_copy_is_passed_through(self):
+        """Test a full copy sends the source tar unchanged"""
+        source = FakeDocker(world_tar({'world/region/r.0.0.mca': (region_file({0: 100}), 100)}))
+        target = FakeDocker()
+
+        stats = await transfer_world(source, 'a', target, 'b')
+        assert target.received == source.archive
+        assert stats.bytes == len(source.archive)
+
+    @pytest.mark.asyncio
+    async def test_changes_skip_unchanged_regions_and_files(self):
+        """Test region files are judged by their timestamp table and other files by mtime"""
+        changed_region = region_file({0: 100, 1: 2000})
+        source = FakeDocker(world_tar({
+            'world/region/r.0.0.mca': (region_file({0: 100, 1: 900}), 3000),
+            'world/region/r.0.1.mca': (changed_region, 2000),
+            'world/level.dat': (b'level', 2000),
+            'server.properties': (b'motd=Test', 100),
+        }))
+        target = FakeDocker()
+
+        stats = await transfer_world(source, 'a', target, 'b', since=1000)
+        received = members(target.received)
+        # Touched on disk, but no chunk in it was saved since the last sync
+        assert 'data/world/region/r.0.0.mca' not in received
+        assert received['data/world/region/r.0.1.mca'] == changed_region
+        assert received['data/world/level.dat'] == b'level'
+        assert 'data/server.properties' not in received
+        assert 'data/world/region' in received
+        assert (stats.regions, stats.skipped_regions, stats.files, stats.skipped_files) == (1, 1, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_source_errors_are_reported(self):
+        """Test a failure reading the source fails the transfer with its cause"""
+        source = FakeDocker(world_tar({'world/region/r.0.0.mca': (region_file({0: 100}, chunks=8), 100)}), fail_after=3)
+
+        with pytest.raises(ConnectionError):
+            await transfer_world(source, 'a', FakeDocker(), 'b')